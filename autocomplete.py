@@ -0,0 +1,210 @@
+"""Autocomplete suggestions for source IDs and strain names.
+
+Each PrefixIndex keeps its values' casefolded keys in a sorted list, so all
+values starting with a prefix are one bisect away, plus each value's recency
+(its record's updated_at) for ranking. The Completer holds one index per
+record table, filled from the ID registry and kept current by listening to
+the registry's change_log replay, and one index of strain names.
+"""
+import heapq
+import json
+from bisect import bisect_left, insort
+from database import PRIMARY_KEYS
+from id_registry import SOURCE_TABLES
+
+# Suggestions shown under an entry
+SUGGESTION_LIMIT = 10
+
+# Prefixes matching more values than this are ranked by scanning the most
+# recent values instead of sorting every match
+MAX_RANKED_MATCHES = 2000
+
+# Changed records of one table above which its index is rebuilt, not patched
+REBUILD_THRESHOLD = 2000
+
+# Columns whose values are offered as strain names
+STRAIN_COLUMNS = {
+    "agar_plates": "strain_name",
+    "liquid_cultures": "strain_name",
+    "clone_library": "parent_strain",
+}
+
+# Rows fetched per query when patching an index
+FETCH_CHUNK_SIZE = 500
+
+class PrefixIndex:
+    """Values searchable by case-insensitive prefix, ranked by recency"""
+
+    def __init__(self, values=()):
+        self.rebuild(values)
+
+    def rebuild(self, values):
+        """Replace the contents with (value, recency) pairs"""
+        self.display = {}
+        self.recency = {}
+        for value, recency in values:
+            key = value.casefold()
+            if recency >= self.recency.get(key, ""):
+                self.display[key] = value
+                self.recency[key] = recency
+        self.keys = sorted(self.display)
+        self._recent = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, value, recency):
+        """Add a value, or move an existing one up to `recency`"""
+        key = value.casefold()
+        if key not in self.recency:
+            insort(self.keys, key)
+        elif recency < self.recency[key]:
+            return
+        self.display[key] = value
+        self.recency[key] = recency
+        self._recent = None
+
+    def remove(self, value):
+        key = value.casefold()
+        if self.recency.pop(key, None) is not None:
+            del self.display[key]
+            del self.keys[bisect_left(self.keys, key)]
+            self._recent = None
+
+    def suggest(self, prefix, limit=SUGGESTION_LIMIT):
+        """Return up to `limit` (recency, value) pairs starting with `prefix`, newest first"""
+        key = prefix.casefold()
+        start = bisect_left(self.keys, key)
+        end = bisect_left(self.keys, key + "\U0010ffff", start)
+        if end - start <= MAX_RANKED_MATCHES:
+            matches = heapq.nlargest(limit, self.keys[start:end], key=self.recency.__getitem__)
+        else:
+            # Most values match, so the newest matches are near the front
+            if self._recent is None:
+                self._recent = sorted(self.keys, key=self.recency.__getitem__, reverse=True)
+            matches = []
+            for candidate in self._recent:
+                if candidate.startswith(key):
+                    matches.append(candidate)
+                    if len(matches) == limit:
+                        break
+        return [(self.recency[match], self.display[match]) for match in matches]
+
+class Completer:
+    """Suggestions for the source ID and strain name fields of the entry forms"""
+
+    def __init__(self, db):
+        self.db = db
+        self.indexes = {table_name: PrefixIndex() for table_name in PRIMARY_KEYS}
+        self.strains = PrefixIndex()
+        self._strains_stale = True
+        self._strains_unchecked = False
+        registry = db.id_registry
+        registry.refresh()
+        self.reload()
+        registry.listeners.append(self.apply_changes)
+
+    def _load_table(self, table_name):
+        self.db.cursor.execute(f"SELECT {PRIMARY_KEYS[table_name]}, updated_at FROM {table_name}")
+        self.indexes[table_name].rebuild((str(record_id), updated_at or "")
+                                         for record_id, updated_at in self.db.cursor)
+
+    def reload(self):
+        for table_name in PRIMARY_KEYS:
+            self._load_table(table_name)
+        self._strains_stale = True
+
+    def _load_strains(self):
+        selects = " UNION ALL ".join(
+            f"SELECT {column} AS strain, updated_at FROM {table_name} WHERE {column} != ''"
+            for table_name, column in STRAIN_COLUMNS.items()
+        )
+        self.db.cursor.execute(f"SELECT strain, MAX(updated_at) FROM ({selects}) GROUP BY strain")
+        self.strains.rebuild((strain, updated_at or "") for strain, updated_at in self.db.cursor)
+        self._strains_stale = False
+        self._strains_unchecked = False
+
+    def _check_strains(self):
+        """Reload the strain names if an edit renamed away the last use of one.
+
+        The change log doesn't say what a record's strain was before an
+        update, so each listed name is looked up in the strain columns'
+        indexes, which is much cheaper than reloading every name.
+        """
+        in_use = " OR ".join(f"EXISTS (SELECT 1 FROM {table_name} WHERE {column} = value)"
+                             for table_name, column in STRAIN_COLUMNS.items())
+        self.db.cursor.execute(f"SELECT 1 FROM json_each(?) WHERE NOT ({in_use}) LIMIT 1",
+                               (json.dumps(list(self.strains.display.values())),))
+        if self.db.cursor.fetchone():
+            self._load_strains()
+        self._strains_unchecked = False
+
+    def apply_changes(self, changes):
+        """Patch the indexes with a batch of changes from the ID registry"""
+        if changes is None:
+            self.reload()
+            return
+
+        changed = {}
+        for table_name, record_id, operation in changes:
+            changed.setdefault(table_name, {})[record_id] = operation
+        for table_name, operations in changed.items():
+            if table_name in STRAIN_COLUMNS and "delete" in operations.values():
+                # A deleted record may have held the last use of a strain name
+                self._strains_stale = True
+            elif table_name in STRAIN_COLUMNS and "update" in operations.values():
+                # So may an updated one, if its strain was renamed
+                self._strains_unchecked = True
+            if len(operations) > REBUILD_THRESHOLD:
+                self._load_table(table_name)
+                self._strains_stale = self._strains_stale or table_name in STRAIN_COLUMNS
+                continue
+
+            index = self.indexes[table_name]
+            current = []
+            for record_id, operation in operations.items():
+                if operation == "delete":
+                    index.remove(record_id)
+                else:
+                    current.append(record_id)
+            strain_column = STRAIN_COLUMNS.get(table_name, "NULL")
+            for start in range(0, len(current), FETCH_CHUNK_SIZE):
+                chunk = current[start:start + FETCH_CHUNK_SIZE]
+                self.db.cursor.execute(
+                    f"SELECT {PRIMARY_KEYS[table_name]}, updated_at, {strain_column} FROM {table_name} "
+                    f"WHERE {PRIMARY_KEYS[table_name]} IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+                for record_id, updated_at, strain in self.db.cursor.fetchall():
+                    index.add(str(record_id), updated_at or "")
+                    if strain and not self._strains_stale:
+                        self.strains.add(strain, updated_at or "")
+
+    def refresh(self):
+        """Apply pending changes, and reload the strain names if a delete or rename made them stale"""
+        self.db.id_registry.refresh()
+        if self._strains_stale:
+            self._load_strains()
+        elif self._strains_unchecked:
+            self._check_strains()
+
+    def suggest_ids(self, tables, prefix, limit=SUGGESTION_LIMIT):
+        """Return the newest IDs from `tables` starting with `prefix`"""
+        if not prefix:
+            return []
+        self.db.id_registry.refresh()
+        matches = []
+        for table_name in tables:
+            matches.extend(self.indexes[table_name].suggest(prefix, limit))
+        return [value for _, value in heapq.nlargest(limit, matches)]
+
+    def suggest_sources(self, table_name, prefix, limit=SUGGESTION_LIMIT):
+        """Return suggested source IDs for a new record of `table_name`"""
+        return self.suggest_ids(SOURCE_TABLES[table_name][1], prefix, limit)
+
+    def suggest_strains(self, prefix, limit=SUGGESTION_LIMIT):
+        """Return the most recently used strain names starting with `prefix`"""
+        if not prefix:
+            return []
+        self.refresh()
+        return [value for _, value in self.strains.suggest(prefix, limit)]
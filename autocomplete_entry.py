@@ -0,0 +1,90 @@
+import tkinter as tk
+from tkinter import ttk
+
+# Keys that move through the suggestions rather than edit the text
+NAVIGATION_KEYS = {"Up", "Down", "Return", "KP_Enter", "Tab", "Escape",
+                   "Left", "Right", "Home", "End", "Shift_L", "Shift_R",
+                   "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+class AutocompleteEntry(ttk.Entry):
+    """Entry that lists suggestions for the typed text in a drop-down.
+
+    `suggest(text)` returns the suggestions, best first; it is called on
+    every keystroke, so it has to answer within a frame. Up/Down move
+    through the list, Enter or Tab accepts and Escape closes it.
+    """
+
+    def __init__(self, parent, suggest, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.suggest = suggest
+        self.popup = None
+        self.listbox = None
+        self.bind("<KeyRelease>", self.update_suggestions)
+        self.bind("<Down>", lambda event: self.move_selection(1))
+        self.bind("<Up>", lambda event: self.move_selection(-1))
+        self.bind("<Return>", self.accept)
+        self.bind("<KP_Enter>", self.accept)
+        self.bind("<Tab>", self.accept)
+        self.bind("<Escape>", self.hide_suggestions)
+        self.bind("<FocusOut>", lambda event: self.after(150, self.hide_unless_focused))
+        self.bind("<Destroy>", self.hide_suggestions)
+
+    def update_suggestions(self, event=None):
+        if event is not None and event.keysym in NAVIGATION_KEYS:
+            return
+        suggestions = self.suggest(self.get().strip())
+        if not suggestions or suggestions == [self.get().strip()]:
+            self.hide_suggestions()
+            return
+
+        if self.popup is None:
+            self.popup = tk.Toplevel(self)
+            self.popup.overrideredirect(True)
+            self.listbox = tk.Listbox(self.popup, bg="#262626", fg="#f0f0f0", selectbackground="#4a6984",
+                                      font=(None, 14), activestyle="none", exportselection=False)
+            self.listbox.pack(fill=tk.BOTH, expand=True)
+            self.listbox.bind("<ButtonRelease-1>", self.accept)
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *suggestions)
+        self.listbox.config(height=len(suggestions))
+        self.popup.geometry(f"{self.winfo_width()}x{self.listbox.winfo_reqheight()}"
+                            f"+{self.winfo_rootx()}+{self.winfo_rooty() + self.winfo_height()}")
+        self.popup.lift()
+
+    def move_selection(self, step):
+        if self.popup is None:
+            self.update_suggestions()
+            return "break"
+        current = self.listbox.curselection()
+        position = (current[0] + step if current else (0 if step > 0 else tk.END))
+        if position != tk.END:
+            position = max(0, min(position, self.listbox.size() - 1))
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(position)
+        self.listbox.see(position)
+        return "break"
+
+    def accept(self, event=None):
+        """Put the selected suggestion in the entry"""
+        if self.popup is None:
+            return None
+        selection = self.listbox.curselection()
+        if not selection:
+            self.hide_suggestions()
+            return None
+        self.delete(0, tk.END)
+        self.insert(0, self.listbox.get(selection[0]))
+        self.icursor(tk.END)
+        self.hide_suggestions()
+        self.focus_set()
+        return "break"
+
+    def hide_unless_focused(self):
+        if self.winfo_exists() and self.focus_get() is not self:
+            self.hide_suggestions()
+
+    def hide_suggestions(self, event=None):
+        if self.popup is not None:
+            self.popup.destroy()
+            self.popup = None
+            self.listbox = None
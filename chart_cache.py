@@ -0,0 +1,49 @@
+"""Skip redrawing charts whose data hasn't changed.
+
+A chart's fingerprint is the ID registry's generation of the tables it
+reads (the change_log seq of each table's latest change) plus today's date,
+since several charts show a window ending today. Computing it costs one
+indexed change_log query, much less than the chart's own queries and a
+matplotlib render.
+"""
+from datetime import date
+
+def data_fingerprint(db, tables):
+    """Return a value that changes when any of `tables` changes, and daily"""
+    return db.id_registry.generation(tables) + (date.today().toordinal(),)
+
+class ChartCache:
+    """Fingerprints of the data each chart was last drawn from.
+
+    `hits` counts refreshes skipped because the data was unchanged and
+    `misses` counts charts that had to be queried and drawn again.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.fingerprints = {}
+        self.hits = 0
+        self.misses = 0
+
+    def is_current(self, chart_key, tables):
+        """Return True if the chart was drawn from the current data, else remember
+        the current fingerprint and return False so the caller redraws it"""
+        fingerprint = data_fingerprint(self.db, tables)
+        if self.fingerprints.get(chart_key) == fingerprint:
+            self.hits += 1
+            return True
+        self.misses += 1
+        self.fingerprints[chart_key] = fingerprint
+        return False
+
+    def invalidate(self, chart_key=None):
+        """Forget one chart's fingerprint (default: all), forcing a redraw"""
+        if chart_key is None:
+            self.fingerprints.clear()
+        else:
+            self.fingerprints.pop(chart_key, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        rate = f"{100 * self.hits / total:.0f}%" if total else "n/a"
+        return f"{self.hits} hits, {self.misses} misses ({rate} hit rate)"
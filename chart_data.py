@@ -0,0 +1,175 @@
+"""Datasets behind the dashboard charts, shared by every view.
+
+ChartData runs each dataset's queries once and keeps the result, as NumPy
+arrays, until one of the tables it reads changes or the date rolls over
+(see chart_cache.data_fingerprint). The dashboard, the grain jar tab and
+any report use the same instance (Database.chart_data), so any number of
+views costs one query per dataset. The arrays are shared: they are marked
+read-only so a view can't change another view's data.
+"""
+import numpy as np
+from datetime import datetime, timedelta
+from collections import namedtuple
+from database import PRIMARY_KEYS
+from chart_cache import data_fingerprint
+from colonization_history import load_histories, cohort_curves
+from colonization_forecast import forecast_completion
+from yield_engine import YIELD_TABLES, load_yield_table, group_yields, yield_intervals
+from contamination import (CONTAMINATION_TABLES, COHORTS, SurvivalCurves, classify, load_contamination_table,
+                           cohort_rates, survival_curves)
+
+# Record Distribution categories: label -> table (and filter) counted
+RECORD_CATEGORIES = {
+    "Agar Plates": "agar_plates",
+    "Liquid Cultures": "liquid_cultures",
+    "Grain Jars": "grain_jars",
+    "Bulk Tubs": "bulk_tubs",
+    "Clone Library": "clone_library WHERE archived = 0",
+}
+
+# Days of inoculations shown on the growth timeline
+TIMELINE_DAYS = 30
+
+# curves: one (n, 2) array of (days since inoculation, %) per jar, starting at (0, 0)
+# mean_curve: (m, 3) array of (day, mean %, jar count)
+GrowthTimeline = namedtuple("GrowthTimeline", "curves mean_curve")
+
+# dates: datetime64[D] per bulk date; weights: (dates, 3) grams per flush of
+# the tubs bulked that day
+FlushYields = namedtuple("FlushYields", "dates weights")
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+class ChartData:
+    """Cached chart datasets of one database"""
+
+    def __init__(self, db):
+        self.db = db
+        self._cache = {}  # dataset name -> (fingerprint, value)
+
+    def _cached(self, name, tables, compute):
+        fingerprint = data_fingerprint(self.db, tables)
+        cached = self._cache.get(name)
+        if cached is None or cached[0] != fingerprint:
+            cached = self._cache[name] = (fingerprint, compute())
+        return cached[1]
+
+    def record_counts(self):
+        """Array of record counts in RECORD_CATEGORIES order"""
+        def compute():
+            counts = [self.db.cursor.execute(f"SELECT COUNT(*) FROM {sql}").fetchone()[0]
+                      for sql in RECORD_CATEGORIES.values()]
+            return _read_only(np.array(counts, dtype=np.int64))
+        return self._cached("record_counts", tuple(PRIMARY_KEYS), compute)
+
+    def contamination_counts(self):
+        """Array of (contaminated, clean) grain jar counts, see contamination.is_contaminated"""
+        def compute():
+            self.db.cursor.execute("SELECT contamination_notes FROM grain_jars")
+            contaminated = classify([row[0] for row in self.db.cursor.fetchall()])
+            return _read_only(np.array([contaminated.sum(), len(contaminated) - contaminated.sum()],
+                                       dtype=np.int64))
+        return self._cached("contamination_counts", ("grain_jars",), compute)
+
+    def colonization_days(self):
+        """Array of days from inoculation to shaking, per shaken grain jar"""
+        def compute():
+            self.db.cursor.execute('''
+                SELECT JULIANDAY(shake_date) - JULIANDAY(inoculation_date) as days_to_colonize
+                FROM grain_jars
+                WHERE shake_date IS NOT NULL AND inoculation_date IS NOT NULL
+            ''')
+            days = np.array([row[0] for row in self.db.cursor.fetchall()], dtype=float)
+            return _read_only(days[~np.isnan(days)])
+        return self._cached("colonization_days", ("grain_jars",), compute)
+
+    def flush_yields(self):
+        """FlushYields per date with bulked tubs, oldest first. Tubs bulked on
+        the same day share one bar, so a year of tubs is a few hundred bars."""
+        def compute():
+            self.db.cursor.execute('''
+                SELECT
+                    substr(date_to_bulk, 1, 10) as bulk_date,
+                    TOTAL(harvest_weight_flush1),
+                    TOTAL(harvest_weight_flush2),
+                    TOTAL(harvest_weight_flush3)
+                FROM bulk_tubs
+                WHERE date_to_bulk IS NOT NULL
+                GROUP BY bulk_date
+                ORDER BY bulk_date
+            ''')
+            rows = self.db.cursor.fetchall()
+            dates = np.array([row[0] for row in rows], dtype='datetime64[D]')
+            weights = np.array([row[1:] for row in rows], dtype=float).reshape(len(rows), 3)
+            return FlushYields(_read_only(dates), _read_only(weights))
+        return self._cached("flush_yields", ("bulk_tubs",), compute)
+
+    def growth_timeline(self):
+        """GrowthTimeline of the jars inoculated in the last TIMELINE_DAYS days"""
+        def compute():
+            start_date = (datetime.now() - timedelta(days=TIMELINE_DAYS)).date().isoformat()
+            query = f"inoc:{start_date}.."
+            histories = load_histories(self.db, query)
+            # Jars start uncolonized on their inoculation date
+            curves = [_read_only(np.array([(0, 0)] + history, dtype=float)) for history in histories.values()]
+            mean_curve = cohort_curves(self.db, "all", query).get('All jars', []) if histories else []
+            return GrowthTimeline(curves, _read_only(np.array(mean_curve, dtype=float).reshape(-1, 3)))
+        return self._cached("growth_timeline", ("grain_jars",), compute)
+
+    def completion_forecast(self):
+        """{jar_id: forecast ISO date} for the grain jars still colonizing"""
+        return self._cached("completion_forecast", ("grain_jars",), lambda: forecast_completion(self.db))
+
+    def yield_table(self):
+        """yield_engine.YieldTable of every harvested bulk tub"""
+        def compute():
+            table = load_yield_table(self.db)
+            for codes, _ in table[1:5]:
+                _read_only(codes)
+            _read_only(table.tub_ids)
+            _read_only(table.weights)
+            return table
+        return self._cached("yield_table", YIELD_TABLES, compute)
+
+    def yield_groups(self, grouping):
+        """yield_engine.YieldGroups by a YieldTable grouping column (see GROUPINGS)"""
+        def compute():
+            table = self.yield_table()
+            groups = group_yields(getattr(table, grouping), table.weights)
+            return groups._replace(**{field: _read_only(value) for field, value in groups._asdict().items()
+                                      if isinstance(value, np.ndarray)})
+        return self._cached(f"yield_groups:{grouping}", YIELD_TABLES, compute)
+
+    def yield_intervals(self, grouping):
+        """yield_engine.YieldIntervals by a YieldTable grouping column: 10,000
+        bootstrap resamples per group, so worth keeping"""
+        def compute():
+            intervals = yield_intervals(self.yield_table(), grouping)
+            return intervals._replace(**{field: _read_only(value) for field, value in intervals._asdict().items()
+                                         if isinstance(value, np.ndarray)})
+        return self._cached(f"yield_intervals:{grouping}", YIELD_TABLES, compute)
+
+    def contamination_table(self, records):
+        """contamination.ContaminationTable of "Grain Jars" or "Bulk Tubs" """
+        def compute():
+            table = load_contamination_table(self.db, records)
+            for codes, _ in table[1:4]:
+                _read_only(codes)
+            for array in (table.record_ids, table.contaminated, table.days):
+                _read_only(array)
+            return table
+        return self._cached(f"contamination_table:{records}", CONTAMINATION_TABLES, compute)
+
+    def contamination_cohorts(self, records, cohort):
+        """(CohortRates, SurvivalCurves) of records grouped by a COHORTS label"""
+        def compute():
+            table = self.contamination_table(records)
+            column = getattr(table, COHORTS[cohort])
+            rates = cohort_rates(column, table.contaminated)
+            curves = survival_curves(column, table.contaminated, table.days)
+            return (rates._replace(counts=_read_only(rates.counts), contaminated=_read_only(rates.contaminated),
+                                   rates=_read_only(rates.rates)),
+                    SurvivalCurves(_read_only(curves.survival), _read_only(curves.overall)))
+        return self._cached(f"contamination_cohorts:{records}:{cohort}", CONTAMINATION_TABLES, compute)
@@ -0,0 +1,163 @@
+"""Render dashboard charts on a worker thread.
+
+The figures use the Agg canvas only, never the Tk one: a single worker
+thread owns them, applies each chart's updates, draws it to an RGBA buffer
+and hands a copy of the pixels back as binary PPM data. The Tk thread loads
+that into a PhotoImage shown on a Canvas (Tk reads PPM natively), so a slow
+render never blocks input.
+
+Each chart keeps at most one pending job: a newer update or size replaces
+the older one, and jobs for charts that are no longer shown are dropped.
+"""
+import threading
+import tkinter as tk
+import numpy as np
+
+# How often the Tk thread checks for finished renders (ms)
+POLL_INTERVAL = 20
+
+class _Job:
+    def __init__(self, token):
+        self.token = token
+        self.update = None
+        self.size = None
+
+class ChartRenderer:
+    """Off-thread renderer for the charts of one window.
+
+    add_view() registers a chart with a `build(figure)` function that
+    creates its axes and artists (see charts.py) and returns the object(s)
+    passed to later updates. submit() queues an `update(charts)` call
+    followed by a render. Only the chart selected with show() is rendered;
+    `on_cancel(chart_key)` is called on the Tk thread when a chart's
+    pending update is dropped or fails to render, so the caller can
+    resubmit it later.
+    """
+
+    def __init__(self, widget, on_cancel=None):
+        self.widget = widget
+        self.on_cancel = on_cancel
+        self.views = {}       # chart key -> (Canvas, PhotoImage)
+        self.visible = None
+        self._builders = {}
+        self._tokens = {}     # chart key -> token of the newest submitted job
+        self._jobs = {}       # chart key -> _Job waiting for the worker
+        self._results = []    # (chart key, token, PPM bytes or None if the render failed)
+        self._in_flight = None  # chart key the worker is rendering
+        self._condition = threading.Condition()
+        self._polling = False
+        # Only the worker touches these
+        self._figures = {}
+        self._charts = {}
+        threading.Thread(target=self._run, name="chart-renderer", daemon=True).start()
+
+    def add_view(self, chart_key, master, build, figsize=(10, 6)):
+        """Show `chart_key` in a new Canvas packed into `master`"""
+        canvas = tk.Canvas(master, highlightthickness=0, background="white", width=1, height=1)
+        canvas.pack(fill=tk.BOTH, expand=True)
+        photo = tk.PhotoImage(master=canvas)
+        canvas.create_image(0, 0, anchor=tk.NW, image=photo)
+        self.views[chart_key] = (canvas, photo)
+        self._builders[chart_key] = (build, figsize)
+        canvas.bind("<Configure>", lambda event: self._queue(chart_key, size=(event.width, event.height)))
+
+    def show(self, chart_key):
+        """Render only `chart_key` from now on (None for no chart)"""
+        cancelled = []
+        with self._condition:
+            self.visible = chart_key
+            for key, job in list(self._jobs.items()):
+                if key == chart_key:
+                    continue
+                if job.update is not None:
+                    cancelled.append(key)
+                    job.update = None
+                if job.size is None:
+                    del self._jobs[key]
+            self._condition.notify()
+        # Right away rather than on the next poll, so showing the chart again
+        # before then still redraws it
+        if self.on_cancel:
+            for key in cancelled:
+                self.on_cancel(key)
+        self._start_polling()
+
+    def submit(self, chart_key, update):
+        """Apply `update(charts)` on the worker thread and render the chart"""
+        self._queue(chart_key, update=update)
+
+    def _queue(self, chart_key, update=None, size=None):
+        with self._condition:
+            token = self._tokens.get(chart_key, 0) + 1
+            self._tokens[chart_key] = token
+            job = self._jobs.get(chart_key) or _Job(token)
+            job.token = token
+            if update is not None:
+                job.update = update
+            if size is not None:
+                job.size = size
+            self._jobs[chart_key] = job
+            self._condition.notify()
+        self._start_polling()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self.visible not in self._jobs:
+                    self._condition.wait()
+                chart_key = self._in_flight = self.visible
+                job = self._jobs.pop(chart_key)
+            try:
+                image = self._render(chart_key, job)
+            except Exception as e:
+                print(f"Error rendering chart {chart_key}: {e}")
+                image = None
+            with self._condition:
+                self._results.append((chart_key, job.token, image))
+                self._in_flight = None
+
+    def _render(self, chart_key, job):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        figure = self._figures.get(chart_key)
+        if figure is None:
+            build, figsize = self._builders[chart_key]
+            figure = Figure(figsize=figsize)
+            FigureCanvasAgg(figure)
+            self._charts[chart_key] = build(figure)
+            self._figures[chart_key] = figure
+            figure.tight_layout()
+        if job.size is not None:
+            width, height = job.size
+            if width > 1 and height > 1:
+                figure.set_size_inches(width / figure.dpi, height / figure.dpi)
+                figure.tight_layout()
+        if job.update is not None:
+            job.update(self._charts[chart_key])
+        figure.canvas.draw()
+        # The figure background is opaque, so the alpha channel is dropped
+        pixels = np.asarray(figure.canvas.buffer_rgba())[:, :, :3]
+        height, width = pixels.shape[:2]
+        return b"P6 %d %d 255\n" % (width, height) + pixels.tobytes()
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.widget.after(POLL_INTERVAL, self._poll)
+
+    def _poll(self):
+        with self._condition:
+            results, self._results = self._results, []
+            busy = self._in_flight is not None or self.visible in self._jobs
+        for chart_key, token, image in results:
+            if image is None:
+                if self.on_cancel:
+                    self.on_cancel(chart_key)
+            elif token == self._tokens.get(chart_key):
+                self.views[chart_key][1].configure(data=image, format="PPM")
+            # Otherwise a newer job for this chart replaces the result
+        if busy:
+            self.widget.after(POLL_INTERVAL, self._poll)
+        else:
+            self._polling = False
@@ -0,0 +1,310 @@
+"""Dashboard charts that keep their matplotlib artists between refreshes.
+
+Each chart creates its artists once, on an existing Axes, and update()
+only changes their data (wedge angles, line segments, bar heights, polygon
+vertices) and the axis limits. Nothing is cleared or re-created, so a
+refresh costs one redraw instead of rebuilding every line, bar, legend and
+grid. Callers then redraw the figure (see chart_renderer.py).
+
+Long lines are drawn from an LTTB-downsampled copy sized to the Axes'
+pixel width (see downsample.py), so their cost is bounded by the screen,
+not by the number of points.
+"""
+import math
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.patches import Wedge
+import matplotlib.dates as mdates
+from downsample import downsample_visible
+
+# (label, color) of each flush in the yield charts
+FLUSH_SERIES = [('Flush 1', '#2ecc71'), ('Flush 2', '#3498db'), ('Flush 3', '#9b59b6')]
+
+def _no_data_text(ax, message):
+    return ax.text(0.5, 0.5, message, horizontalalignment='center', verticalalignment='center',
+                   transform=ax.transAxes, visible=False)
+
+class DownsampledLineCollection(LineCollection):
+    """LineCollection that keeps its lines at full resolution and draws each
+    one downsampled to about one point per pixel of its Axes' width.
+
+    The downsampled segments are recomputed at draw time whenever the visible
+    x range (zoom, pan) or the Axes' size changes.
+    """
+
+    def __init__(self, curves, **kwargs):
+        super().__init__([], **kwargs)
+        self.set_curves(curves)
+
+    def set_curves(self, curves):
+        """Set the full-resolution lines, each an (n, 2) array sorted by x"""
+        self.curves = [np.asarray(curve, dtype=float).reshape(-1, 2) for curve in curves]
+        self._view = None
+        # Full segments until the first draw, so autoscaling sees every point
+        self.set_segments(self.curves)
+
+    def draw(self, renderer):
+        if self.axes is not None:
+            xlim = tuple(self.axes.get_xlim())
+            width = max(int(self.axes.bbox.width), 1)
+            if (xlim, width) != self._view:
+                self._view = (xlim, width)
+                # Not a data change, so don't mark the figure stale mid-draw
+                callback, self.stale_callback = self.stale_callback, None
+                self.set_segments([downsample_visible(curve, xlim, width) for curve in self.curves])
+                self.stale_callback = callback
+        super().draw(renderer)
+
+class PieChart:
+    """Pie with one wedge per fixed category; empty categories are hidden"""
+
+    def __init__(self, ax, labels, title, colors=None, start_angle=0):
+        self.ax = ax
+        self.start_angle = start_angle
+        ax.set(frame_on=False, xticks=[], yticks=[], xlim=(-1.25, 1.25), ylim=(-1.25, 1.25))
+        ax.set_aspect('equal')
+        ax.set_title(title)
+        colors = colors or [f"C{index}" for index in range(len(labels))]
+        self.wedges = [ax.add_patch(Wedge((0, 0), 1, 0, 0, facecolor=color)) for color in colors]
+        self.labels = [ax.text(0, 0, label, verticalalignment='center') for label in labels]
+        self.percentages = [ax.text(0, 0, '', horizontalalignment='center', verticalalignment='center')
+                            for _ in labels]
+        self.empty_text = _no_data_text(ax, 'No data available')
+
+    def update(self, sizes):
+        total = sum(sizes)
+        self.empty_text.set_visible(total == 0)
+        angle = self.start_angle
+        for wedge, label, percentage, size in zip(self.wedges, self.labels, self.percentages, sizes):
+            for artist in (wedge, label, percentage):
+                artist.set_visible(size > 0)
+            if size <= 0:
+                continue
+            sweep = 360 * size / total
+            wedge.set_theta1(angle)
+            wedge.set_theta2(angle + sweep)
+            middle = math.radians(angle + sweep / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x >= 0 else 'right')
+            percentage.set_position((0.6 * x, 0.6 * y))
+            percentage.set_text(f"{100 * size / total:.1f}%")
+            angle += sweep
+
+class GrowthTimelineChart:
+    """Per-jar colonization curves plus their average, by days since inoculation"""
+
+    def __init__(self, ax):
+        self.ax = ax
+        self.curves = DownsampledLineCollection([], colors='tab:blue', alpha=0.25, linewidths=1)
+        ax.add_collection(self.curves)
+        self.mean_line, = ax.plot([], [], 'b-', marker='o', linewidth=2, label='Average')
+        self.legend = ax.legend(loc='lower right')
+        ax.set_ylim(0, 105)
+        ax.set_xlabel('Days Since Inoculation')
+        ax.set_ylabel('Colonization %')
+        ax.grid(True)
+        self.empty_text = _no_data_text(ax, 'No data available for the last 30 days')
+
+    def update(self, curves, mean_curve, title):
+        """`curves` holds one sequence of (day, percentage) points per jar;
+        `mean_curve` is a sequence of (day, mean, count)"""
+        self.curves.set_curves(curves)
+        self.mean_line.set_data([point[0] for point in mean_curve], [point[1] for point in mean_curve])
+        self.legend.set_visible(len(mean_curve) > 0)
+        self.empty_text.set_visible(not curves)
+        last_day = max((curve[-1][0] for curve in curves if len(curve)), default=0)
+        self.ax.set_xlim(0, max(last_day, 1) * 1.02)
+        self.ax.set_title(title)
+
+class HistogramChart:
+    """Histogram with a fixed number of bins, redrawn by moving its bars"""
+
+    def __init__(self, ax, title, xlabel, ylabel, bins=10, color='green'):
+        self.ax = ax
+        self.bins = bins
+        self.bars = ax.bar(np.zeros(bins), np.zeros(bins), width=0, align='edge', color=color, alpha=0.7)
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.grid(True)
+        self.empty_text = _no_data_text(ax, 'No data available')
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        self.empty_text.set_visible(not values.size)
+        if values.size:
+            counts, edges = np.histogram(values, bins=self.bins)
+        else:
+            counts, edges = np.zeros(self.bins), np.linspace(0, 1, self.bins + 1)
+        for bar, count, left, right in zip(self.bars, counts, edges[:-1], edges[1:]):
+            bar.set_x(left)
+            bar.set_width(right - left)
+            bar.set_height(count)
+        margin = (edges[-1] - edges[0]) * 0.05 or 0.5
+        self.ax.set_xlim(edges[0] - margin, edges[-1] + margin)
+        self.ax.set_ylim(0, max(counts.max(), 1) * 1.05)
+
+class StackedBarChart:
+    """Bars stacked from several series over dates.
+
+    Each series is one PolyCollection holding every bar, so thousands of
+    bars are a handful of artists whose vertices are replaced on update.
+    """
+
+    def __init__(self, ax, series, title, xlabel, ylabel, bar_width=0.8):
+        self.ax = ax
+        self.bar_width = bar_width
+        self.collections = []
+        for label, color in series:
+            collection = PolyCollection([], facecolors=color, edgecolors='none', label=label)
+            ax.add_collection(collection)
+            self.collections.append(collection)
+        ax.xaxis_date()
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        self.legend = ax.legend(handles=self.collections, loc='upper left')
+        ax.grid(True)
+        self.empty_text = _no_data_text(ax, 'No yield data available')
+
+    def update(self, dates, heights):
+        """`dates` are numpy datetime64 values; `heights` one array per series"""
+        x = mdates.date2num(np.asarray(dates, dtype='datetime64[s]')) if len(dates) else np.zeros(0)
+        left, right = x - self.bar_width / 2, x + self.bar_width / 2
+        bottom = np.zeros(len(x))
+        for collection, series in zip(self.collections, heights):
+            top = bottom + np.nan_to_num(np.asarray(series, dtype=float))
+            verts = np.empty((len(x), 4, 2))
+            verts[:, :, 0] = np.column_stack((left, left, right, right))
+            verts[:, :, 1] = np.column_stack((bottom, top, top, bottom))
+            collection.set_verts(verts)
+            bottom = top
+
+        self.empty_text.set_visible(not len(x))
+        self.legend.set_visible(bool(len(x)))
+        if len(x):
+            self.ax.set_xlim(x.min() - 1, x.max() + 1)
+            self.ax.set_ylim(0, max(bottom.max(), 1) * 1.05)
+
+class GroupedYieldChart:
+    """Mean yield per tub of each group as horizontal bars split by flush,
+    with the interquartile range as a whisker and the median as a dot"""
+
+    def __init__(self, ax, series, xlabel, bar_height=0.7):
+        self.ax = ax
+        self.bar_height = bar_height
+        self.collections = []
+        for label, color in series:
+            collection = PolyCollection([], facecolors=color, edgecolors='none', label=label)
+            ax.add_collection(collection)
+            self.collections.append(collection)
+        self.whiskers = LineCollection([], colors='black', linewidths=1)
+        ax.add_collection(self.whiskers)
+        self.medians, = ax.plot([], [], 'o', color='black', markersize=4, label='Median (IQR)')
+        ax.set_xlabel(xlabel)
+        ax.grid(True, axis='x')
+        # Below the axes, clear of the bars
+        self.legend = ax.legend(handles=self.collections + [self.medians], loc='upper center',
+                                bbox_to_anchor=(0.5, -0.12), ncol=len(series) + 1, frameon=False)
+        self.empty_text = _no_data_text(ax, 'No yield data available')
+
+    def update(self, labels, means, flush_ratios, percentiles, title):
+        """`flush_ratios` holds each flush's share per group; `percentiles`
+        the 25th, 50th and 75th percentile per group. The first group is
+        drawn at the top."""
+        y = np.arange(len(labels))[::-1].astype(float)
+        bottom, top = y - self.bar_height / 2, y + self.bar_height / 2
+        left = np.zeros(len(labels))
+        for collection, ratios in zip(self.collections, np.asarray(flush_ratios, dtype=float).reshape(-1, 3).T):
+            right = left + np.asarray(means, dtype=float) * ratios
+            verts = np.empty((len(labels), 4, 2))
+            verts[:, :, 0] = np.column_stack((left, left, right, right))
+            verts[:, :, 1] = np.column_stack((bottom, top, top, bottom))
+            collection.set_verts(verts)
+            left = right
+
+        percentiles = np.asarray(percentiles, dtype=float).reshape(-1, 3)
+        self.whiskers.set_segments(np.stack((np.column_stack((percentiles[:, 0], y)),
+                                             np.column_stack((percentiles[:, 2], y))), axis=1))
+        self.medians.set_data(percentiles[:, 1], y)
+
+        self.ax.set_yticks(y, labels)
+        self.ax.set_title(title)
+        # Group labels vary in length, so make room for them
+        self.ax.figure.tight_layout()
+        self.empty_text.set_visible(not len(labels))
+        self.legend.set_visible(bool(len(labels)))
+        if len(labels):
+            self.ax.set_xlim(0, max(left.max(), percentiles.max(), 1) * 1.05)
+            self.ax.set_ylim(-0.5, len(labels) - 0.5)
+
+class SurvivalChart:
+    """Kaplan-Meier curves of the share of records still clean by day,
+    one step line per cohort plus a dashed line for all records"""
+
+    def __init__(self, ax, max_lines=6):
+        self.ax = ax
+        self.lines = [ax.plot([], [], drawstyle='steps-post', linewidth=1.5)[0] for _ in range(max_lines)]
+        self.overall_line, = ax.plot([], [], 'k--', drawstyle='steps-post', linewidth=1.5, label='All records')
+        self.legend = None
+        ax.set_ylim(0, 102)
+        ax.set_xlabel('Days Since Inoculation')
+        ax.set_ylabel('Still Clean %')
+        ax.grid(True)
+        self.empty_text = _no_data_text(ax, 'No contamination data available')
+
+    def update(self, days, curves, overall, title):
+        """`curves` holds (label, survival) per cohort, at most max_lines of
+        them; survival and `overall` are fractions at each of `days`"""
+        days = np.asarray(days, dtype=float)
+        for line, (label, survival) in zip(self.lines, curves):
+            line.set_data(days, 100 * np.asarray(survival, dtype=float))
+            line.set_label(label)
+        for line in self.lines[len(curves):]:
+            line.set_data([], [])
+        self.overall_line.set_data(days, 100 * np.asarray(overall, dtype=float))
+
+        # Cohort labels change with the data, so the legend is the one
+        # artist rebuilt on update
+        if self.legend is not None:
+            self.legend.remove()
+        handles = self.lines[:len(curves)] + [self.overall_line]
+        self.legend = self.ax.legend(handles=handles, loc='lower left', fontsize='small')
+        self.legend.set_visible(len(overall) > 0)
+        self.empty_text.set_visible(not len(overall))
+        self.ax.set_xlim(0, max(days[-1] if len(days) else 0, 1))
+        self.ax.set_title(title)
+
+class IntervalChart:
+    """Mean per group as a dot with its confidence interval as a horizontal
+    bar, first group at the top"""
+
+    def __init__(self, ax, xlabel, color='tab:green'):
+        self.ax = ax
+        self.intervals = LineCollection([], colors=color, linewidths=3, alpha=0.5)
+        ax.add_collection(self.intervals)
+        self.means, = ax.plot([], [], 'o', color=color, markersize=6)
+        self.labels = []
+        ax.set_xlabel(xlabel)
+        ax.grid(True, axis='x')
+        self.empty_text = _no_data_text(ax, 'No yield data available')
+
+    def update(self, labels, means, lower, upper, title):
+        """`lower` and `upper` bound each group's interval around `means`"""
+        y = np.arange(len(labels))[::-1].astype(float)
+        lower, upper = np.asarray(lower, dtype=float), np.asarray(upper, dtype=float)
+        self.intervals.set_segments(np.stack((np.column_stack((lower, y)), np.column_stack((upper, y))), axis=1))
+        self.means.set_data(np.asarray(means, dtype=float), y)
+
+        self.ax.set_title(title)
+        self.empty_text.set_visible(not len(labels))
+        # Group labels vary in length, so make room for them when they change
+        if list(labels) != self.labels:
+            self.labels = list(labels)
+            self.ax.set_yticks(y, labels)
+            self.ax.figure.tight_layout()
+        if len(labels):
+            span = max(upper.max() - lower.min(), 1)
+            self.ax.set_xlim(max(lower.min() - 0.1 * span, 0), upper.max() + 0.1 * span)
+            self.ax.set_ylim(-0.5, len(labels) - 0.5)
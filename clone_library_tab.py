@@ -1,8 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import csv
 from datetime import datetime
 from tkcalendar import DateEntry
+from database import column_types
+from record_query import query_records, QueryError
+from table_sorter import TreeviewSorter
+from record_store import RecordStore
+from export_dialog import ExportDialog
+from import_dialog import ImportDialog
+from autocomplete_entry import AutocompleteEntry
 
 class CloneLibraryTab(ttk.Frame):
     def __init__(self, parent, db):
@@ -61,6 +67,9 @@ class CloneLibraryTab(ttk.Frame):
             elif field_name in ["growth_characteristics", "performance_notes"]:
                 self.form_vars[field_name] = tk.Text(self.form_frame, height=4, width=38, bg="#262626", fg="#f0f0f0", insertbackground="#f0f0f0", font=(None, 14))
                 self.form_vars[field_name].grid(row=i, column=1, sticky="w", padx=10, pady=6)
+            elif field_name == "parent_strain":
+                self.form_vars[field_name] = AutocompleteEntry(self.form_frame, self.db.completer.suggest_strains, width=38, font=(None, 14))
+                self.form_vars[field_name].grid(row=i, column=1, sticky="w", padx=10, pady=6)
             else:
                 self.form_vars[field_name] = ttk.Entry(self.form_frame, width=38, font=(None, 14))
                 self.form_vars[field_name].grid(row=i, column=1, sticky="w", padx=10, pady=6)
@@ -122,6 +131,9 @@ class CloneLibraryTab(ttk.Frame):
             self.tree.heading(col, text=col)
             self.tree.column(col, width=width, anchor="center")
 
+        # Clicking a heading sorts the table by that column
+        self.sorter = TreeviewSorter(self.tree, columns, column_types("clone_library", len(columns)))
+
         # Add scrollbar
         scrollbar = ttk.Scrollbar(self.table_frame, orient=tk.VERTICAL, command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
@@ -148,7 +160,7 @@ class CloneLibraryTab(ttk.Frame):
         button_frame.pack(fill=tk.X, pady=(0, 10)) # Pack it below the search bar
 
         ttk.Button(button_frame, text="Import from CSV", command=self.import_from_csv).pack(side=tk.RIGHT, padx=(5, 10), ipadx=8, ipady=4)
-        ttk.Button(button_frame, text="Export to CSV", command=self.export_to_csv).pack(side=tk.RIGHT, padx=(0, 5), ipadx=8, ipady=4)
+        ttk.Button(button_frame, text="Export...", command=self.export_to_csv).pack(side=tk.RIGHT, padx=(0, 5), ipadx=8, ipady=4)
 
     def save_record(self):
         try:
@@ -211,29 +223,43 @@ class CloneLibraryTab(ttk.Frame):
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
     def load_data(self):
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Clear existing items, including rows hidden by the search filter
+        self.sorter.clear()
 
-        # Fetch records and cache them
+        # Fetch records and cache the displayed columns (created_at and updated_at are dropped)
         self.db.cursor.execute("SELECT * FROM clone_library WHERE archived = 0 ORDER BY date_taken DESC")
-        self.cached_records = self.db.cursor.fetchall()
+        self.cached_records = RecordStore(self.db.cursor.fetchall(), self.sorter.column_types)
         
-        # Display records
+        # Display records, using the clone ID as the item ID so sorting and
+        # filtering can reorder the existing items instead of rebuilding them
         for record in self.cached_records:
-            self.tree.insert("", tk.END, values=record[:6])  # Exclude created_at and updated_at
+            self.tree.insert("", tk.END, iid=record[0], values=record)
+        self.sorter.set_records(self.cached_records.column(0), self.cached_records)
+        self.filter_records()
+
+    def show_record(self, record_id):
+        """Select a record in the table, reloading or clearing the search if needed"""
+        if self.sorter.reveal(record_id):
+            return
+        if not self.tree.exists(record_id):
+            self.load_data()  # Added since the table was loaded
+        if self.search_var.get():
+            self.search_var.set("")  # The search box filter hides it
+        self.sorter.reveal(record_id)
 
     def filter_records(self, *args):
-        search_term = self.search_var.get().lower()
-        
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        query = self.search_var.get().strip()
+        if not query:
+            self.sorter.apply()
+            return
 
-        # Filter cached records instead of querying database
-        for record in self.cached_records:
-            if any(search_term in str(value).lower() for value in record[:6]):
-                self.tree.insert("", tk.END, values=record[:6])
+        # The search box takes the filter language from record_query, which
+        # is compiled to SQL so the filtering runs against the indexes
+        try:
+            rows = query_records(self.db, "clone_library", query, "clone_id")
+        except QueryError:
+            return  # Keep the current results while the query is incomplete
+        self.sorter.apply({row[0] for row in rows})
 
     def edit_record(self, event):
         # Get selected item
@@ -267,44 +293,20 @@ class CloneLibraryTab(ttk.Frame):
         self.form_vars["tissue_source"].set("Cap")
 
     def export_to_csv(self):
-        try:
-            filename = f"clone_library_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                # Write headers
-                writer.writerow(["Clone ID", "Parent Strain", "Date Taken", "Tissue Source", 
-                               "Growth Characteristics", "Performance Notes"])
-                
-                # Write data
-                for item in self.tree.get_children():
-                    writer.writerow(self.tree.item(item)["values"])
-            
-            messagebox.showinfo("Success", f"Data exported to {filename}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export data: {str(e)}")
+        """Export the records matching the search box to CSV, JSONL or SQLite"""
+        ExportDialog(self, self.db, "clone_library", self.search_var.get(), where="archived = 0")
 
     def import_from_csv(self):
         file_path = filedialog.askopenfilename(
-            title="Select CSV file to import",
-            filetypes=(("CSV files", "*.csv"), ("All files", "*.*"))
+            title="Select file to import",
+            filetypes=(("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl"),
+                       ("SQLite database files", "*.sqlite"), ("All files", "*.*"))
         )
         if not file_path:
             return
 
+        # Nothing is written until the user has reviewed the dry run
         try:
-            with open(file_path, 'r', newline='') as csvfile:
-                reader = csv.reader(csvfile)
-                header = next(reader) # Skip header row
-                
-                records_to_insert = []
-                for row in reader:
-                    # Assuming row order matches database schema
-                    # clone_id, parent_strain, date_taken, tissue_source, growth_characteristics, performance_notes
-                    records_to_insert.append(row + [self.db.get_timestamp(), self.db.get_timestamp()])
-
-                self.db.import_records("clone_library", records_to_insert)
-                self.load_data()
-                messagebox.showinfo("Success", f"{len(records_to_insert)} records imported successfully!")
-
+            ImportDialog(self, self.db, "clone_library", file_path, on_import=self.load_data)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to import data: {str(e)}") 
\ No newline at end of file
+            messagebox.showerror("Error", f"Failed to read import file: {str(e)}")
\ No newline at end of file
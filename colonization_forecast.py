@@ -0,0 +1,69 @@
+"""Forecast when grain jars will be fully colonized.
+
+Each active jar's colonization history (see colonization_history.py) is fitted
+with a straight line through its readings plus the inoculation point (day 0,
+0%), and the line is extended to 100%. All jars are fitted together with
+NumPy group sums, so there is no Python loop over jars.
+"""
+import numpy as np
+from colonization_history import DAYS_SINCE_INOCULATION
+
+# julianday() of 1970-01-01, for turning SQLite day numbers into datetime64
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+def fit_days_to_full(group_starts, days, percentages):
+    """Return the fitted days since inoculation at which each group reaches 100%.
+
+    `days` and `percentages` hold every reading, sorted so that each jar's
+    readings are contiguous and start at the matching index of `group_starts`.
+    Jars whose fitted line is not rising get NaN.
+    """
+    days = np.clip(days, 0, None)
+    # The inoculation point (0, 0) adds nothing to the sums except a count
+    n = np.diff(np.append(group_starts, len(days))) + 1.0
+    sum_x = np.add.reduceat(days, group_starts)
+    sum_y = np.add.reduceat(percentages, group_starts)
+    sum_xx = np.add.reduceat(days * days, group_starts)
+    sum_xy = np.add.reduceat(days * percentages, group_starts)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x)
+        intercept = (sum_y - slope * sum_x) / n
+        days_to_full = (100.0 - intercept) / slope
+    days_to_full[~(slope > 0)] = np.nan
+    return days_to_full
+
+def forecast_completion(db):
+    """Return {jar_id: forecast ISO date} for every jar below 100% colonization.
+
+    Jars that cannot be forecast yet (no growth recorded) are left out.
+    """
+    db.cursor.execute(f"""
+        SELECT o.jar_id, julianday(substr(g.inoculation_date, 1, 10)),
+               {DAYS_SINCE_INOCULATION}, o.colonization_percentage
+        FROM colonization_observations o
+        JOIN grain_jars g ON g.jar_id = o.jar_id
+        WHERE g.colonization_percentage < 100
+        ORDER BY o.jar_id, o.observed_at, o.observation_id
+    """)
+    rows = db.cursor.fetchall()
+    if not rows:
+        return {}
+
+    jar_ids, inoculated, days, percentages = zip(*rows)
+    jar_ids = np.array(jar_ids, dtype=object)
+    inoculated = np.array(inoculated, dtype=float)
+    days = np.array(days, dtype=float)
+    percentages = np.array(percentages, dtype=float)
+
+    valid = ~np.isnan(days)
+    jar_ids, inoculated, days, percentages = jar_ids[valid], inoculated[valid], days[valid], percentages[valid]
+    if not len(jar_ids):
+        return {}
+    group_starts = np.flatnonzero(np.r_[True, jar_ids[1:] != jar_ids[:-1]])
+
+    days_to_full = fit_days_to_full(group_starts, days, percentages)
+    fitted = ~np.isnan(days_to_full)
+    completion = inoculated[group_starts][fitted] + np.ceil(days_to_full[fitted]) - UNIX_EPOCH_JULIAN_DAY
+    dates = completion.astype("datetime64[D]").astype(str)
+    return dict(zip(jar_ids[group_starts][fitted].tolist(), dates.tolist()))
@@ -0,0 +1,75 @@
+"""Queries over the grain jar colonization history.
+
+Every time a jar is created or its colonization percentage changes, a row is
+appended to colonization_observations (see the triggers in database.py). The
+functions here read that history for one jar, or for a whole set of jars in a
+single query, so charts never need a query per jar.
+"""
+from record_query import compile_query
+
+# Ways to group jars into cohorts: name -> SQL expression over grain_jars g
+COHORTS = {
+    "all": "'All jars'",
+    "week": "strftime('%Y-W%W', g.inoculation_date)",
+    "month": "substr(g.inoculation_date, 1, 7)",
+    "source": "g.source_id",
+}
+
+# Days between inoculation and an observation (fractional)
+DAYS_SINCE_INOCULATION = "julianday(o.observed_at) - julianday(substr(g.inoculation_date, 1, 10))"
+
+def jar_history(db, jar_id):
+    """Return a jar's observations as (observed_at, percentage) pairs, oldest first"""
+    db.cursor.execute("""
+        SELECT observed_at, colonization_percentage
+        FROM colonization_observations
+        WHERE jar_id = ?
+        ORDER BY observed_at, observation_id
+    """, (jar_id,))
+    return db.cursor.fetchall()
+
+def load_histories(db, query=""):
+    """Return the history of every jar matching a filter query.
+
+    The result maps jar_id -> list of (days since inoculation, percentage)
+    pairs, oldest first. `query` uses the search box language of record_query.
+    """
+    where, params = compile_query("grain_jars", query.strip())
+    db.cursor.execute(f"""
+        SELECT o.jar_id, {DAYS_SINCE_INOCULATION}, o.colonization_percentage
+        FROM colonization_observations o
+        JOIN grain_jars g ON g.jar_id = o.jar_id
+        WHERE o.jar_id IN (SELECT jar_id FROM grain_jars WHERE {where})
+        ORDER BY o.jar_id, o.observed_at, o.observation_id
+    """, params)
+
+    histories = {}
+    for jar_id, days, percentage in db.cursor:
+        if days is not None:
+            histories.setdefault(jar_id, []).append((days, percentage))
+    return histories
+
+def cohort_curves(db, cohort="week", query=""):
+    """Return the mean colonization per whole day since inoculation for each cohort.
+
+    The result maps cohort label -> list of (day, mean percentage, jar count)
+    tuples ordered by day. Cohorts are the keys of COHORTS.
+    """
+    where, params = compile_query("grain_jars", query.strip())
+    db.cursor.execute(f"""
+        SELECT {COHORTS[cohort]} AS cohort,
+               CAST({DAYS_SINCE_INOCULATION} AS INTEGER) AS day,
+               AVG(o.colonization_percentage),
+               COUNT(DISTINCT o.jar_id)
+        FROM colonization_observations o
+        JOIN grain_jars g ON g.jar_id = o.jar_id
+        WHERE o.jar_id IN (SELECT jar_id FROM grain_jars WHERE {where})
+          AND day IS NOT NULL AND day >= 0
+        GROUP BY cohort, day
+        ORDER BY cohort, day
+    """, params)
+
+    curves = {}
+    for label, day, mean, count in db.cursor:
+        curves.setdefault(label, []).append((day, mean, count))
+    return curves
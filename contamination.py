@@ -0,0 +1,211 @@
+"""Contamination of grain jars and bulk tubs, by cohort.
+
+Notes are read with a keyword classifier: a record is contaminated when
+its notes (contamination_notes for jars, performance_notes for tubs) name
+a contaminant or symptom that isn't negated in the same clause, so "no
+sign of trich", "mold-free", "Contamination: none" or "trich? no" count as
+clean and "clean, but green spots" does not.
+
+Records are grouped into cohorts by inoculation week (bulk date for
+tubs), source LC or plate, or substrate (tubs only). For each cohort
+cohort_rates() gives the contamination rate and survival_curves() a
+Kaplan-Meier estimate of the share still clean by day since inoculation,
+every cohort at once with NumPy. No date of contamination is recorded, so
+a contaminated record's last update is taken as the day it was found; a
+clean record is counted as clean up to today.
+"""
+import re
+from collections import namedtuple
+import numpy as np
+from yield_engine import encode_labels
+
+# Tables the contamination cohorts read
+CONTAMINATION_TABLES = ("grain_jars", "bulk_tubs")
+
+# Words and phrases naming a contaminant or symptom, as whole words. Colors
+# and smells only count in a phrase ("green mold", "sour smell"): on their
+# own they name strains ("Pink Oyster", "Black Pearl") or healthy growth.
+CONTAMINANT_PATTERN = re.compile(
+    r"\b(contam\w*|mou?ld(s|y|ed|ing)?|trich(oderma)?s?|cobwebs?|cobwebby|bacterial?|bacterium"
+    r"|wet\s*spots?|slimy?|slime|lipstick|penicill(ium|in)|aspergill(us|i)?|infect(ed|ion|ions)?"
+    r"|rott(ed|en|ing)|(soft|dry|bacterial)\s+rot|yeast(s|y)?|stink(s|y|ing)?|blotch(es|y)?"
+    r"|(green|black|pink|orange|red)(ish)?\s+(spots?|patch(es)?|growth|fuzz|dots?)"
+    r"|(sour|bad|foul|off|rotten|vinegar|funky)\s+(smell(s|ing)?|odou?rs?)"
+    r"|smell(s|ed|ing)?\s+(sour|bad|foul|off|rotten|like\s+vinegar|funky))\b"
+)
+# Words that negate a following contaminant in the same clause ("no sign of mold")
+NEGATION_PATTERN = re.compile(r"\b(no|not|none|never|without|free of|negative for|ruled out|false alarm)\b")
+# Words that negate a preceding contaminant ("mold-free", "trich ruled out"),
+# including checklist answers ("Mold: no", "trich? none", "contam - n/a") and
+# a "none found" that may follow in the next clause ("checked for mold, none found")
+TRAILING_NEGATION_PATTERN = re.compile(
+    r"[\s:?-]*(free|ruled out|negative|gone|false alarm|none|nil|no|n/a)\b"
+    r"|[\s,;:.?-]*none\s+(found|seen|visible)\b"
+)
+# Clauses are negated separately: "no mold, but green spots" is contaminated
+CLAUSE_PATTERN = re.compile(r"[.;,!?\n]|\bbut\b|\bhowever\b")
+
+# Words between a negation and the contaminant it negates
+NEGATION_SCOPE = 4
+
+# Days since inoculation covered by the survival curves
+SURVIVAL_DAYS = 60
+
+# Label of records whose week, source or substrate is not recorded
+UNKNOWN = "(unknown)"
+
+# Dashboard label -> SQL selecting record ID, week, source, substrate, notes,
+# start julianday and last update julianday
+COHORT_RECORDS = {
+    "Grain Jars": f"""
+        SELECT g.jar_id, strftime('%Y-W%W', g.inoculation_date), g.source_id, '{UNKNOWN}',
+               g.contamination_notes, julianday(substr(g.inoculation_date, 1, 10)),
+               julianday(substr(g.updated_at, 1, 10))
+        FROM grain_jars g
+    """,
+    "Bulk Tubs": f"""
+        SELECT t.tub_id, strftime('%Y-W%W', t.date_to_bulk), j.source_id, t.substrate_type,
+               t.performance_notes, julianday(substr(t.date_to_bulk, 1, 10)),
+               julianday(substr(t.updated_at, 1, 10))
+        FROM bulk_tubs t
+        LEFT JOIN grain_jars j ON j.jar_id = t.spawn_source
+    """,
+}
+
+# Dashboard label -> ContaminationTable cohort column
+COHORTS = {
+    "Inoculation Week": "weeks",
+    "Source": "sources",
+    "Substrate": "substrates",
+}
+
+# Cohorts that apply to each kind of record (jars have no substrate)
+RECORD_COHORTS = {
+    "Grain Jars": ("Inoculation Week", "Source"),
+    "Bulk Tubs": ("Inoculation Week", "Source", "Substrate"),
+}
+
+# Cohort columns are (codes, labels) pairs as in yield_engine; days holds the
+# days from inoculation to contamination (or to today for clean records)
+ContaminationTable = namedtuple("ContaminationTable", "record_ids weeks sources substrates contaminated days")
+
+# One entry per cohort, in label order
+CohortRates = namedtuple("CohortRates", "labels counts contaminated rates")
+
+# survival: (cohorts, SURVIVAL_DAYS + 1) share still clean at the end of each
+# day, one row per label of CohortRates; overall: the same for all records
+SurvivalCurves = namedtuple("SurvivalCurves", "survival overall")
+
+CONTAMINATION_TABLE_COLUMNS = ("Cohort", "Records", "Contaminated", "Rate %")
+
+# Cohorts drawn on a survival chart, and the records a cohort needs to be
+# drawn (a rate of 1 in 1 says little)
+MAX_CHART_COHORTS = 6
+MIN_CHART_RECORDS = 5
+
+def _clauses(text):
+    """Yield the (start, end) offsets of each clause of a text"""
+    start = 0
+    for boundary in CLAUSE_PATTERN.finditer(text):
+        yield start, boundary.start()
+        start = boundary.end()
+    yield start, len(text)
+
+def is_contaminated(notes):
+    """Return True if notes report contamination that isn't negated"""
+    if not notes:
+        return False
+    text = notes.casefold()
+    for start, end in _clauses(text):
+        clause = text[start:end]
+        for match in CONTAMINANT_PATTERN.finditer(clause):
+            preceding = clause[:match.start()].split()[-NEGATION_SCOPE:]
+            if NEGATION_PATTERN.search(" ".join(preceding)):
+                continue
+            # Matched against the rest of the notes, as the answer can
+            # follow a clause break ("trich? no")
+            if TRAILING_NEGATION_PATTERN.match(text, start + match.end()):
+                continue
+            return True
+    return False
+
+def classify(notes):
+    """Return a bool array of is_contaminated() for a sequence of notes.
+
+    Notes repeat a lot, so each distinct text is classified once.
+    """
+    verdicts = {text: is_contaminated(text) for text in set(notes)}
+    return np.fromiter((verdicts[text] for text in notes), dtype=bool, count=len(notes))
+
+def load_contamination_table(db, records):
+    """Return a ContaminationTable of the records of a COHORT_RECORDS entry"""
+    db.cursor.execute("SELECT julianday(date('now', 'localtime'))")
+    today = db.cursor.fetchone()[0]
+    db.cursor.execute(COHORT_RECORDS[records])
+    columns = list(zip(*db.cursor.fetchall())) or [()] * 7
+    contaminated = classify(columns[4])
+    start = np.array(columns[5], dtype=float)
+    updated = np.array(columns[6], dtype=float)
+    days = np.where(contaminated, updated, today) - start
+    # Records without a usable start date can't be placed on the curves
+    days[np.isnan(days)] = -1
+    return ContaminationTable(
+        np.array(columns[0], dtype=object),
+        *(encode_labels([value or UNKNOWN for value in column]) for column in columns[1:4]),
+        contaminated,
+        np.clip(days, -1, None),
+    )
+
+def cohort_rates(cohort, contaminated):
+    """Return CohortRates of a (codes, labels) cohort column; empty cohorts are left out"""
+    codes, labels = cohort
+    counts = np.bincount(codes, minlength=len(labels))
+    bad = np.bincount(codes, weights=contaminated, minlength=len(labels)).astype(np.int64)
+    present = np.flatnonzero(counts)
+    return CohortRates([labels[code] for code in present], counts[present], bad[present],
+                       bad[present] / counts[present])
+
+def _kaplan_meier(codes, groups, days, events, horizon):
+    """Survival per group and whole day 0..horizon, every group at once.
+
+    Records leave the risk set on their day, contaminated or not; a record
+    still clean after `horizon` days stays at risk to the end.
+    """
+    observed = days >= 0
+    codes, days, events = codes[observed], days[observed], events[observed]
+    day = np.floor(days).astype(np.intp)
+    within = day <= horizon
+    width = horizon + 1
+    cells = codes[within] * width + day[within]
+    exits = np.bincount(cells, minlength=groups * width).reshape(groups, width)
+    deaths = np.bincount(cells, weights=events[within], minlength=groups * width).reshape(groups, width)
+    sizes = np.bincount(codes, minlength=groups)
+    # At risk on a day: everyone who had not left before it
+    at_risk = sizes[:, None] - np.cumsum(exits, axis=1) + exits
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hazard = np.where(at_risk > 0, deaths / at_risk, 0.0)
+    return np.cumprod(1.0 - hazard, axis=1)
+
+def survival_curves(cohort, contaminated, days, horizon=SURVIVAL_DAYS):
+    """Return the SurvivalCurves of a cohort column, rows matching cohort_rates()"""
+    codes, labels = cohort
+    present = np.flatnonzero(np.bincount(codes, minlength=len(labels)))
+    # Number the non-empty cohorts 0..n-1, in label order like cohort_rates()
+    renumber = np.full(len(labels), -1, dtype=np.intp)
+    renumber[present] = np.arange(len(present))
+    survival = _kaplan_meier(renumber[codes], len(present), days, contaminated, horizon)
+    overall = _kaplan_meier(np.zeros(len(codes), dtype=np.intp), 1, days, contaminated, horizon)[0]
+    return SurvivalCurves(survival, overall)
+
+def worst_cohorts(rates, limit, min_records=1):
+    """Indices of the `limit` cohorts of at least `min_records` records with
+    the highest contamination rate, highest first; larger cohorts break ties"""
+    eligible = np.flatnonzero(rates.counts >= min_records)
+    order = np.lexsort((-rates.counts[eligible], -rates.rates[eligible]))
+    return eligible[order][:limit]
+
+def cohort_rows(rates, indices):
+    """Rows of CONTAMINATION_TABLE_COLUMNS for the given cohorts, rounded for display"""
+    return [(rates.labels[index], int(rates.counts[index]), int(rates.contaminated[index]),
+             round(100 * float(rates.rates[index]), 1))
+            for index in indices]
@@ -1,15 +1,48 @@
 import tkinter as tk
 from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from datetime import datetime, timedelta
-import numpy as np # New import for numpy
+from database import PRIMARY_KEYS
+from chart_cache import ChartCache
+from chart_renderer import ChartRenderer
+from chart_data import RECORD_CATEGORIES, TIMELINE_DAYS
+from table_sorter import TreeviewSorter
+from yield_engine import (YIELD_TABLES, GROUPINGS, GROUP_TABLE_COLUMNS, INTERVAL_TABLE_COLUMNS, CONFIDENCE,
+                          chart_groups, largest_groups, group_rows, interval_rows)
+from strain_leaderboard import LINEAGE_TABLES, LEADERBOARD_COLUMNS, table_row
+from contamination import (CONTAMINATION_TABLES, COHORT_RECORDS, RECORD_COHORTS, CONTAMINATION_TABLE_COLUMNS,
+                           MAX_CHART_COHORTS, MIN_CHART_RECORDS, SURVIVAL_DAYS, worst_cohorts, cohort_rows)
+
+# Tables each chart (and the Overview) reads; changes elsewhere don't redraw it
+ALL_TABLES = tuple(PRIMARY_KEYS)
+CHART_TABLES = {
+    'summary': ALL_TABLES,
+    'record_distribution': ALL_TABLES,
+    'growth_timeline': ('grain_jars',),
+    'statistics': ('grain_jars',),
+    'yield_analysis': ('bulk_tubs',),
+    'yield_breakdown': YIELD_TABLES,
+    'yield_comparison': YIELD_TABLES,
+    'leaderboard': LINEAGE_TABLES,
+    'contamination_cohorts': CONTAMINATION_TABLES,
+}
+
+# Groups listed in the Yield Breakdown table
+MAX_TABLE_GROUPS = 500
+
+# Cohorts listed in the Contamination Cohorts table
+MAX_TABLE_COHORTS = 500
+
+# Ancestors listed on the Strain Leaderboard
+MAX_LEADERBOARD_ROWS = 500
 
 class DashboardTab(ttk.Frame):
     def __init__(self, parent, db):
         super().__init__(parent)
         self.db = db
-        self.figures = {} # To store matplotlib figures
+        self.chart_cache = ChartCache(db)
+        # Charts are drawn on the renderer's worker thread; a dropped update
+        # must be redone the next time its sub-tab is shown
+        self.renderer = ChartRenderer(self, on_cancel=self.chart_cache.invalidate)
         self.setup_ui()
 
     def setup_ui(self):
@@ -43,52 +76,114 @@ class DashboardTab(ttk.Frame):
         self.total_clones_label = ttk.Label(self.summary_frame, text="Total Clones: ")
         self.total_clones_label.pack(anchor=tk.W, padx=10, pady=2)
 
-        self.load_summary_data()
+        # Grain jars forecast to finish colonizing soonest
+        self.forecast_frame = ttk.LabelFrame(self.summary_tab, text="Upcoming Jar Completions")
+        self.forecast_frame.pack(fill=tk.X, padx=10, pady=10)
+
+        self.forecast_due_label = ttk.Label(self.forecast_frame, text="Due in the Next 7 Days: ")
+        self.forecast_due_label.pack(anchor=tk.W, padx=10, pady=2)
+
+        self.forecast_tree = ttk.Treeview(self.forecast_frame, columns=("Jar ID", "Est. Complete"),
+                                          show="headings", height=8)
+        for col in ("Jar ID", "Est. Complete"):
+            self.forecast_tree.heading(col, text=col)
+            self.forecast_tree.column(col, width=140, anchor="center")
+        self.forecast_tree.pack(fill=tk.X, padx=10, pady=5)
+
+        self.refresh_summary()
 
         # Visualizations tab (now a notebook)
         self.visualizations_notebook = ttk.Notebook(self.notebook) # Nested notebook
         self.notebook.add(self.visualizations_notebook, text="Visualizations")
 
-        # Sub-tabs within Visualizations
+        # Sub-tabs within Visualizations. Their charts (and matplotlib itself)
+        # are only created the first time a sub-tab is shown.
         self.record_distribution_tab = ttk.Frame(self.visualizations_notebook)
         self.visualizations_notebook.add(self.record_distribution_tab, text="Record Distribution")
-        self.setup_record_distribution_chart()
 
         self.growth_timeline_tab = ttk.Frame(self.visualizations_notebook)
         self.visualizations_notebook.add(self.growth_timeline_tab, text="Growth Timeline")
-        self.setup_growth_timeline_chart()
 
         self.statistics_tab = ttk.Frame(self.visualizations_notebook) # New sub-tab
         self.visualizations_notebook.add(self.statistics_tab, text="Statistics")
-        self.setup_statistics_chart()
 
         self.yield_analysis_tab = ttk.Frame(self.visualizations_notebook) # New sub-tab
         self.visualizations_notebook.add(self.yield_analysis_tab, text="Yield Analysis")
-        self.setup_yield_analysis_chart()
 
-        # Bind internal tab change event
+        self.yield_breakdown_tab = ttk.Frame(self.visualizations_notebook)
+        self.visualizations_notebook.add(self.yield_breakdown_tab, text="Yield Breakdown")
+        self.setup_yield_breakdown_controls()
+
+        self.yield_comparison_tab = ttk.Frame(self.visualizations_notebook)
+        self.visualizations_notebook.add(self.yield_comparison_tab, text="Substrate Comparison")
+        self.setup_yield_comparison_controls()
+
+        self.contamination_tab = ttk.Frame(self.visualizations_notebook)
+        self.visualizations_notebook.add(self.contamination_tab, text="Contamination Cohorts")
+        self.setup_contamination_controls()
+
+        # Sub-tab name -> (figure key, setup function, refresh function)
+        self.chart_tabs = {
+            "Record Distribution": ('record_distribution', self.setup_record_distribution_chart, self.refresh_record_distribution_chart),
+            "Growth Timeline": ('growth_timeline', self.setup_growth_timeline_chart, self.refresh_growth_timeline_chart),
+            "Statistics": ('statistics', self.setup_statistics_chart, self.refresh_statistics_chart),
+            "Yield Analysis": ('yield_analysis', self.setup_yield_analysis_chart, self.refresh_yield_analysis_chart),
+            "Yield Breakdown": ('yield_breakdown', self.setup_yield_breakdown_chart, self.refresh_yield_breakdown_chart),
+            "Substrate Comparison": ('yield_comparison', self.setup_yield_comparison_chart, self.refresh_yield_comparison_chart),
+            "Contamination Cohorts": ('contamination_cohorts', self.setup_contamination_chart, self.refresh_contamination_chart),
+        }
+
+        self.setup_leaderboard()
+
+        # Bind tab change events of both notebooks
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_internal_tab_change)
         self.visualizations_notebook.bind('<<NotebookTabChanged>>', self.on_internal_tab_change)
 
     def on_internal_tab_change(self, event):
-        current_tab = self.visualizations_notebook.select() # Changed to use internal notebook
+        self.refresh_leaderboard()
+        self.refresh_visible_chart()
+
+    def refresh_visible_chart(self):
+        """Build or refresh the chart on the visible Visualizations sub-tab"""
+        if self.notebook.tab(self.notebook.select(), "text") != "Visualizations":
+            self.renderer.show(None)
+            return
+        current_tab = self.visualizations_notebook.select()
         tab_name = self.visualizations_notebook.tab(current_tab, "text")
-        if tab_name == "Record Distribution":
-            self.refresh_record_distribution_chart()
-        elif tab_name == "Growth Timeline":
-            self.refresh_growth_timeline_chart()
-        elif tab_name == "Statistics": # New condition
-            self.refresh_statistics_chart()
-        elif tab_name == "Yield Analysis": # New condition
-            self.refresh_yield_analysis_chart()
-        # Add more conditions for other visualization tabs as they are added
+        if tab_name in self.chart_tabs:
+            figure_key, setup_chart, refresh_chart = self.chart_tabs[tab_name]
+            # Renders still queued for the sub-tab being left are cancelled
+            self.renderer.show(figure_key)
+            if self.chart_cache.is_current(figure_key, CHART_TABLES[figure_key]):
+                return  # Nothing changed; the canvas still shows the last render
+            try:
+                if figure_key in self.renderer.views:
+                    refresh_chart()
+                else:
+                    setup_chart()
+            except Exception:
+                self.chart_cache.invalidate(figure_key)
+                raise
+
+    def add_chart(self, figure_key, master, build, ncols=1, figsize=(10, 6)):
+        """Show a chart in `master`. `build(figure)` runs on the render thread,
+        after matplotlib is imported and the axes are created, and returns the
+        chart object(s) that refresh updates are applied to."""
+        def build_figure(fig):
+            import matplotlib
+            matplotlib.rcParams.update({'font.size': 10})
+            fig.subplots(1, ncols)
+            return build(fig)
+        self.renderer.add_view(figure_key, master, build_figure, figsize)
+
+    def refresh_summary(self):
+        """Reload the Overview unless no records changed since it was loaded"""
+        if not self.chart_cache.is_current('summary', CHART_TABLES['summary']):
+            self.load_summary_data()
 
     def load_summary_data(self):
-        # Fetch counts from the database
-        total_agar = self.db.cursor.execute("SELECT COUNT(*) FROM agar_plates").fetchone()[0]
-        total_liquid = self.db.cursor.execute("SELECT COUNT(*) FROM liquid_cultures").fetchone()[0]
-        total_grain = self.db.cursor.execute("SELECT COUNT(*) FROM grain_jars").fetchone()[0]
-        total_bulk = self.db.cursor.execute("SELECT COUNT(*) FROM bulk_tubs").fetchone()[0]
-        total_clones = self.db.cursor.execute("SELECT COUNT(*) FROM clone_library WHERE archived = 0").fetchone()[0]
+        # Counts in RECORD_CATEGORIES order, shared with the Record Distribution chart
+        total_agar, total_liquid, total_grain, total_bulk, total_clones = self.db.chart_data.record_counts()
 
         self.total_agar_plates_label.config(text=f"Total Agar Plates: {total_agar}")
         self.total_liquid_cultures_label.config(text=f"Total Liquid Cultures: {total_liquid}")
@@ -96,225 +191,314 @@ class DashboardTab(ttk.Frame):
         self.total_bulk_tubs_label.config(text=f"Total Bulk Tubs: {total_bulk}")
         self.total_clones_label.config(text=f"Total Clones: {total_clones}")
 
+        # Forecast completion dates, soonest first
+        upcoming = sorted(self.db.chart_data.completion_forecast().items(), key=lambda item: item[1])
+        week_ahead = (datetime.now() + timedelta(days=7)).date().isoformat()
+        due_soon = sum(1 for _, completion in upcoming if completion <= week_ahead)
+        self.forecast_due_label.config(text=f"Due in the Next 7 Days: {due_soon}")
+        self.forecast_tree.delete(*self.forecast_tree.get_children())
+        for jar_id, completion in upcoming[:8]:
+            self.forecast_tree.insert("", tk.END, values=(jar_id, completion))
+
     def setup_record_distribution_chart(self):
-        plt.rcParams.update({'font.size': 10})
-        fig, ax = plt.subplots(figsize=(6, 6))
-        self.figures['record_distribution'] = fig
-        canvas = FigureCanvasTkAgg(fig, master=self.record_distribution_tab) # Changed master
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        def build(fig):
+            from charts import PieChart
+            return PieChart(fig.axes[0], list(RECORD_CATEGORIES), 'Record Distribution by Category', start_angle=90)
+        self.add_chart('record_distribution', self.record_distribution_tab, build, figsize=(6, 6))
         self.refresh_record_distribution_chart()
 
     def refresh_record_distribution_chart(self):
-        fig = self.figures['record_distribution']
-        ax = fig.axes[0]
-        ax.clear()
-
-        # Fetch counts from the database
-        counts = {
-            "Agar Plates": self.db.cursor.execute("SELECT COUNT(*) FROM agar_plates").fetchone()[0],
-            "Liquid Cultures": self.db.cursor.execute("SELECT COUNT(*) FROM liquid_cultures").fetchone()[0],
-            "Grain Jars": self.db.cursor.execute("SELECT COUNT(*) FROM grain_jars").fetchone()[0],
-            "Bulk Tubs": self.db.cursor.execute("SELECT COUNT(*) FROM bulk_tubs").fetchone()[0],
-            "Clone Library": self.db.cursor.execute("SELECT COUNT(*) FROM clone_library WHERE archived = 0").fetchone()[0]
-        }
-
-        labels = [k for k, v in counts.items() if v > 0]
-        sizes = [v for k, v in counts.items() if v > 0]
-
-        if sizes:
-            ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
-            ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
-            ax.set_title('Record Distribution by Category')
-        else:
-            ax.text(0.5, 0.5, 'No data available',
-                   horizontalalignment='center',
-                   verticalalignment='center',
-                   transform=ax.transAxes)
-            ax.set_title('Record Distribution by Category')
-
-        fig.tight_layout()
-        fig.canvas.draw()
+        counts = self.db.chart_data.record_counts()
+        self.renderer.submit('record_distribution', lambda chart: chart.update(counts))
 
     def setup_growth_timeline_chart(self):
-        plt.rcParams.update({'font.size': 10})
-        fig, ax = plt.subplots(figsize=(10, 6))
-        self.figures['growth_timeline'] = fig
-        canvas = FigureCanvasTkAgg(fig, master=self.growth_timeline_tab)
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        def build(fig):
+            from charts import GrowthTimelineChart
+            return GrowthTimelineChart(fig.axes[0])
+        self.add_chart('growth_timeline', self.growth_timeline_tab, build)
         self.refresh_growth_timeline_chart()
 
     def refresh_growth_timeline_chart(self):
-        fig = self.figures['growth_timeline']
-        ax = fig.axes[0]
-        ax.clear()
-
-        # Get data for the last 30 days (or all data if less than 30 days)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-        
-        self.db.cursor.execute('''
-            SELECT inoculation_date, colonization_percentage
-            FROM grain_jars
-            WHERE inoculation_date >= ?
-            ORDER BY inoculation_date
-        ''', (start_date.isoformat(),))
-        
-        data = self.db.cursor.fetchall()
-        
-        if data:
-            dates = [datetime.fromisoformat(row[0]) for row in data]
-            percentages = [row[1] for row in data]
-
-            # Plot data
-            ax.plot(dates, percentages, 'b-', marker='o')
-            ax.set_title('Colonization Progress (Last 30 Days)')
-            ax.set_xlabel('Date')
-            ax.set_ylabel('Colonization %')
-            ax.grid(True)
-            
-            # Rotate x-axis labels for better readability
-            fig.autofmt_xdate() # Auto-format dates
+        # Growth curves of the jars inoculated in the last 30 days
+        timeline = self.db.chart_data.growth_timeline()
+        if timeline.curves:
+            title = f'Colonization Progress of {len(timeline.curves)} Jars (Last {TIMELINE_DAYS} Days)'
         else:
-            ax.text(0.5, 0.5, 'No data available for the last 30 days',
-                   horizontalalignment='center',
-                   verticalalignment='center',
-                   transform=ax.transAxes)
-            ax.set_title('Colonization Progress (Last 30 Days)')
-        
-        fig.tight_layout()
-        fig.canvas.draw()
+            title = f'Colonization Progress (Last {TIMELINE_DAYS} Days)'
+        self.renderer.submit('growth_timeline',
+                             lambda chart: chart.update(timeline.curves, timeline.mean_curve, title))
 
     def setup_statistics_chart(self):
-        plt.rcParams.update({'font.size': 10})
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
-        self.figures['statistics'] = fig
-        canvas = FigureCanvasTkAgg(fig, master=self.statistics_tab)
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        def build(fig):
+            from charts import PieChart, HistogramChart
+            ax1, ax2 = fig.axes
+            return (PieChart(ax1, ['Contaminated', 'Clean'], 'Contamination Rate (Grain Jars)',
+                             colors=['#ff9999', '#66b3ff']),
+                    HistogramChart(ax2, 'Colonization Speed Distribution (Grain Jars)',
+                                   'Days to Colonize', 'Number of Jars'))
+        self.add_chart('statistics', self.statistics_tab, build, ncols=2, figsize=(12, 6))
         self.refresh_statistics_chart()
 
     def refresh_statistics_chart(self):
-        fig = self.figures['statistics']
-        ax1, ax2 = fig.axes
-        ax1.clear()
-        ax2.clear()
-
-        # Contamination rate pie chart
-        self.db.cursor.execute('''
-            SELECT 
-                COUNT(CASE WHEN contamination_notes != '' THEN 1 END) as contaminated,
-                COUNT(CASE WHEN contamination_notes = '' OR contamination_notes IS NULL THEN 1 END) as clean
-            FROM grain_jars
-        ''')
-        contaminated, clean = self.db.cursor.fetchone()
-        
-        if contaminated + clean > 0:
-            ax1.pie([contaminated, clean], 
-                    labels=['Contaminated', 'Clean'],
-                    autopct='%1.1f%%',
-                    colors=['#ff9999', '#66b3ff'])
-            ax1.set_title('Contamination Rate (Grain Jars)')
-        else:
-            ax1.text(0.5, 0.5, 'No data available',
-                    horizontalalignment='center',
-                    verticalalignment='center',
-                    transform=ax1.transAxes)
-            ax1.set_title('Contamination Rate (Grain Jars)')
-
-        # Colonization speed histogram
-        self.db.cursor.execute('''
-            SELECT 
-                JULIANDAY(shake_date) - JULIANDAY(inoculation_date) as days_to_colonize
-            FROM grain_jars
-            WHERE shake_date IS NOT NULL AND inoculation_date IS NOT NULL
-        ''')
-        days_data = [row[0] for row in self.db.cursor.fetchall() if row[0] is not None]
-        
-        if days_data:
-            ax2.hist(days_data, bins=10, color='green', alpha=0.7)
-            ax2.set_title('Colonization Speed Distribution (Grain Jars)')
-            ax2.set_xlabel('Days to Colonize')
-            ax2.set_ylabel('Number of Jars')
-            ax2.grid(True)
-        else:
-            ax2.text(0.5, 0.5, 'No data available',
-                    horizontalalignment='center',
-                    verticalalignment='center',
-                    transform=ax2.transAxes)
-            ax2.set_title('Colonization Speed Distribution (Grain Jars)')
+        # Contamination rate pie chart and colonization speed histogram
+        contamination_counts = self.db.chart_data.contamination_counts()
+        days_data = self.db.chart_data.colonization_days()
 
-        fig.tight_layout()
-        fig.canvas.draw()
+        def update(charts):
+            contamination_chart, speed_chart = charts
+            contamination_chart.update(contamination_counts)
+            speed_chart.update(days_data)
+        self.renderer.submit('statistics', update)
 
     def setup_yield_analysis_chart(self):
-        plt.rcParams.update({'font.size': 10})
-        fig, ax = plt.subplots(figsize=(10, 6))
-        self.figures['yield_analysis'] = fig
-        canvas = FigureCanvasTkAgg(fig, master=self.yield_analysis_tab)
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        def build(fig):
+            from charts import StackedBarChart, FLUSH_SERIES
+            chart = StackedBarChart(
+                fig.axes[0], FLUSH_SERIES,
+                'Yield by Flush (Bulk Tubs)', 'Date to Bulk', 'Harvest Weight (g)')
+            # Rotate x-axis labels for better readability
+            fig.autofmt_xdate()
+            return chart
+        self.add_chart('yield_analysis', self.yield_analysis_tab, build)
         self.refresh_yield_analysis_chart()
 
     def refresh_yield_analysis_chart(self):
-        fig = self.figures['yield_analysis']
-        ax = fig.axes[0]
-        ax.clear()
-
-        # Get yield data from bulk tubs
-        self.db.cursor.execute('''
-            SELECT 
-                date_to_bulk,
-                harvest_weight_flush1,
-                harvest_weight_flush2,
-                harvest_weight_flush3
-            FROM bulk_tubs
-            WHERE date_to_bulk IS NOT NULL
-            ORDER BY date_to_bulk
-        ''')
-        
-        data = self.db.cursor.fetchall()
-        
-        if data:
-            dates = [datetime.fromisoformat(row[0]) for row in data]
-            flush1 = [row[1] or 0 for row in data]
-            flush2 = [row[2] or 0 for row in data]
-            flush3 = [row[3] or 0 for row in data]
-
-            # Plot stacked bar chart
-            ax.bar(dates, flush1, label='Flush 1', color='#2ecc71')
-            ax.bar(dates, flush2, bottom=flush1, label='Flush 2', color='#3498db')
-            ax.bar(dates, flush3, bottom=[f1 + f2 for f1, f2 in zip(flush1, flush2)], 
-                   label='Flush 3', color='#9b59b6')
-
-            ax.set_title('Yield by Flush (Bulk Tubs)')
-            ax.set_xlabel('Date to Bulk')
-            ax.set_ylabel('Harvest Weight (g)')
-            ax.legend()
-            ax.grid(True)
-            
-            # Rotate x-axis labels for better readability
-            fig.autofmt_xdate()
+        yields = self.db.chart_data.flush_yields()
+        self.renderer.submit('yield_analysis', lambda chart: chart.update(yields.dates, yields.weights.T))
+
+    def setup_yield_breakdown_controls(self):
+        controls = ttk.Frame(self.yield_breakdown_tab)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Label(controls, text="Group by:").pack(side=tk.LEFT)
+        self.yield_grouping_var = tk.StringVar(value="Strain")
+        grouping_box = ttk.Combobox(controls, textvariable=self.yield_grouping_var, values=list(GROUPINGS),
+                                    state="readonly", width=15)
+        grouping_box.pack(side=tk.LEFT, padx=5)
+        grouping_box.bind("<<ComboboxSelected>>", self.on_yield_grouping_change)
+
+        # The chart is added above the table when the sub-tab is first shown
+        self.yield_chart_frame = ttk.Frame(self.yield_breakdown_tab)
+        self.yield_chart_frame.pack(fill=tk.BOTH, expand=True)
+
+        table_frame = ttk.Frame(self.yield_breakdown_tab)
+        table_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.yield_tree = ttk.Treeview(table_frame, columns=GROUP_TABLE_COLUMNS, show="headings", height=8)
+        for col in GROUP_TABLE_COLUMNS:
+            self.yield_tree.column(col, width=140 if col == "Group" else 80, anchor=tk.W if col == "Group" else tk.E)
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.yield_tree.yview)
+        self.yield_tree.configure(yscrollcommand=scrollbar.set)
+        self.yield_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.yield_sorter = TreeviewSorter(self.yield_tree, GROUP_TABLE_COLUMNS,
+                                           ["text", "int"] + ["float"] * (len(GROUP_TABLE_COLUMNS) - 2))
+        for col in GROUP_TABLE_COLUMNS:
+            self.yield_tree.heading(col, text=col)
+
+    def on_yield_grouping_change(self, event):
+        self.chart_cache.invalidate('yield_breakdown')
+        self.refresh_visible_chart()
+
+    def setup_yield_breakdown_chart(self):
+        def build(fig):
+            from charts import GroupedYieldChart, FLUSH_SERIES
+            return GroupedYieldChart(fig.axes[0], FLUSH_SERIES, 'Yield per Tub (g)')
+        self.add_chart('yield_breakdown', self.yield_chart_frame, build)
+        self.refresh_yield_breakdown_chart()
+
+    def refresh_yield_breakdown_chart(self):
+        grouping_label = self.yield_grouping_var.get()
+        grouping = GROUPINGS[grouping_label]
+        groups = self.db.chart_data.yield_groups(grouping)
+
+        shown = chart_groups(groups, grouping)
+        title = f'Mean Yield per Tub by {grouping_label}'
+        if len(shown) < len(groups.labels):
+            title += f' ({len(shown)} of {len(groups.labels)})'
+        labels = [groups.labels[index] for index in shown]
+        means, ratios, percentiles = groups.means[shown], groups.flush_ratios[shown], groups.percentiles[shown]
+        self.renderer.submit('yield_breakdown',
+                             lambda chart: chart.update(labels, means, ratios, percentiles, title))
+
+        # Table of the groups with the largest total yield
+        self.yield_sorter.clear()
+        rows = group_rows(groups, largest_groups(groups, MAX_TABLE_GROUPS))
+        for row in rows:
+            self.yield_tree.insert("", tk.END, iid=row[0], values=row)
+        self.yield_sorter.set_records([row[0] for row in rows], rows)
+        self.yield_sorter.apply()
+
+    def setup_yield_comparison_controls(self):
+        controls = ttk.Frame(self.yield_comparison_tab)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Label(controls, text="Compare by:").pack(side=tk.LEFT)
+        self.comparison_grouping_var = tk.StringVar(value="Substrate")
+        grouping_box = ttk.Combobox(controls, textvariable=self.comparison_grouping_var, values=list(GROUPINGS),
+                                    state="readonly", width=15)
+        grouping_box.pack(side=tk.LEFT, padx=5)
+        grouping_box.bind("<<ComboboxSelected>>", self.on_comparison_grouping_change)
+
+        # The chart is added above the table when the sub-tab is first shown
+        self.comparison_chart_frame = ttk.Frame(self.yield_comparison_tab)
+        self.comparison_chart_frame.pack(fill=tk.BOTH, expand=True)
+
+        table_frame = ttk.Frame(self.yield_comparison_tab)
+        table_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.comparison_tree = ttk.Treeview(table_frame, columns=INTERVAL_TABLE_COLUMNS, show="headings", height=8)
+        for col in INTERVAL_TABLE_COLUMNS:
+            self.comparison_tree.column(col, width=160 if col == "Group" else 100,
+                                        anchor=tk.W if col == "Group" else tk.E)
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.comparison_tree.yview)
+        self.comparison_tree.configure(yscrollcommand=scrollbar.set)
+        self.comparison_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.comparison_sorter = TreeviewSorter(self.comparison_tree, INTERVAL_TABLE_COLUMNS,
+                                                ["text", "int", "float", "float", "float"])
+        for col in INTERVAL_TABLE_COLUMNS:
+            self.comparison_tree.heading(col, text=col)
+
+    def on_comparison_grouping_change(self, event):
+        self.chart_cache.invalidate('yield_comparison')
+        self.refresh_visible_chart()
+
+    def setup_yield_comparison_chart(self):
+        def build(fig):
+            from charts import IntervalChart
+            return IntervalChart(fig.axes[0], f'Mean Yield per Tub (g), {CONFIDENCE:.0%} Bootstrap Interval')
+        self.add_chart('yield_comparison', self.comparison_chart_frame, build)
+        self.refresh_yield_comparison_chart()
+
+    def refresh_yield_comparison_chart(self):
+        grouping_label = self.comparison_grouping_var.get()
+        intervals = self.db.chart_data.yield_intervals(GROUPINGS[grouping_label])
+        title = f'Mean Yield per Tub by {grouping_label}'
+        self.renderer.submit('yield_comparison', lambda chart: chart.update(
+            intervals.labels, intervals.means, intervals.lower, intervals.upper, title))
+
+        self.comparison_sorter.clear()
+        rows = interval_rows(intervals)
+        for row in rows:
+            self.comparison_tree.insert("", tk.END, iid=row[0], values=row)
+        self.comparison_sorter.set_records([row[0] for row in rows], rows)
+        self.comparison_sorter.apply()
+
+    def setup_contamination_controls(self):
+        controls = ttk.Frame(self.contamination_tab)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Label(controls, text="Records:").pack(side=tk.LEFT)
+        self.contamination_records_var = tk.StringVar(value="Grain Jars")
+        records_box = ttk.Combobox(controls, textvariable=self.contamination_records_var,
+                                   values=list(COHORT_RECORDS), state="readonly", width=12)
+        records_box.pack(side=tk.LEFT, padx=5)
+        records_box.bind("<<ComboboxSelected>>", self.on_contamination_records_change)
+        ttk.Label(controls, text="Cohort:").pack(side=tk.LEFT, padx=(10, 0))
+        self.contamination_cohort_var = tk.StringVar(value="Source")
+        self.contamination_cohort_box = ttk.Combobox(controls, textvariable=self.contamination_cohort_var,
+                                                     values=list(RECORD_COHORTS["Grain Jars"]),
+                                                     state="readonly", width=16)
+        self.contamination_cohort_box.pack(side=tk.LEFT, padx=5)
+        self.contamination_cohort_box.bind("<<ComboboxSelected>>", self.on_contamination_cohort_change)
+
+        # The chart is added above the table when the sub-tab is first shown
+        self.contamination_chart_frame = ttk.Frame(self.contamination_tab)
+        self.contamination_chart_frame.pack(fill=tk.BOTH, expand=True)
+
+        table_frame = ttk.Frame(self.contamination_tab)
+        table_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.contamination_tree = ttk.Treeview(table_frame, columns=CONTAMINATION_TABLE_COLUMNS,
+                                               show="headings", height=8)
+        for col in CONTAMINATION_TABLE_COLUMNS:
+            self.contamination_tree.column(col, width=160 if col == "Cohort" else 100,
+                                           anchor=tk.W if col == "Cohort" else tk.E)
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.contamination_tree.yview)
+        self.contamination_tree.configure(yscrollcommand=scrollbar.set)
+        self.contamination_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.contamination_sorter = TreeviewSorter(self.contamination_tree, CONTAMINATION_TABLE_COLUMNS,
+                                                   ["text", "int", "int", "float"])
+        for col in CONTAMINATION_TABLE_COLUMNS:
+            self.contamination_tree.heading(col, text=col)
+
+    def on_contamination_records_change(self, event):
+        cohorts = RECORD_COHORTS[self.contamination_records_var.get()]
+        self.contamination_cohort_box.configure(values=list(cohorts))
+        if self.contamination_cohort_var.get() not in cohorts:
+            self.contamination_cohort_var.set(cohorts[0])
+        self.on_contamination_cohort_change(event)
+
+    def on_contamination_cohort_change(self, event):
+        self.chart_cache.invalidate('contamination_cohorts')
+        self.refresh_visible_chart()
+
+    def setup_contamination_chart(self):
+        def build(fig):
+            from charts import SurvivalChart
+            return SurvivalChart(fig.axes[0], MAX_CHART_COHORTS)
+        self.add_chart('contamination_cohorts', self.contamination_chart_frame, build)
+        self.refresh_contamination_chart()
+
+    def refresh_contamination_chart(self):
+        records, cohort = self.contamination_records_var.get(), self.contamination_cohort_var.get()
+        rates, curves = self.db.chart_data.contamination_cohorts(records, cohort)
+
+        # The cohorts most worth a look: highest rate among those large enough
+        shown = worst_cohorts(rates, MAX_CHART_COHORTS, MIN_CHART_RECORDS)
+        lines = [(f'{rates.labels[index]} ({100 * rates.rates[index]:.0f}%)', curves.survival[index])
+                 for index in shown]
+        title = f'{records} Still Clean by {cohort} (Highest Contamination Rates)'
+        if rates.labels:
+            days, overall = list(range(SURVIVAL_DAYS + 1)), curves.overall
         else:
-            ax.text(0.5, 0.5, 'No yield data available',
-                   horizontalalignment='center',
-                   verticalalignment='center',
-                   transform=ax.transAxes)
-            ax.set_title('Yield by Flush (Bulk Tubs)')
-        
-        fig.tight_layout()
-        fig.canvas.draw()
+            days, overall = [], []
+        self.renderer.submit('contamination_cohorts', lambda chart: chart.update(days, lines, overall, title))
+
+        self.contamination_sorter.clear()
+        rows = cohort_rows(rates, worst_cohorts(rates, MAX_TABLE_COHORTS))
+        for row in rows:
+            self.contamination_tree.insert("", tk.END, iid=row[0], values=row)
+        self.contamination_sorter.set_records([row[0] for row in rows], rows)
+        self.contamination_sorter.apply()
+
+    def setup_leaderboard(self):
+        self.leaderboard_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.leaderboard_tab, text="Strain Leaderboard")
+        ttk.Label(self.leaderboard_tab,
+                  text="Results of everything descended from each clone or agar plate, "
+                       "through its liquid cultures, grain jars and bulk tubs").pack(anchor=tk.W, padx=10, pady=5)
+
+        table_frame = ttk.Frame(self.leaderboard_tab)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.leaderboard_tree = ttk.Treeview(table_frame, columns=LEADERBOARD_COLUMNS, show="headings")
+        for col in LEADERBOARD_COLUMNS:
+            self.leaderboard_tree.column(col, width=110 if col in ("Ancestor", "Strain") else 90,
+                                         anchor=tk.W if col in ("Ancestor", "Type", "Strain") else tk.E)
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.leaderboard_tree.yview)
+        self.leaderboard_tree.configure(yscrollcommand=scrollbar.set)
+        self.leaderboard_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.leaderboard_sorter = TreeviewSorter(self.leaderboard_tree, LEADERBOARD_COLUMNS,
+                                                 ["text"] * 3 + ["int", "float", "float", "int", "int", "float", "float"])
+        for col in LEADERBOARD_COLUMNS:
+            self.leaderboard_tree.heading(col, text=col)
+
+    def refresh_leaderboard(self):
+        """Reload the Strain Leaderboard if it is shown and its data changed"""
+        if self.notebook.tab(self.notebook.select(), "text") != "Strain Leaderboard":
+            return
+        if self.chart_cache.is_current('leaderboard', CHART_TABLES['leaderboard']):
+            return
+        try:
+            rows = [table_row(row) for row in self.db.strain_leaderboard.rows(MAX_LEADERBOARD_ROWS)]
+        except Exception:
+            self.chart_cache.invalidate('leaderboard')
+            raise
+        self.leaderboard_sorter.clear()
+        for row in rows:
+            self.leaderboard_tree.insert("", tk.END, iid=row[0], values=row)
+        self.leaderboard_sorter.set_records([row[0] for row in rows], rows)
+        self.leaderboard_sorter.apply()
 
     def refresh(self):
-        self.load_summary_data()
+        self.refresh_summary()
+        self.refresh_leaderboard()
         # Refresh the currently visible sub-tab within the dashboard
-        current_main_tab_name = self.notebook.tab(self.notebook.select(), "text")
-        if current_main_tab_name == "Visualizations":
-            current_sub_tab = self.visualizations_notebook.select()
-            sub_tab_name = self.visualizations_notebook.tab(current_sub_tab, "text")
-            if sub_tab_name == "Record Distribution":
-                self.refresh_record_distribution_chart()
-            elif sub_tab_name == "Growth Timeline":
-                self.refresh_growth_timeline_chart()
-            elif sub_tab_name == "Statistics": # New refresh call
-                self.refresh_statistics_chart()
-            elif sub_tab_name == "Yield Analysis": # New refresh call
-                self.refresh_yield_analysis_chart()
-            # Add more refresh calls for other visualization tabs as they are added 
\ No newline at end of file
+        self.refresh_visible_chart()
@@ -1,12 +1,175 @@
+import os
 import sqlite3
 from datetime import datetime
 
+# Column names and value types for each record table, in schema order.
+# Types are one of "text", "date", "int", "float" or "timestamp" and are used
+# wherever values need typed handling outside of SQLite (e.g. sorting).
+TABLE_COLUMNS = {
+    "agar_plates": [
+        ("plate_id", "text"), ("strain_name", "text"), ("date_inoculated", "date"),
+        ("growth_description", "text"), ("contamination_notes", "text"),
+        ("created_at", "timestamp"), ("updated_at", "timestamp"),
+    ],
+    "liquid_cultures": [
+        ("lc_id", "text"), ("source_id", "text"), ("strain_name", "text"),
+        ("inoculation_date", "date"), ("growth_description", "text"), ("viability", "text"),
+        ("volume_remaining", "float"), ("created_at", "timestamp"), ("updated_at", "timestamp"),
+    ],
+    "grain_jars": [
+        ("jar_id", "text"), ("source_id", "text"), ("inoculation_date", "date"),
+        ("colonization_percentage", "int"), ("shake_date", "date"), ("contamination_notes", "text"),
+        ("created_at", "timestamp"), ("updated_at", "timestamp"),
+    ],
+    "bulk_tubs": [
+        ("tub_id", "text"), ("spawn_source", "text"), ("substrate_type", "text"),
+        ("date_to_bulk", "date"), ("first_pins_date", "date"), ("harvest_weight_flush1", "float"),
+        ("harvest_weight_flush2", "float"), ("harvest_weight_flush3", "float"),
+        ("performance_notes", "text"), ("created_at", "timestamp"), ("updated_at", "timestamp"),
+    ],
+    "clone_library": [
+        ("clone_id", "text"), ("parent_strain", "text"), ("date_taken", "date"),
+        ("tissue_source", "text"), ("growth_characteristics", "text"), ("performance_notes", "text"),
+        ("archived", "int"), ("created_at", "timestamp"), ("updated_at", "timestamp"),
+    ],
+}
+
+PRIMARY_KEYS = {
+    "agar_plates": "plate_id",
+    "liquid_cultures": "lc_id",
+    "grain_jars": "jar_id",
+    "bulk_tubs": "tub_id",
+    "clone_library": "clone_id",
+}
+
+# Columns of each record table that the global search indexes, besides the ID
+SEARCH_COLUMNS = {
+    "agar_plates": ("strain_name", "growth_description", "contamination_notes"),
+    "liquid_cultures": ("source_id", "strain_name", "growth_description", "viability"),
+    "grain_jars": ("source_id", "contamination_notes"),
+    "bulk_tubs": ("spawn_source", "substrate_type", "performance_notes"),
+    "clone_library": ("parent_strain", "tissue_source", "growth_characteristics", "performance_notes"),
+}
+
+# Flag columns whose set records are left out of the global search, as
+# their tabs don't list them
+SEARCH_HIDDEN_FLAGS = {
+    "clone_library": "archived",
+}
+
+# Number of batch operations per table that can still be undone
+UNDO_HISTORY_SIZE = 20
+
+# Number of change_log entries kept when the database is opened
+CHANGE_LOG_SIZE = 200000
+
+# mL of liquid culture used per inoculated grain jar, unless LC_VOLUME_PER_JAR
+# is set in the environment (.env)
+DEFAULT_LC_VOLUME_PER_JAR = 10.0
+
+def lc_volume_per_jar():
+    """Return the configured mL of liquid culture debited per inoculated jar"""
+    try:
+        return float(os.getenv("LC_VOLUME_PER_JAR", DEFAULT_LC_VOLUME_PER_JAR))
+    except ValueError:
+        return DEFAULT_LC_VOLUME_PER_JAR
+
+# Descriptions of the ledger entries that credit a deleted jar's LC volume
+# back, and that debit it again when the delete is undone
+JAR_DELETED = "Deleted grain jar"
+JAR_RESTORED = "Restored grain jar"
+
+class InsufficientVolumeError(ValueError):
+    """Raised when an inoculation would take a liquid culture below 0 mL"""
+
+    def __init__(self, lc_id, available, required):
+        super().__init__(f"Liquid culture {lc_id} has {available:g} mL left, "
+                         f"but {required:g} mL are needed")
+        self.lc_id = lc_id
+        self.available = available
+        self.required = required
+
+# Records imported at once above which the search index is filled in bulk
+BULK_INDEX_THRESHOLD = 1000
+
+def search_body_sql(table_name, prefix=""):
+    """Return the SQL expression of the text the global search matches for a record"""
+    return " || ' | ' || ".join(f"COALESCE({prefix}{column}, '')" for column in SEARCH_COLUMNS[table_name])
+
+def search_filter_sql(table_name, prefix=""):
+    """Return the SQL condition a record must meet to be found by the global search"""
+    flag = SEARCH_HIDDEN_FLAGS.get(table_name)
+    return f"{prefix}{flag} = 0" if flag else "1"
+
+def _search_row_sql(table_name, prefix=""):
+    """Return SQL (key, record ID, body) expressions of a record's search index row.
+
+    The key is the record's search_id in search_keys, looked up by (table
+    name, record ID). `prefix` is "NEW." or "OLD." inside triggers.
+    """
+    record_id = f"{prefix}{PRIMARY_KEYS[table_name]}"
+    key = f"(SELECT search_id FROM search_keys WHERE table_name = '{table_name}' AND record_id = {record_id})"
+    return key, record_id, search_body_sql(table_name, prefix)
+
+def _search_triggers(table_name):
+    """Return {trigger name: CREATE TRIGGER statement} keeping a table's rows in the search index.
+
+    Every record gets a search_keys row; only those meeting search_filter_sql()
+    get an index row.
+    """
+    new_key, new_id, new_body = _search_row_sql(table_name, "NEW.")
+    old_key, old_id, _ = _search_row_sql(table_name, "OLD.")
+    new_row = f"""
+            INSERT INTO search_index (rowid, record_id, body, table_name)
+            SELECT {new_key}, {new_id}, {new_body}, '{table_name}' WHERE {search_filter_sql(table_name, "NEW.")};
+        """
+    flag = (SEARCH_HIDDEN_FLAGS[table_name],) if table_name in SEARCH_HIDDEN_FLAGS else ()
+    columns = ", ".join((PRIMARY_KEYS[table_name],) + SEARCH_COLUMNS[table_name] + flag)
+    triggers = {
+        "insert": f"""AFTER INSERT ON {table_name} BEGIN
+            INSERT INTO search_keys (table_name, record_id) VALUES ('{table_name}', {new_id});
+            {new_row}
+        END""",
+        "update": f"""AFTER UPDATE OF {columns} ON {table_name} BEGIN
+            DELETE FROM search_index WHERE rowid = {old_key};
+            UPDATE search_keys SET record_id = {new_id}
+            WHERE table_name = '{table_name}' AND record_id = {old_id};
+            {new_row}
+        END""",
+        "delete": f"""AFTER DELETE ON {table_name} BEGIN
+            DELETE FROM search_index WHERE rowid = {old_key};
+            DELETE FROM search_keys WHERE table_name = '{table_name}' AND record_id = {old_id};
+        END""",
+    }
+    return {f"{table_name}_search_{event}": f"CREATE TRIGGER {table_name}_search_{event} {sql}"
+            for event, sql in triggers.items()}
+
+def _row_json_sql(table_name, record_id):
+    """Return SQL for a record's current values as a JSON array, NULL if it doesn't exist"""
+    columns = ", ".join(name for name, _ in TABLE_COLUMNS[table_name])
+    return f"(SELECT json_array({columns}) FROM {table_name} WHERE {PRIMARY_KEYS[table_name]} = {record_id})"
+
+def column_types(table_name, count=None):
+    """Return the value types of the first `count` columns of a record table"""
+    return [col_type for _, col_type in TABLE_COLUMNS[table_name][:count]]
+
 class Database:
-    def __init__(self, db_name="mycotracker.db"):
+    def __init__(self, db_name="mycotracker.db", initialize=True):
         self.db_name = db_name
         self.conn = sqlite3.connect(self.db_name)
         self.cursor = self.conn.cursor()
-        self.create_tables()
+        # Let INSERT OR REPLACE (used by undo) fire the delete triggers that
+        # keep the change log and search index in step
+        self.cursor.execute("PRAGMA recursive_triggers = ON")
+        self._id_registry = None
+        self._completer = None
+        self._chart_data = None
+        self._strain_leaderboard = None
+        # Set by create_tables; False when SQLite lacks the trigram tokenizer
+        self.search_index_available = False
+        # Callers that stage their startup (see main.py) create the tables themselves
+        if initialize:
+            self.create_tables()
 
     def create_tables(self):
         """Create all necessary tables if they don't exist"""
@@ -105,21 +268,360 @@ class Database:
                 )
             """)
 
+            # Undo journal for batch operations: one row per batch, plus a
+            # copy of every affected record as it was before the batch ran
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS undo_batches (
+                    batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    table_name TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    record_count INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS undo_journal (
+                    batch_id INTEGER NOT NULL REFERENCES undo_batches (batch_id),
+                    row_data TEXT NOT NULL
+                )
+            """)
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_undo_journal_batch ON undo_journal (batch_id)")
+            # Each record's values right after its batch ran (NULL once deleted),
+            # so undo can leave alone the records changed since then
+            self.cursor.execute("PRAGMA table_info(undo_journal)")
+            if "after_data" not in [column[1] for column in self.cursor.fetchall()]:
+                self.cursor.execute("ALTER TABLE undo_journal ADD COLUMN after_data TEXT")
+                # Batches journaled before the column existed take today's values
+                for table_name in TABLE_COLUMNS:
+                    self.cursor.execute(f"""
+                        UPDATE undo_journal SET after_data = {_row_json_sql(table_name, "json_extract(row_data, '$[0]')")}
+                        WHERE batch_id IN (SELECT batch_id FROM undo_batches WHERE table_name = ?)
+                    """, (table_name,))
+
+            # Next free number per ID prefix, used to hand out blocks of IDs
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS id_sequences (
+                    prefix TEXT PRIMARY KEY,
+                    next_value INTEGER NOT NULL
+                )
+            """)
+
+            # Change log: every insert, update and delete on a record table
+            # appends a row here (via the triggers below), so caches can pick
+            # up just the changes since they were last refreshed
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS change_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    table_name TEXT NOT NULL,
+                    record_id TEXT NOT NULL,
+                    operation TEXT NOT NULL
+                )
+            """)
+            for table_name, primary_key in PRIMARY_KEYS.items():
+                self.cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table_name}_log_insert AFTER INSERT ON {table_name}
+                    BEGIN
+                        INSERT INTO change_log (table_name, record_id, operation)
+                        VALUES ('{table_name}', NEW.{primary_key}, 'insert');
+                    END
+                """)
+                self.cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table_name}_log_update AFTER UPDATE ON {table_name}
+                    BEGIN
+                        INSERT INTO change_log (table_name, record_id, operation)
+                        SELECT '{table_name}', OLD.{primary_key}, 'delete'
+                        WHERE OLD.{primary_key} IS NOT NEW.{primary_key};
+                        INSERT INTO change_log (table_name, record_id, operation)
+                        VALUES ('{table_name}', NEW.{primary_key}, 'update');
+                    END
+                """)
+                self.cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table_name}_log_delete AFTER DELETE ON {table_name}
+                    BEGIN
+                        INSERT INTO change_log (table_name, record_id, operation)
+                        VALUES ('{table_name}', OLD.{primary_key}, 'delete');
+                    END
+                """)
+            # Keep the log bounded; readers that fall behind reload everything
+            self.cursor.execute("""
+                DELETE FROM change_log
+                WHERE seq <= (SELECT MAX(seq) FROM change_log) - ?
+            """, (CHANGE_LOG_SIZE,))
+
+            # Colonization history: an append-only observation is recorded
+            # whenever a jar is created or its colonization percentage changes
+            self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'colonization_observations'")
+            new_history = self.cursor.fetchone() is None
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS colonization_observations (
+                    observation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    jar_id TEXT NOT NULL,
+                    observed_at TEXT NOT NULL,
+                    colonization_percentage INTEGER NOT NULL
+                )
+            """)
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_colonization_observations_jar
+                ON colonization_observations (jar_id, observed_at)
+            """)
+            self.cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS grain_jars_observe_insert AFTER INSERT ON grain_jars
+                WHEN NEW.colonization_percentage IS NOT NULL
+                BEGIN
+                    INSERT INTO colonization_observations (jar_id, observed_at, colonization_percentage)
+                    VALUES (NEW.jar_id, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'),
+                            NEW.colonization_percentage);
+                END
+            """)
+            self.cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS grain_jars_observe_update
+                AFTER UPDATE OF colonization_percentage ON grain_jars
+                WHEN NEW.colonization_percentage IS NOT NULL
+                 AND NEW.colonization_percentage IS NOT OLD.colonization_percentage
+                BEGIN
+                    INSERT INTO colonization_observations (jar_id, observed_at, colonization_percentage)
+                    VALUES (NEW.jar_id, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'),
+                            NEW.colonization_percentage);
+                END
+            """)
+            # A deleted jar takes its history with it. Undo re-inserts jars with
+            # INSERT OR REPLACE, which fires this too, and then restores the
+            # history journaled in undo_observations.
+            self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'grain_jars_observe_delete'")
+            new_delete_trigger = self.cursor.fetchone() is None
+            self.cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS grain_jars_observe_delete AFTER DELETE ON grain_jars
+                BEGIN
+                    DELETE FROM colonization_observations WHERE jar_id = OLD.jar_id;
+                END
+            """)
+            if new_delete_trigger:
+                # Drop the histories of jars deleted before the trigger existed
+                self.cursor.execute("""
+                    DELETE FROM colonization_observations
+                    WHERE jar_id NOT IN (SELECT jar_id FROM grain_jars)
+                """)
+            # A renamed jar keeps its history
+            self.cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS grain_jars_observe_rename AFTER UPDATE OF jar_id ON grain_jars
+                WHEN NEW.jar_id IS NOT OLD.jar_id
+                BEGIN
+                    UPDATE colonization_observations SET jar_id = NEW.jar_id WHERE jar_id = OLD.jar_id;
+                END
+            """)
+            if new_history:
+                # Seed the history with each existing jar's current percentage
+                self.cursor.execute("""
+                    INSERT INTO colonization_observations (jar_id, observed_at, colonization_percentage)
+                    SELECT jar_id, updated_at, colonization_percentage FROM grain_jars
+                    WHERE colonization_percentage IS NOT NULL
+                """)
+
+            # History of the jars in each undoable grain jar batch, as it was
+            # before the batch ran, so undo removes the batch's readings
+            self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'undo_observations'")
+            new_undo_observations = self.cursor.fetchone() is None
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS undo_observations (
+                    batch_id INTEGER NOT NULL REFERENCES undo_batches (batch_id),
+                    observation_id INTEGER NOT NULL,
+                    jar_id TEXT NOT NULL,
+                    observed_at TEXT NOT NULL,
+                    colonization_percentage INTEGER NOT NULL
+                )
+            """)
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_undo_observations_batch ON undo_observations (batch_id)")
+            if new_undo_observations:
+                # Batches journaled before this table existed keep today's history
+                self.cursor.execute("""
+                    INSERT INTO undo_observations
+                    SELECT j.batch_id, o.observation_id, o.jar_id, o.observed_at, o.colonization_percentage
+                    FROM undo_journal j
+                    JOIN undo_batches b ON b.batch_id = j.batch_id AND b.table_name = 'grain_jars'
+                    JOIN colonization_observations o ON o.jar_id = json_extract(j.row_data, '$[0]')
+                """)
+
+            # Liquid culture volume ledger: every change to an LC's volume is
+            # recorded here, while liquid_cultures.volume_remaining holds the
+            # running balance. Jars saved on the grain jar form debit their LC,
+            # deleting them credits it back and undoing the delete debits it
+            # again. Imported jars are not debited: an imported LC's volume is
+            # already its balance. Editing a jar's source doesn't move its debit.
+            self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'lc_volume_ledger'")
+            new_ledger = self.cursor.fetchone() is None
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lc_volume_ledger (
+                    entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    lc_id TEXT NOT NULL,
+                    change_ml REAL NOT NULL,
+                    jar_id TEXT,
+                    description TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_lc_volume_ledger_lc ON lc_volume_ledger (lc_id)")
+            self.cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS liquid_cultures_ledger_open AFTER INSERT ON liquid_cultures
+                WHEN NEW.volume_remaining IS NOT NULL
+                BEGIN
+                    INSERT INTO lc_volume_ledger (lc_id, change_ml, description, created_at)
+                    VALUES (NEW.lc_id, NEW.volume_remaining, 'Opening balance', NEW.created_at);
+                END
+            """)
+            if new_ledger:
+                self.cursor.execute("""
+                    INSERT INTO lc_volume_ledger (lc_id, change_ml, description, created_at)
+                    SELECT lc_id, volume_remaining, 'Opening balance', updated_at FROM liquid_cultures
+                    WHERE volume_remaining IS NOT NULL
+                """)
+
+            self._create_search_index()
+
+            # Indexes for the columns most used in filter queries
+            for table_name, column in [
+                ("agar_plates", "strain_name"), ("agar_plates", "date_inoculated"),
+                ("liquid_cultures", "source_id"), ("liquid_cultures", "strain_name"),
+                ("liquid_cultures", "inoculation_date"),
+                ("grain_jars", "source_id"), ("grain_jars", "inoculation_date"),
+                ("grain_jars", "colonization_percentage"), ("grain_jars", "shake_date"),
+                ("bulk_tubs", "spawn_source"), ("bulk_tubs", "substrate_type"),
+                ("bulk_tubs", "date_to_bulk"),
+                ("clone_library", "parent_strain"), ("clone_library", "date_taken"),
+            ]:
+                self.cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{column} ON {table_name} ({column})"
+                )
+
             self.conn.commit()
         except sqlite3.Error as e:
             print(f"Error creating tables: {e}")
 
+    def _trigram_supported(self):
+        """Return whether this SQLite has FTS5 with the trigram tokenizer (3.34+)"""
+        try:
+            self.cursor.execute("CREATE VIRTUAL TABLE temp.trigram_probe USING fts5(x, tokenize = 'trigram')")
+        except sqlite3.OperationalError:
+            return False
+        self.cursor.execute("DROP TABLE temp.trigram_probe")
+        return True
+
+    def _create_search_index(self):
+        """Create the global search index over the IDs and text of every record table.
+
+        The trigram tokenizer matches any part of an ID or word. Index rows
+        are keyed by search_keys.search_id, an INTEGER PRIMARY KEY per (table
+        name, record ID): the record tables' own rowids can't be used, as
+        VACUUM may renumber them. Without trigram support the index and its
+        triggers are left out and global_search scans the tables instead.
+        """
+        self.search_index_available = self._trigram_supported()
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_keys'")
+        rebuild = self.cursor.fetchone() is None
+        # Missing triggers, or triggers written by an older version (keyed by
+        # record rowid, or indexing archived clones), mean the index is rebuilt
+        expected = {}
+        for table_name in SEARCH_COLUMNS:
+            expected.update(_search_triggers(table_name))
+        self.cursor.execute(f"""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'trigger' AND name IN ({', '.join('?' for _ in expected)})
+        """, tuple(expected))
+        rebuild = rebuild or dict(self.cursor.fetchall()) != expected
+        if not self.search_index_available or rebuild:
+            for name in expected:
+                self.cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        if not self.search_index_available:
+            return
+        if rebuild:
+            self.cursor.execute("DROP TABLE IF EXISTS search_index")
+            self.cursor.execute("DROP TABLE IF EXISTS search_keys")
+            self.cursor.execute("""
+                CREATE TABLE search_keys (
+                    search_id INTEGER PRIMARY KEY,
+                    table_name TEXT NOT NULL,
+                    record_id TEXT NOT NULL,
+                    UNIQUE (table_name, record_id)
+                )
+            """)
+        self.cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_index
+            USING fts5(record_id, body, table_name UNINDEXED, tokenize = 'trigram')
+        """)
+        if rebuild:
+            for table_name in SEARCH_COLUMNS:
+                self._create_search_triggers(table_name)
+                self._index_records(table_name)
+
+    def _create_search_triggers(self, table_name, events=("insert", "update", "delete")):
+        """Create the triggers that keep a table's rows in the search index"""
+        triggers = _search_triggers(table_name)
+        for event in events:
+            self.cursor.execute(triggers[f"{table_name}_search_{event}"])
+
+    def _index_records(self, table_name, after_rowid=0):
+        """Add a table's records with rowid > `after_rowid` to the search index in two statements.
+
+        Record rowids are only compared within the current transaction, so a
+        VACUUM renumbering them later doesn't matter.
+        """
+        key, record_id, body = _search_row_sql(table_name, "r.")
+        self.cursor.execute(f"""
+            INSERT INTO search_keys (table_name, record_id)
+            SELECT '{table_name}', {PRIMARY_KEYS[table_name]} FROM {table_name}
+            WHERE rowid > ?
+        """, (after_rowid,))
+        self.cursor.execute(f"""
+            INSERT INTO search_index (rowid, record_id, body, table_name)
+            SELECT {key}, {record_id}, {body}, '{table_name}' FROM {table_name} r
+            WHERE r.rowid > ? AND {search_filter_sql(table_name, "r.")}
+        """, (after_rowid,))
+
     def close(self):
         """Close the database connection"""
         if self.conn:
             self.conn.close()
 
+    @property
+    def id_registry(self):
+        """Shared in-memory registry of all record IDs, loaded on first use"""
+        if self._id_registry is None:
+            from id_registry import IdRegistry
+            self._id_registry = IdRegistry(self)
+        return self._id_registry
+
+    @property
+    def completer(self):
+        """Shared autocomplete index of source IDs and strain names, built on first use"""
+        if self._completer is None:
+            from autocomplete import Completer
+            self._completer = Completer(self)
+        return self._completer
+
+    @property
+    def chart_data(self):
+        """Shared cache of the chart datasets, see chart_data.py"""
+        if self._chart_data is None:
+            from chart_data import ChartData
+            self._chart_data = ChartData(self)
+        return self._chart_data
+
+    @property
+    def strain_leaderboard(self):
+        """Shared per-clone/plate results over the lineage, see strain_leaderboard.py"""
+        if self._strain_leaderboard is None:
+            from strain_leaderboard import StrainLeaderboard
+            self._strain_leaderboard = StrainLeaderboard(self)
+        return self._strain_leaderboard
+
     def get_timestamp(self):
         """Get current timestamp in ISO format"""
         return datetime.now().isoformat()
 
     def import_records(self, table_name, records):
-        """Import multiple records into a specified table"""
+        """Import multiple records into a specified table.
+
+        Imported grain jars don't debit their liquid culture (see lc_volume_ledger).
+        """
         if not records:
             return
         
@@ -133,14 +635,311 @@ class Database:
 
         placeholders = ', '.join(['?' for _ in column_names])
         sql = f"INSERT INTO {table_name} ({', '.join(column_names)}) VALUES ({placeholders})"
-        
+
+        # Indexing rows for search one trigger call at a time is several times
+        # slower than one INSERT ... SELECT, so large imports switch the
+        # trigger off and index the new rows afterwards, in the same transaction
+        bulk_index = (self.search_index_available and table_name in SEARCH_COLUMNS
+                      and len(records) >= BULK_INDEX_THRESHOLD)
         try:
-            self.cursor.executemany(sql, records)
-            self.conn.commit()
+            with self.conn:
+                if bulk_index:
+                    if not self.conn.in_transaction:
+                        self.cursor.execute("BEGIN")
+                    self.cursor.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table_name}")
+                    last_rowid = self.cursor.fetchone()[0]
+                    self.cursor.execute(f"DROP TRIGGER IF EXISTS {table_name}_search_insert")
+                self.cursor.executemany(sql, records)
+                if bulk_index:
+                    self._index_records(table_name, last_rowid)
+                    self._create_search_triggers(table_name, ("insert",))
         except sqlite3.IntegrityError as e:
             raise ValueError(f"A record with a duplicate ID was found: {e}")
         except sqlite3.Error as e:
             raise Exception(f"Database error during import: {e}")
 
+    def reserve_ids(self, table_name, prefix, count, digits=4):
+        """Reserve `count` consecutive IDs such as GJ-0042, GJ-0043, ...
+
+        Must run inside a write transaction so the block is allocated
+        atomically. The sequence never hands out a number at or below the
+        highest matching ID already in the table, so hand-typed IDs are
+        skipped over.
+        """
+        primary_key = PRIMARY_KEYS[table_name]
+        digit_pattern = "[0-9]" * digits
+        self.cursor.execute(f"""
+            SELECT MAX(CAST(substr({primary_key}, ?) AS INTEGER)) FROM {table_name}
+            WHERE {primary_key} GLOB ?
+        """, (len(prefix) + 1, prefix + digit_pattern))
+        highest_existing = self.cursor.fetchone()[0] or 0
+        self.cursor.execute("SELECT next_value FROM id_sequences WHERE prefix = ?", (prefix,))
+        row = self.cursor.fetchone()
+        first = max(row[0] if row else 1, highest_existing + 1)
+
+        if first + count - 1 >= 10 ** digits:
+            raise ValueError(f"Not enough free {prefix}{'X' * digits} IDs left for {count} records")
+        self.cursor.execute("INSERT OR REPLACE INTO id_sequences (prefix, next_value) VALUES (?, ?)",
+                            (prefix, first + count))
+        return [f"{prefix}{number:0{digits}d}" for number in range(first, first + count)]
+
+    def insert_id_block(self, table_name, prefix, count, values, on_insert=None):
+        """Insert `count` records sharing `values` under a freshly reserved block of IDs.
+
+        The ID reservation and all inserts happen in a single transaction.
+        `on_insert`, if given, is called with the new IDs inside that same
+        transaction; if it raises, nothing is inserted. Returns the list of
+        new IDs.
+        """
+        columns = [PRIMARY_KEYS[table_name]] + list(values)
+        placeholders = ", ".join("?" for _ in columns)
+        shared_values = tuple(values.values())
+        try:
+            with self.conn:
+                if not self.conn.in_transaction:
+                    self.cursor.execute("BEGIN IMMEDIATE")
+                new_ids = self.reserve_ids(table_name, prefix, count)
+                self.cursor.executemany(
+                    f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})",
+                    ((new_id,) + shared_values for new_id in new_ids)
+                )
+                if on_insert:
+                    on_insert(new_ids)
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"A record with a duplicate ID was found: {e}")
+        except sqlite3.Error as e:
+            raise Exception(f"Database error during batch insert: {e}")
+        return new_ids
+
+    def get_lc_volume(self, lc_id):
+        """Return the running volume balance of a liquid culture.
+
+        Returns None if `lc_id` is not a liquid culture (e.g. an agar plate)
+        or its volume was never recorded.
+        """
+        self.cursor.execute("SELECT volume_remaining FROM liquid_cultures WHERE lc_id = ?", (lc_id,))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def debit_lc_volume(self, lc_id, jar_ids, volume_per_jar, allow_negative=False):
+        """Debit `volume_per_jar` mL from a liquid culture for each inoculated jar.
+
+        Must run inside the transaction that inserts the jars so both are
+        committed or rolled back together. Writes one ledger entry per jar and
+        updates the running balance. Does nothing if `lc_id` is not a liquid
+        culture or has no recorded volume. Raises InsufficientVolumeError if the balance would drop
+        below zero, unless `allow_negative` is True. Returns the new balance.
+        """
+        available = self.get_lc_volume(lc_id)
+        if available is None or not jar_ids or volume_per_jar <= 0:
+            return available
+        required = volume_per_jar * len(jar_ids)
+        if required > available and not allow_negative:
+            raise InsufficientVolumeError(lc_id, available, required)
+
+        timestamp = self.get_timestamp()
+        self.cursor.executemany("""
+            INSERT INTO lc_volume_ledger (lc_id, change_ml, jar_id, description, created_at)
+            VALUES (?, ?, ?, 'Inoculated grain jar', ?)
+        """, ((lc_id, -volume_per_jar, jar_id, timestamp) for jar_id in jar_ids))
+        self.cursor.execute("""
+            UPDATE liquid_cultures SET volume_remaining = ?, updated_at = ? WHERE lc_id = ?
+        """, (available - required, timestamp, lc_id))
+        return available - required
+
+    def _post_jar_entries(self, entries, description):
+        """Write (lc_id, jar_id, change_ml) ledger entries and apply them to the balances"""
+        timestamp = self.get_timestamp()
+        self.cursor.executemany("""
+            INSERT INTO lc_volume_ledger (lc_id, change_ml, jar_id, description, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, ((lc_id, change, jar_id, description, timestamp) for lc_id, jar_id, change in entries))
+        totals = {}
+        for lc_id, _, change in entries:
+            totals[lc_id] = totals.get(lc_id, 0) + change
+        self.cursor.executemany("""
+            UPDATE liquid_cultures SET volume_remaining = volume_remaining + ?, updated_at = ? WHERE lc_id = ?
+        """, ((change, timestamp, lc_id) for lc_id, change in totals.items()))
+
+    def _credit_deleted_jars(self):
+        """Credit the staged jars' net debits back to their liquid cultures"""
+        self.cursor.execute("""
+            SELECT lc_id, jar_id, -SUM(change_ml) FROM lc_volume_ledger
+            WHERE jar_id IN (SELECT record_id FROM temp.batch_ids)
+            GROUP BY lc_id, jar_id HAVING SUM(change_ml) != 0
+        """)
+        self._post_jar_entries(self.cursor.fetchall(), JAR_DELETED)
+
+    def _debit_restored_jars(self):
+        """Reverse the deletion credits of the staged jars an undo restores"""
+        self.cursor.execute("""
+            SELECT l.lc_id, l.jar_id, -l.change_ml FROM lc_volume_ledger l
+            WHERE l.description = ? AND l.entry_id IN (
+                SELECT MAX(entry_id) FROM lc_volume_ledger
+                WHERE jar_id IN (SELECT record_id FROM temp.batch_ids)
+                GROUP BY jar_id
+            )
+        """, (JAR_DELETED,))
+        self._post_jar_entries(self.cursor.fetchall(), JAR_RESTORED)
+
+    def get_lc_ledger(self, lc_id):
+        """Return a liquid culture's ledger entries, oldest first"""
+        self.cursor.execute("""
+            SELECT created_at, change_ml, jar_id, description FROM lc_volume_ledger
+            WHERE lc_id = ? ORDER BY entry_id
+        """, (lc_id,))
+        return self.cursor.fetchall()
+
+    def _stage_batch_ids(self, record_ids):
+        """Load record IDs into a temp table that batch statements join against"""
+        self.cursor.execute("CREATE TEMP TABLE IF NOT EXISTS batch_ids (record_id TEXT PRIMARY KEY)")
+        self.cursor.execute("DELETE FROM temp.batch_ids")
+        self.cursor.executemany("INSERT OR IGNORE INTO temp.batch_ids VALUES (?)",
+                                ((record_id,) for record_id in record_ids))
+
+    def _journal_batch(self, table_name, description):
+        """Copy the staged records into the undo journal and return the batch ID"""
+        columns = ", ".join(name for name, _ in TABLE_COLUMNS[table_name])
+        primary_key = PRIMARY_KEYS[table_name]
+        self.cursor.execute("""
+            INSERT INTO undo_batches (table_name, description, record_count, created_at)
+            VALUES (?, ?, (SELECT COUNT(*) FROM temp.batch_ids), ?)
+        """, (table_name, description, self.get_timestamp()))
+        batch_id = self.cursor.lastrowid
+        self.cursor.execute(f"""
+            INSERT INTO undo_journal (batch_id, row_data)
+            SELECT ?, json_array({columns}) FROM {table_name}
+            WHERE {primary_key} IN (SELECT record_id FROM temp.batch_ids)
+        """, (batch_id,))
+        if table_name == "grain_jars":
+            self.cursor.execute("""
+                INSERT INTO undo_observations
+                SELECT ?, observation_id, jar_id, observed_at, colonization_percentage
+                FROM colonization_observations
+                WHERE jar_id IN (SELECT record_id FROM temp.batch_ids)
+            """, (batch_id,))
+
+        # Only keep the most recent batches of each table
+        for journal in ("undo_journal", "undo_observations"):
+            self.cursor.execute(f"""
+                DELETE FROM {journal} WHERE batch_id IN (
+                    SELECT batch_id FROM undo_batches WHERE table_name = ?
+                    ORDER BY batch_id DESC LIMIT -1 OFFSET ?
+                )
+            """, (table_name, UNDO_HISTORY_SIZE))
+        self.cursor.execute("""
+            DELETE FROM undo_batches WHERE batch_id IN (
+                SELECT batch_id FROM undo_batches WHERE table_name = ?
+                ORDER BY batch_id DESC LIMIT -1 OFFSET ?
+            )
+        """, (table_name, UNDO_HISTORY_SIZE))
+        return batch_id
+
+    def batch_update(self, table_name, record_ids, values, description):
+        """Set the same column values on many records in one statement and transaction.
+
+        The previous state of the records is journaled so the batch can be
+        reverted with undo_last_batch(). Returns the number of updated records.
+        """
+        primary_key = PRIMARY_KEYS[table_name]
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        try:
+            with self.conn:
+                self._stage_batch_ids(record_ids)
+                batch_id = self._journal_batch(table_name, description)
+                self.cursor.execute(f"""
+                    UPDATE {table_name} SET {assignments}
+                    WHERE {primary_key} IN (SELECT record_id FROM temp.batch_ids)
+                """, tuple(values.values()))
+                updated = self.cursor.rowcount
+                self.cursor.execute(f"""
+                    UPDATE undo_journal SET after_data = {_row_json_sql(table_name, "json_extract(row_data, '$[0]')")}
+                    WHERE batch_id = ?
+                """, (batch_id,))
+                return updated
+        except sqlite3.Error as e:
+            raise Exception(f"Database error during batch update: {e}")
+
+    def batch_delete(self, table_name, record_ids, description):
+        """Delete many records in one statement and transaction, journaled for undo"""
+        primary_key = PRIMARY_KEYS[table_name]
+        try:
+            with self.conn:
+                self._stage_batch_ids(record_ids)
+                self._journal_batch(table_name, description)
+                if table_name == "grain_jars":
+                    self._credit_deleted_jars()
+                self.cursor.execute(f"""
+                    DELETE FROM {table_name}
+                    WHERE {primary_key} IN (SELECT record_id FROM temp.batch_ids)
+                """)
+                return self.cursor.rowcount
+        except sqlite3.Error as e:
+            raise Exception(f"Database error during batch delete: {e}")
+
+    def get_last_batch(self, table_name):
+        """Return (batch_id, description, record_count) of the latest undoable batch, or None"""
+        self.cursor.execute("""
+            SELECT batch_id, description, record_count FROM undo_batches
+            WHERE table_name = ? ORDER BY batch_id DESC LIMIT 1
+        """, (table_name,))
+        return self.cursor.fetchone()
+
+    def get_undo_conflicts(self, table_name, batch_id):
+        """Return the IDs of a batch's records changed since it ran, which undo leaves as they are"""
+        self.cursor.execute(f"""
+            SELECT json_extract(row_data, '$[0]') FROM undo_journal
+            WHERE batch_id = ? AND {_row_json_sql(table_name, "json_extract(row_data, '$[0]')")} IS NOT after_data
+        """, (batch_id,))
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def undo_last_batch(self, table_name):
+        """Restore the records touched by the latest batch on a table.
+
+        Records edited, or deleted and created again, since the batch ran are
+        skipped (see get_undo_conflicts()), so undo never overwrites a later
+        change. Returns the description of the undone batch, or None if
+        there is nothing to undo.
+        """
+        last_batch = self.get_last_batch(table_name)
+        if not last_batch:
+            return None
+        batch_id, description, _ = last_batch
+        column_names = [name for name, _ in TABLE_COLUMNS[table_name]]
+        extracted = ", ".join(f"json_extract(row_data, '$[{index}]')" for index in range(len(column_names)))
+        try:
+            with self.conn:
+                self.cursor.execute(f"""
+                    SELECT json_extract(row_data, '$[0]') FROM undo_journal
+                    WHERE batch_id = ? AND {_row_json_sql(table_name, "json_extract(row_data, '$[0]')")} IS after_data
+                """, (batch_id,))
+                self._stage_batch_ids([row[0] for row in self.cursor.fetchall()])
+                self.cursor.execute(f"""
+                    INSERT OR REPLACE INTO {table_name} ({', '.join(column_names)})
+                    SELECT {extracted} FROM undo_journal
+                    WHERE batch_id = ? AND json_extract(row_data, '$[0]') IN (SELECT record_id FROM temp.batch_ids)
+                """, (batch_id,))
+                if table_name == "grain_jars":
+                    # Put back the jars' history as it was before the batch:
+                    # drop the batch's readings and the ones the restore wrote
+                    self.cursor.execute("""
+                        DELETE FROM colonization_observations
+                        WHERE jar_id IN (SELECT record_id FROM temp.batch_ids)
+                    """)
+                    self.cursor.execute("""
+                        INSERT INTO colonization_observations
+                            (observation_id, jar_id, observed_at, colonization_percentage)
+                        SELECT observation_id, jar_id, observed_at, colonization_percentage
+                        FROM undo_observations
+                        WHERE batch_id = ? AND jar_id IN (SELECT record_id FROM temp.batch_ids)
+                    """, (batch_id,))
+                    self.cursor.execute("DELETE FROM undo_observations WHERE batch_id = ?", (batch_id,))
+                    self._debit_restored_jars()
+                self.cursor.execute("DELETE FROM undo_journal WHERE batch_id = ?", (batch_id,))
+                self.cursor.execute("DELETE FROM undo_batches WHERE batch_id = ?", (batch_id,))
+        except sqlite3.Error as e:
+            raise Exception(f"Database error during undo: {e}")
+        return description
+
     def __del__(self):
         self.close() 
\ No newline at end of file
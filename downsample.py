@@ -0,0 +1,81 @@
+"""Largest-Triangle-Three-Buckets downsampling for line charts.
+
+A line with more points than its Axes has pixels looks no different when
+drawn from a few of them, but costs far more to render. lttb() splits the
+interior points into equal buckets and keeps, from each, the point forming
+the largest triangle with the point kept from the previous bucket and the
+average of the next one, which preserves peaks and dips.
+
+Classic LTTB picks buckets one after another, each anchored on the
+previous pick. Here every bucket is solved at once with NumPy, and the
+passes are repeated with the new picks as anchors until they settle, which
+gives the same points without a Python loop over buckets.
+"""
+import numpy as np
+
+# Fewest points worth downsampling to
+MIN_THRESHOLD = 3
+
+def lttb(x, y, threshold):
+    """Return the indices of `threshold` points of (x, y) that LTTB keeps.
+
+    `x` must be sorted. The first and last points are always kept; all
+    indices are returned when there are no more than `threshold` points.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    threshold = max(int(threshold), MIN_THRESHOLD)
+    if n <= threshold:
+        return np.arange(n)
+
+    # threshold - 2 buckets over the interior points 1 .. n-2, one row each,
+    # padded to the widest bucket by repeating the bucket's last point
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    starts, counts = edges[:-1], np.diff(edges)
+    rows = np.minimum(starts[:, None] + np.arange(counts.max()), (edges[1:] - 1)[:, None])
+    bucket_x, bucket_y = x[rows], y[rows]
+    # Each bucket's third vertex is the next bucket's average (the last point for the last bucket)
+    sums_x, sums_y = np.add.reduceat(x[1:n - 1], starts - 1), np.add.reduceat(y[1:n - 1], starts - 1)
+    next_x = np.r_[sums_x[1:] / counts[1:], x[-1]][:, None]
+    next_y = np.r_[sums_y[1:] / counts[1:], y[-1]][:, None]
+
+    # Start from the previous bucket's average as anchor, then re-anchor on the
+    # previous bucket's pick until no pick changes: that fixed point is what
+    # sequential LTTB selects. Each pass only redoes the buckets whose anchor
+    # moved, and few still do after the first passes.
+    anchor_x = np.r_[x[0], sums_x[:-1] / counts[:-1]]
+    anchor_y = np.r_[y[0], sums_y[:-1] / counts[:-1]]
+    picks = np.zeros(len(starts), dtype=np.intp)
+    active = np.arange(len(starts))
+    while len(active):
+        ax, ay = anchor_x[active][:, None], anchor_y[active][:, None]
+        dx, dy = ax - next_x[active], next_y[active] - ay
+        # Twice the triangle's area, |dx * (y - ay) - (ax - x) * dy|, in place
+        area = bucket_y[active] * dx
+        area += bucket_x[active] * dy
+        area -= dx * ay + dy * ax
+        np.abs(area, out=area)
+        new_picks = rows[active, area.argmax(axis=1)]
+        moved = active[new_picks != picks[active]]
+        picks[active] = new_picks
+        # Buckets after a moved pick get a new anchor; the first bucket's anchor is fixed
+        active = moved[moved < len(starts) - 1] + 1
+        anchor_x[active], anchor_y[active] = x[picks[active - 1]], y[picks[active - 1]]
+    return np.r_[0, picks, n - 1]
+
+def downsample_visible(points, xlim, width):
+    """Return the points of an (n, 2) array needed to draw it `width` pixels wide.
+
+    Only the points inside `xlim`, plus one on either side so the line runs
+    to the edges, are kept and reduced with LTTB to about one per pixel.
+    """
+    points = np.asarray(points, dtype=float)
+    if len(points) <= max(width, MIN_THRESHOLD):
+        return points
+    x = points[:, 0]
+    low, high = sorted(xlim)
+    start = max(np.searchsorted(x, low, side="left") - 1, 0)
+    end = min(np.searchsorted(x, high, side="right") + 1, len(points))
+    visible = points[start:end]
+    return visible[lttb(visible[:, 0], visible[:, 1], width)]
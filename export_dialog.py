@@ -0,0 +1,96 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime
+from record_export import ExportJob, EXPORT_FORMATS
+
+class ExportDialog(tk.Toplevel):
+    """Choose an export format and file, then show the export's progress.
+
+    The export runs on a worker thread; this dialog polls it so the rest of
+    the application stays responsive, and can cancel it.
+    """
+
+    def __init__(self, parent, db, table_name, query="", record_ids=None, where=None):
+        super().__init__(parent)
+        self.db = db
+        self.table_name = table_name
+        self.query = query
+        self.record_ids = record_ids
+        self.where = where
+        self.job = None
+
+        self.title("Export Records")
+        self.transient(parent.winfo_toplevel())
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        scope = f"{len(record_ids)} selected records" if record_ids is not None else \
+            (f"Records matching: {query}" if query.strip() else "All records")
+        ttk.Label(self, text=scope).grid(row=0, column=0, columnspan=3, sticky="w", padx=10, pady=(10, 6))
+
+        ttk.Label(self, text="Format:").grid(row=1, column=0, sticky="e", padx=10, pady=6)
+        self.format_var = tk.StringVar(value="csv")
+        for column, fmt in enumerate(EXPORT_FORMATS, start=1):
+            ttk.Radiobutton(self, text=fmt.upper(), value=fmt,
+                            variable=self.format_var).grid(row=1, column=column, sticky="w", padx=6, pady=6)
+
+        ttk.Label(self, text="CSV doesn't tell missing text from empty text; "
+                             "JSONL and SQLite keep every value exactly.",
+                  wraplength=320).grid(row=2, column=0, columnspan=4, sticky="w", padx=10)
+
+        self.progress = ttk.Progressbar(self, mode="determinate", length=320, maximum=1)
+        self.progress.grid(row=3, column=0, columnspan=4, padx=10, pady=6)
+        self.status_label = ttk.Label(self, text="")
+        self.status_label.grid(row=4, column=0, columnspan=4, sticky="w", padx=10)
+
+        button_frame = ttk.Frame(self)
+        button_frame.grid(row=5, column=0, columnspan=4, pady=12)
+        self.export_button = ttk.Button(button_frame, text="Export...", command=self.start_export)
+        self.export_button.pack(side=tk.LEFT, padx=10, ipadx=8, ipady=4)
+        self.cancel_button = ttk.Button(button_frame, text="Close", command=self.close)
+        self.cancel_button.pack(side=tk.LEFT, padx=10, ipadx=8, ipady=4)
+
+    def start_export(self):
+        fmt = self.format_var.get()
+        extension, description = EXPORT_FORMATS[fmt]
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export records to",
+            defaultextension=extension,
+            initialfile=f"{self.table_name}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}",
+            filetypes=((description, f"*{extension}"), ("All files", "*.*"))
+        )
+        if not path:
+            return
+
+        self.job = ExportJob(self.db.db_name, self.table_name, path, fmt, self.query,
+                             self.record_ids, self.where)
+        self.job.start()
+        self.export_button.state(["disabled"])
+        self.cancel_button.config(text="Cancel")
+        self.poll()
+
+    def poll(self):
+        """Update the progress bar until the export finishes"""
+        job = self.job
+        self.progress.config(maximum=max(job.total, 1), value=job.done)
+        self.status_label.config(text=f"{job.done} of {job.total} records written")
+        if not job.finished:
+            self.after(100, self.poll)
+            return
+
+        self.job = None
+        self.export_button.state(["!disabled"])
+        self.cancel_button.config(text="Close")
+        if job.error:
+            messagebox.showerror("Error", f"Failed to export data: {job.error}", parent=self)
+        elif job.cancelled:
+            self.status_label.config(text="Export cancelled")
+        else:
+            messagebox.showinfo("Success", f"Exported {job.done} records to {job.path}", parent=self)
+            self.destroy()
+
+    def close(self):
+        if self.job:
+            self.job.cancel()  # poll() notices when the worker has stopped
+        else:
+            self.destroy()
@@ -0,0 +1,90 @@
+"""Search across every record table at once.
+
+The search_index table (created in database.py and kept current by
+triggers) holds each record's ID plus its strain names, sources and notes,
+using SQLite's trigram tokenizer so any part of an ID or word of at least
+three characters matches. SQLite builds older than 3.34 have no trigram
+tokenizer; there the same terms are matched by scanning the tables.
+Records their tab doesn't list (archived clones) are never returned.
+"""
+from database import SEARCH_COLUMNS, SEARCH_HIDDEN_FLAGS, PRIMARY_KEYS, search_body_sql, search_filter_sql
+from id_registry import TABLE_LABELS
+
+# Most results returned per search; exact ID matches always come first
+SEARCH_LIMIT = 300
+
+# Shortest search term the trigram index can answer
+MIN_TERM_LENGTH = 3
+
+def _search_terms(text):
+    return [term for term in text.split() if len(term) >= MIN_TERM_LENGTH]
+
+def _match_expression(text):
+    """Build an FTS5 query requiring every term, each matched as a literal string"""
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in _search_terms(text))
+
+def _scan_tables(db, terms, limit):
+    """Yield (table name, record ID, body) of records containing every term, without the index"""
+    for table_name in SEARCH_COLUMNS:
+        if limit <= 0:
+            return
+        record_id = PRIMARY_KEYS[table_name]
+        text = f"lower({record_id} || ' | ' || {search_body_sql(table_name)})"
+        db.cursor.execute(f"""
+            SELECT {record_id}, {search_body_sql(table_name)} FROM {table_name}
+            WHERE {search_filter_sql(table_name)} AND {" AND ".join(f"instr({text}, ?) > 0" for _ in terms)}
+            LIMIT ?
+        """, [term.lower() for term in terms] + [limit])
+        rows = db.cursor.fetchall()
+        limit -= len(rows)
+        for record_id, body in rows:
+            yield table_name, record_id, body
+
+def _is_listed(db, table_name, record_id):
+    """Return whether a record is shown in its tab (see SEARCH_HIDDEN_FLAGS)"""
+    if table_name not in SEARCH_HIDDEN_FLAGS:
+        return True
+    db.cursor.execute(f"SELECT 1 FROM {table_name} WHERE {PRIMARY_KEYS[table_name]} = ? "
+                      f"AND {search_filter_sql(table_name)}", (record_id,))
+    return db.cursor.fetchone() is not None
+
+def search(db, text, limit=SEARCH_LIMIT):
+    """Return the records matching `text`, grouped by table.
+
+    The result maps table name -> list of (record ID, matched text) pairs,
+    in SEARCH_COLUMNS order. Terms shorter than MIN_TERM_LENGTH are ignored.
+    """
+    results = {table_name: [] for table_name in SEARCH_COLUMNS}
+    found = set()
+
+    # An exact ID is answered from the in-memory registry, which also holds
+    # hidden records (archived clones), so those are checked in the table
+    record_id = text.strip()
+    registry = db.id_registry
+    registry.refresh()
+    for table_name in SEARCH_COLUMNS:
+        if record_id in registry.ids[table_name] and _is_listed(db, table_name, record_id):
+            results[table_name].append((record_id, "Exact ID match"))
+            found.add((table_name, record_id))
+
+    terms = _search_terms(text)
+    if terms and db.search_index_available:
+        db.cursor.execute("""
+            SELECT table_name, record_id, body FROM search_index
+            WHERE search_index MATCH ?
+            LIMIT ?
+        """, (_match_expression(text), limit))
+        matches = db.cursor.fetchall()
+    elif terms:
+        matches = _scan_tables(db, terms, limit)
+    else:
+        matches = []
+    for table_name, record_id, body in matches:
+        if (table_name, record_id) not in found:
+            results[table_name].append((record_id, body))
+            found.add((table_name, record_id))
+
+    return {table_name: rows for table_name, rows in results.items() if rows}
+
+def group_label(table_name, count):
+    return f"{TABLE_LABELS[table_name]} ({count})"
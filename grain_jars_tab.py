@@ -1,8 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import csv
 from datetime import datetime
 from tkcalendar import DateEntry
+from database import column_types, lc_volume_per_jar
+from record_query import query_records, QueryError
+from table_sorter import TreeviewSorter
+from record_store import RecordStore
+from export_dialog import ExportDialog
+from import_dialog import ImportDialog
+from autocomplete_entry import AutocompleteEntry
 import sqlite3
 import re
 
@@ -64,17 +70,27 @@ class GrainJarsTab(ttk.Frame):
             elif field_name == "contamination_notes":
                 self.form_vars[field_name] = tk.Text(self.form_frame, height=4, width=38, bg="#262626", fg="#f0f0f0", insertbackground="#f0f0f0", font=(None, 14))
                 self.form_vars[field_name].grid(row=i, column=1, sticky="w", padx=10, pady=6)
+            elif field_name == "source_id":
+                self.form_vars[field_name] = AutocompleteEntry(self.form_frame, lambda text: self.db.completer.suggest_sources("grain_jars", text), width=38, font=(None, 14))
+                self.form_vars[field_name].grid(row=i, column=1, sticky="w", padx=10, pady=6)
             else:
                 self.form_vars[field_name] = ttk.Entry(self.form_frame, width=38, font=(None, 14))
                 self.form_vars[field_name].grid(row=i, column=1, sticky="w", padx=10, pady=6)
 
+        # mL debited from the source liquid culture for each jar saved
+        ttk.Label(self.form_frame, text="LC Volume per Jar (mL):").grid(row=len(fields), column=0, sticky="e", padx=10, pady=6)
+        self.lc_volume_var = tk.StringVar(value=f"{lc_volume_per_jar():g}")
+        ttk.Entry(self.form_frame, textvariable=self.lc_volume_var, width=38,
+                  font=(None, 14)).grid(row=len(fields), column=1, sticky="w", padx=10, pady=6)
+
         # Buttons frame
         button_frame = ttk.Frame(self.form_frame)
-        button_frame.grid(row=len(fields), column=0, columnspan=2, pady=18)
+        button_frame.grid(row=len(fields) + 1, column=0, columnspan=2, pady=18)
 
         ttk.Button(button_frame, text="Save", command=self.save_record).pack(side=tk.LEFT, padx=10, ipadx=8, ipady=4)
         ttk.Button(button_frame, text="Clear", command=self.clear_form).pack(side=tk.LEFT, padx=10, ipadx=8, ipady=4)
         ttk.Button(button_frame, text="Mark as Shaken", command=self.mark_as_shaken).pack(side=tk.LEFT, padx=10, ipadx=8, ipady=4)
+        ttk.Button(button_frame, text="Batch Create...", command=self.batch_create).pack(side=tk.LEFT, padx=10, ipadx=8, ipady=4)
 
     def validate_percentage(self, value):
         """Validate that the percentage input is between 0 and 100"""
@@ -96,13 +112,34 @@ class GrainJarsTab(ttk.Frame):
         """Validate that the source ID exists in either agar_plates or liquid_cultures"""
         if not source_id:
             return False
-        # Check agar_plates
-        self.db.cursor.execute("SELECT 1 FROM agar_plates WHERE plate_id = ?", (source_id,))
-        if self.db.cursor.fetchone():
+        return self.db.id_registry.source_exists("grain_jars", source_id)
+
+    def parse_lc_volume(self, text):
+        """Parse a per-jar LC volume entry, raising ValueError if it is invalid"""
+        try:
+            volume = float(text or 0)
+        except ValueError:
+            raise ValueError("LC volume per jar must be a number")
+        if volume < 0:
+            raise ValueError("LC volume per jar cannot be negative")
+        return volume
+
+    def confirm_lc_volume(self, source_id, jar_count, volume_per_jar, parent=None):
+        """Warn if inoculating would overdraw the source LC.
+
+        Returns None if the user cancels, otherwise whether the balance may
+        go negative.
+        """
+        available = self.db.get_lc_volume(source_id)
+        required = volume_per_jar * jar_count
+        if available is None or required <= available:
+            return False
+        if messagebox.askyesno("Low Liquid Culture Volume",
+                               f"{source_id} has {available:g} mL left, but {jar_count} jar(s) at "
+                               f"{volume_per_jar:g} mL need {required:g} mL.\n\n"
+                               "Record the inoculation anyway?", parent=parent):
             return True
-        # Check liquid_cultures
-        self.db.cursor.execute("SELECT 1 FROM liquid_cultures WHERE lc_id = ?", (source_id,))
-        return bool(self.db.cursor.fetchone())
+        return None
 
     def validate_jar_id(self, jar_id):
         """Validate jar ID format"""
@@ -114,15 +151,18 @@ class GrainJarsTab(ttk.Frame):
     def setup_table(self):
         # Create Treeview
         columns = ("Jar ID", "Source ID", "Inoculation Date", "Colonization %", 
-                  "Shake Date", "Contamination Notes")
+                  "Shake Date", "Contamination Notes", "Est. Complete")
         self.tree = ttk.Treeview(self.table_frame, columns=columns, show="headings", selectmode="extended")
         
         # Set column headings
-        col_widths = [120, 140, 140, 140, 140, 220]
+        col_widths = [120, 140, 140, 140, 140, 220, 120]
         for col, width in zip(columns, col_widths):
             self.tree.heading(col, text=col)
             self.tree.column(col, width=width, anchor="center")
 
+        # Clicking a heading sorts the table by that column
+        self.sorter = TreeviewSorter(self.tree, columns, column_types("grain_jars", 6) + ["date"])
+
         # Add scrollbar
         scrollbar = ttk.Scrollbar(self.table_frame, orient=tk.VERTICAL, command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
@@ -141,8 +181,10 @@ class GrainJarsTab(ttk.Frame):
         self.context_menu.add_command(label="Export Selected", command=self.export_selected)
         self.context_menu.add_separator()
         self.context_menu.add_command(label="Delete Selected", command=self.batch_delete)
+        self.context_menu.add_command(label="Undo Last Batch", command=self.undo_last_batch)
         
         self.tree.bind("<Button-3>", self.show_context_menu)
+        self.tree.bind("<Control-z>", self.undo_last_batch)
 
     def show_context_menu(self, event):
         """Show the context menu on right-click"""
@@ -158,16 +200,11 @@ class GrainJarsTab(ttk.Frame):
 
         if messagebox.askyesno("Confirm", f"Mark {len(selected_items)} jars as shaken?"):
             try:
-                today = datetime.now().isoformat()
-                for item in selected_items:
-                    jar_id = self.tree.item(item)["values"][0]
-                    self.db.cursor.execute('''
-                        UPDATE grain_jars 
-                        SET shake_date = ?, updated_at = ?
-                        WHERE jar_id = ?
-                    ''', (today, self.db.get_timestamp(), jar_id))
-                
-                self.db.conn.commit()
+                # Tree item IDs are the jar IDs, so the selection can be used directly
+                self.db.batch_update("grain_jars", selected_items, {
+                    "shake_date": datetime.now().isoformat(),
+                    "updated_at": self.db.get_timestamp()
+                }, f"Mark {len(selected_items)} jars as shaken")
                 self.load_data()
                 messagebox.showinfo("Success", f"Marked {len(selected_items)} jars as shaken")
             except Exception as e:
@@ -203,15 +240,10 @@ class GrainJarsTab(ttk.Frame):
                 if not 0 <= new_percentage <= 100:
                     raise ValueError("Percentage must be between 0 and 100")
                 
-                for item in selected_items:
-                    jar_id = self.tree.item(item)["values"][0]
-                    self.db.cursor.execute('''
-                        UPDATE grain_jars 
-                        SET colonization_percentage = ?, updated_at = ?
-                        WHERE jar_id = ?
-                    ''', (new_percentage, self.db.get_timestamp(), jar_id))
-                
-                self.db.conn.commit()
+                self.db.batch_update("grain_jars", selected_items, {
+                    "colonization_percentage": new_percentage,
+                    "updated_at": self.db.get_timestamp()
+                }, f"Set colonization of {len(selected_items)} jars to {new_percentage}%")
                 self.load_data()
                 dialog.destroy()
                 messagebox.showinfo("Success", f"Updated {len(selected_items)} jars")
@@ -230,40 +262,111 @@ class GrainJarsTab(ttk.Frame):
             return
 
         if messagebox.askyesno("Confirm Delete", 
-                             f"Are you sure you want to delete {len(selected_items)} jars?\nThis action cannot be undone."):
+                             f"Are you sure you want to delete {len(selected_items)} jars?\nUse \"Undo Last Batch\" to restore them."):
             try:
-                for item in selected_items:
-                    jar_id = self.tree.item(item)["values"][0]
-                    self.db.cursor.execute("DELETE FROM grain_jars WHERE jar_id = ?", (jar_id,))
-                
-                self.db.conn.commit()
+                self.db.batch_delete("grain_jars", selected_items, f"Delete {len(selected_items)} jars")
                 self.load_data()
                 messagebox.showinfo("Success", f"Deleted {len(selected_items)} jars")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete jars: {str(e)}")
 
+    def undo_last_batch(self, event=None):
+        """Revert the most recent batch operation on grain jars"""
+        last_batch = self.db.get_last_batch("grain_jars")
+        if not last_batch:
+            messagebox.showinfo("Undo", "There is no batch operation to undo")
+            return
+
+        batch_id, description, record_count = last_batch
+        message = f"Undo \"{description}\" ({record_count} jars)?"
+        changed = self.db.get_undo_conflicts("grain_jars", batch_id)
+        if changed:
+            shown = ", ".join(changed[:5]) + (", ..." if len(changed) > 5 else "")
+            message += f"\n\n{len(changed)} of these jars changed since then and will be left as they are: {shown}"
+        if messagebox.askyesno("Confirm Undo", message):
+            try:
+                self.db.undo_last_batch("grain_jars")
+                self.load_data()
+                messagebox.showinfo("Success", f"Undid \"{description}\"")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to undo: {str(e)}")
+
+    def batch_create(self):
+        """Create many jars inoculated from one source, with automatically assigned IDs"""
+        dialog = tk.Toplevel(self)
+        dialog.title("Batch Create Grain Jars")
+        dialog.transient(self.winfo_toplevel())
+
+        ttk.Label(dialog, text="LC/Agar Source ID:").grid(row=0, column=0, sticky="e", padx=10, pady=6)
+        source_entry = AutocompleteEntry(dialog, lambda text: self.db.completer.suggest_sources("grain_jars", text),
+                                         width=24, font=(None, 14))
+        source_entry.grid(row=0, column=1, sticky="w", padx=10, pady=6)
+        source_entry.insert(0, self.form_vars["source_id"].get().strip())
+
+        ttk.Label(dialog, text="Inoculation Date:").grid(row=1, column=0, sticky="e", padx=10, pady=6)
+        date_entry = DateEntry(dialog, width=24, background="#262626", foreground="#f0f0f0", headersbackground="#262626", headersforeground="#f0f0f0")
+        date_entry.grid(row=1, column=1, sticky="w", padx=10, pady=6)
+
+        ttk.Label(dialog, text="Number of Jars:").grid(row=2, column=0, sticky="e", padx=10, pady=6)
+        count_var = tk.StringVar(value="12")
+        ttk.Spinbox(dialog, from_=1, to=999, textvariable=count_var, width=24,
+                    font=(None, 14)).grid(row=2, column=1, sticky="w", padx=10, pady=6)
+
+        ttk.Label(dialog, text="Contamination Notes:").grid(row=3, column=0, sticky="e", padx=10, pady=6)
+        notes_entry = ttk.Entry(dialog, width=24, font=(None, 14))
+        notes_entry.grid(row=3, column=1, sticky="w", padx=10, pady=6)
+
+        ttk.Label(dialog, text="LC Volume per Jar (mL):").grid(row=4, column=0, sticky="e", padx=10, pady=6)
+        volume_entry = ttk.Entry(dialog, width=24, font=(None, 14))
+        volume_entry.grid(row=4, column=1, sticky="w", padx=10, pady=6)
+        volume_entry.insert(0, self.lc_volume_var.get())
+
+        def create_jars():
+            try:
+                source_id = source_entry.get().strip()
+                count = int(count_var.get())
+                if count < 1:
+                    raise ValueError("Number of jars must be at least 1")
+                if not self.validate_source_id(source_id):
+                    messagebox.showerror("Error", "Source ID does not exist in Agar Plates or Liquid Cultures", parent=dialog)
+                    return
+                volume_per_jar = self.parse_lc_volume(volume_entry.get().strip())
+                allow_negative = self.confirm_lc_volume(source_id, count, volume_per_jar, parent=dialog)
+                if allow_negative is None:
+                    return
+
+                # IDs are reserved, all jars inserted and the LC debited in one transaction
+                timestamp = self.db.get_timestamp()
+                new_ids = self.db.insert_id_block("grain_jars", "GJ-", count, {
+                    "source_id": source_id,
+                    "inoculation_date": date_entry.get_date().isoformat(),
+                    "colonization_percentage": 0,
+                    "shake_date": None,
+                    "contamination_notes": notes_entry.get().strip(),
+                    "created_at": timestamp,
+                    "updated_at": timestamp
+                }, on_insert=lambda jar_ids: self.db.debit_lc_volume(source_id, jar_ids, volume_per_jar, allow_negative))
+                self.load_data()
+                dialog.destroy()
+                messagebox.showinfo("Success", f"Created {len(new_ids)} jars: {new_ids[0]} to {new_ids[-1]}")
+            except ValueError as e:
+                messagebox.showerror("Error", str(e), parent=dialog)
+            except Exception as e:
+                messagebox.showerror("Error", f"An error occurred: {str(e)}", parent=dialog)
+
+        ttk.Button(dialog, text="Create Jars", command=create_jars).grid(row=5, column=0, columnspan=2, pady=12)
+
+    def export_to_csv(self):
+        """Export the records matching the search box to CSV, JSONL or SQLite"""
+        ExportDialog(self, self.db, "grain_jars", self.search_var.get())
+
     def export_selected(self):
-        """Export selected jars to CSV"""
+        """Export the selected jars to CSV, JSONL or SQLite"""
         selected_items = self.tree.selection()
         if not selected_items:
             messagebox.showwarning("Warning", "Please select jars to export")
             return
-
-        try:
-            filename = f"grain_jars_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                # Write headers
-                writer.writerow(["Jar ID", "Source ID", "Inoculation Date", 
-                               "Colonization %", "Shake Date", "Contamination Notes"])
-                
-                # Write selected data
-                for item in selected_items:
-                    writer.writerow(self.tree.item(item)["values"])
-            
-            messagebox.showinfo("Success", f"Exported {len(selected_items)} jars to {filename}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export data: {str(e)}")
+        ExportDialog(self, self.db, "grain_jars", record_ids=list(selected_items))
 
     def setup_search(self):
         # Search frame
@@ -280,7 +383,7 @@ class GrainJarsTab(ttk.Frame):
         button_frame.pack(fill=tk.X, pady=(0, 10)) # Pack it below the search bar
 
         ttk.Button(button_frame, text="Import from CSV", command=self.import_from_csv).pack(side=tk.RIGHT, padx=(5, 10), ipadx=8, ipady=4)
-        ttk.Button(button_frame, text="Export to CSV", command=self.export_selected).pack(side=tk.RIGHT, padx=(0, 5), ipadx=8, ipady=4)
+        ttk.Button(button_frame, text="Export...", command=self.export_to_csv).pack(side=tk.RIGHT, padx=(0, 5), ipadx=8, ipady=4)
 
     def save_record(self):
         try:
@@ -318,20 +421,25 @@ class GrainJarsTab(ttk.Frame):
                 messagebox.showerror("Error", "Colonization percentage must be between 0 and 100")
                 return
 
+            volume_per_jar = self.parse_lc_volume(self.lc_volume_var.get().strip())
+            allow_negative = self.confirm_lc_volume(values["source_id"], 1, volume_per_jar)
+            if allow_negative is None:
+                return
+
             # Convert dates to ISO format for database storage
             values["inoculation_date"] = values["inoculation_date"].isoformat()
             if values["shake_date"]:
                 values["shake_date"] = values["shake_date"].isoformat()
 
-            # Insert into database
-            self.db.cursor.execute('''
-                INSERT INTO grain_jars 
-                (jar_id, source_id, inoculation_date, colonization_percentage, 
-                shake_date, contamination_notes, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', tuple(values.values()))
-            
-            self.db.conn.commit()
+            # Insert into database and debit the source LC in one transaction
+            with self.db.conn:
+                self.db.cursor.execute('''
+                    INSERT INTO grain_jars 
+                    (jar_id, source_id, inoculation_date, colonization_percentage, 
+                    shake_date, contamination_notes, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', tuple(values.values()))
+                self.db.debit_lc_volume(values["source_id"], [values["jar_id"]], volume_per_jar, allow_negative)
             self.load_data()
             self.clear_form()
             messagebox.showinfo("Success", "Record saved successfully")
@@ -365,29 +473,50 @@ class GrainJarsTab(ttk.Frame):
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
     def load_data(self):
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Clear existing items, including rows hidden by the search filter
+        self.sorter.clear()
+
+        # Forecast completion dates, refitted for all jars whenever a jar has changed
+        forecasts = self.db.chart_data.completion_forecast()
 
-        # Fetch records and cache them
+        # Fetch records and cache the displayed columns plus the forecast
+        # (created_at and updated_at are dropped)
         self.db.cursor.execute("SELECT * FROM grain_jars ORDER BY inoculation_date DESC")
-        self.cached_records = self.db.cursor.fetchall()
-        
-        # Display records
+        self.cached_records = RecordStore(
+            (record[:6] + (forecasts.get(record[0]),) for record in self.db.cursor.fetchall()),
+            self.sorter.column_types
+        )
+
+        # Display records, using the jar ID as the item ID so sorting and
+        # filtering can reorder the existing items instead of rebuilding them
         for record in self.cached_records:
-            self.tree.insert("", tk.END, values=record[:6])  # Exclude created_at and updated_at
+            self.tree.insert("", tk.END, iid=record[0], values=record[:6] + (record[6] or "",))
+        self.sorter.set_records(self.cached_records.column(0), self.cached_records)
+        self.filter_records()
+
+    def show_record(self, record_id):
+        """Select a record in the table, reloading or clearing the search if needed"""
+        if self.sorter.reveal(record_id):
+            return
+        if not self.tree.exists(record_id):
+            self.load_data()  # Added since the table was loaded
+        if self.search_var.get():
+            self.search_var.set("")  # The search box filter hides it
+        self.sorter.reveal(record_id)
 
     def filter_records(self, *args):
-        search_term = self.search_var.get().lower()
-        
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        query = self.search_var.get().strip()
+        if not query:
+            self.sorter.apply()
+            return
 
-        # Filter cached records instead of querying database
-        for record in self.cached_records:
-            if any(search_term in str(value).lower() for value in record[:6]):
-                self.tree.insert("", tk.END, values=record[:6])
+        # The search box takes the filter language from record_query, which
+        # is compiled to SQL so the filtering runs against the indexes
+        try:
+            rows = query_records(self.db, "grain_jars", query, "jar_id")
+        except QueryError:
+            return  # Keep the current results while the query is incomplete
+        self.sorter.apply({row[0] for row in rows})
 
     def edit_record(self, event):
         # Get selected item
@@ -421,28 +550,15 @@ class GrainJarsTab(ttk.Frame):
 
     def import_from_csv(self):
         file_path = filedialog.askopenfilename(
-            title="Select CSV file to import",
-            filetypes=(("CSV files", "*.csv"), ("All files", "*.*"))
+            title="Select file to import",
+            filetypes=(("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl"),
+                       ("SQLite database files", "*.sqlite"), ("All files", "*.*"))
         )
         if not file_path:
             return
 
+        # Nothing is written until the user has reviewed the dry run
         try:
-            with open(file_path, 'r', newline='') as csvfile:
-                reader = csv.reader(csvfile)
-                header = next(reader) # Skip header row
-                
-                records_to_insert = []
-                for row in reader:
-                    # Assuming row order matches database schema (jar_id, source_id, inoculation_date, colonization_percentage, shake_date, contamination_notes)
-                    # Handle potential empty shake_date
-                    if len(row) > 4 and row[4] == '':
-                        row[4] = None
-                    records_to_insert.append(row + [self.db.get_timestamp(), self.db.get_timestamp()])
-
-                self.db.import_records("grain_jars", records_to_insert)
-                self.load_data()
-                messagebox.showinfo("Success", f"{len(records_to_insert)} records imported successfully!")
-
+            ImportDialog(self, self.db, "grain_jars", file_path, on_import=self.load_data)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to import data: {str(e)}") 
\ No newline at end of file
+            messagebox.showerror("Error", f"Failed to read import file: {str(e)}")
\ No newline at end of file
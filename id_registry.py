@@ -0,0 +1,124 @@
+import sys
+import time
+from database import PRIMARY_KEYS
+
+# Seconds between checks of the change_log for writes made by other
+# connections (another MycoTracker window, a DB browser); writes made
+# through this connection are picked up on the next lookup
+EXTERNAL_CHANGES_INTERVAL = 2.0
+
+# Which tables a record's source column may point to: table -> (column, source tables)
+SOURCE_TABLES = {
+    "liquid_cultures": ("source_id", ("agar_plates", "clone_library")),
+    "grain_jars": ("source_id", ("agar_plates", "liquid_cultures")),
+    "bulk_tubs": ("spawn_source", ("grain_jars",)),
+}
+
+TABLE_LABELS = {
+    "agar_plates": "Agar Plates",
+    "liquid_cultures": "Liquid Cultures",
+    "grain_jars": "Grain Jars",
+    "bulk_tubs": "Bulk Tubs",
+    "clone_library": "Clone Library",
+}
+
+class IdRegistry:
+    """In-memory set of the plate, LC, clone, jar and tub IDs.
+
+    The sets are loaded once and then kept current by replaying the
+    database's change_log. The log is only read when this connection has
+    written something since the last read (sqlite3's total_changes, which
+    costs no query) or every EXTERNAL_CHANGES_INTERVAL seconds, so lookups
+    while typing or validating a form don't touch SQLite.
+    Functions in `listeners` are called with each batch of replayed
+    (table name, record ID, operation) changes, or with None after a reload.
+    `generations` holds the change_log seq of each table's latest change.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.ids = {table_name: set() for table_name in PRIMARY_KEYS}
+        self.last_seq = 0
+        self.seen_changes = None    # conn.total_changes when the log was last read
+        self.checked_at = 0.0       # time.monotonic() of that read
+        self.generations = dict.fromkeys(PRIMARY_KEYS, 0)
+        self.listeners = []
+        self.reload()
+
+    def reload(self):
+        """Load every ID from scratch"""
+        self.seen_changes, self.checked_at = self.db.conn.total_changes, time.monotonic()
+        self.db.cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log")
+        self.last_seq = self.db.cursor.fetchone()[0]
+        # Anything may have changed since the last load
+        self.generations = dict.fromkeys(PRIMARY_KEYS, self.last_seq)
+        for table_name, primary_key in PRIMARY_KEYS.items():
+            self.db.cursor.execute(f"SELECT {primary_key} FROM {table_name}")
+            self.ids[table_name] = {sys.intern(str(row[0])) for row in self.db.cursor}
+        for listener in self.listeners:
+            listener(None)
+
+    def refresh(self):
+        """Apply the inserts and deletes logged since the last refresh"""
+        total_changes = self.db.conn.total_changes
+        now = time.monotonic()
+        if total_changes == self.seen_changes and now - self.checked_at < EXTERNAL_CHANGES_INTERVAL:
+            return
+        self.seen_changes, self.checked_at = total_changes, now
+
+        self.db.cursor.execute("SELECT MIN(seq) FROM change_log")
+        oldest_seq = self.db.cursor.fetchone()[0]
+        if oldest_seq is not None and oldest_seq > self.last_seq + 1:
+            # Entries we have not seen were pruned from the log
+            self.reload()
+            return
+
+        self.db.cursor.execute(
+            "SELECT seq, table_name, record_id, operation FROM change_log WHERE seq > ? ORDER BY seq",
+            (self.last_seq,)
+        )
+        changes = self.db.cursor.fetchall()
+        for seq, table_name, record_id, operation in changes:
+            if operation == "delete":
+                self.ids[table_name].discard(record_id)
+            else:
+                self.ids[table_name].add(sys.intern(str(record_id)))
+            self.generations[table_name] = seq
+            self.last_seq = seq
+        if changes:
+            for listener in self.listeners:
+                listener([change[1:] for change in changes])
+
+    def generation(self, tables):
+        """Return a tuple that changes whenever a record of any of `tables` does"""
+        self.refresh()
+        return tuple(self.generations[table_name] for table_name in tables)
+
+    def exists(self, record_id, tables=None):
+        """Return True if the ID exists in any of the given tables (default: all)"""
+        self.refresh()
+        return any(record_id in self.ids[table_name] for table_name in (tables or self.ids))
+
+    def source_exists(self, table_name, source_id):
+        """Return True if `source_id` is a valid source for a record of `table_name`"""
+        return self.exists(source_id, SOURCE_TABLES[table_name][1])
+
+    def find_unknown_sources(self, table_name, source_ids):
+        """Return the sorted source IDs of a batch that match no valid source record.
+
+        The whole batch is checked against the in-memory ID sets, without a
+        query per record.
+        """
+        self.refresh()
+        source_sets = [self.ids[source_table] for source_table in SOURCE_TABLES[table_name][1]]
+        return sorted({source_id for source_id in source_ids
+                       if not any(source_id in ids for ids in source_sets)}, key=str)
+
+def describe_unknown_sources(table_name, unknown, limit=20):
+    """Build a message listing unknown source IDs for an error dialog"""
+    _, source_tables = SOURCE_TABLES[table_name]
+    labels = " or ".join(TABLE_LABELS[source_table] for source_table in source_tables)
+    shown = ", ".join(str(source_id) if source_id else "(empty)" for source_id in unknown[:limit])
+    if len(unknown) > limit:
+        shown += f" and {len(unknown) - limit} more"
+    return f"{len(unknown)} source IDs do not exist in {labels}:\n{shown}"
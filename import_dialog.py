@@ -0,0 +1,88 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from record_import import plan_import, commit_import
+
+# Errors listed in the dialog; the saved report has all of them
+MAX_ERRORS_SHOWN = 1000
+
+class ImportDialog(tk.Toplevel):
+    """Dry run of an import: shows what will be imported and every row's
+    problems, and only writes to the database when the user confirms.
+    """
+
+    def __init__(self, parent, db, table_name, path, on_import=None):
+        super().__init__(parent)
+        self.db = db
+        self.on_import = on_import
+        self.title("Import Preview")
+        self.transient(parent.winfo_toplevel())
+
+        self.config(cursor="watch")
+        self.update_idletasks()
+        try:
+            self.plan = plan_import(db, table_name, path)
+        except Exception:
+            self.destroy()
+            raise
+        self.config(cursor="")
+        plan = self.plan
+
+        valid = len(plan.records)
+        rejected = plan.row_count - valid
+        summary = f"{plan.row_count} rows read: {valid} ready to import, {rejected} with errors"
+        ttk.Label(self, text=summary).pack(anchor=tk.W, padx=10, pady=(10, 2))
+        if plan.positional:
+            columns_text = "No known column headings found; columns read in the standard order"
+        else:
+            columns_text = "Columns: " + ", ".join(plan.mapped_columns)
+        ttk.Label(self, text=columns_text, wraplength=600).pack(anchor=tk.W, padx=10, pady=2)
+        if plan.ignored_headers:
+            ttk.Label(self, text="Ignored: " + ", ".join(plan.ignored_headers),
+                      wraplength=600).pack(anchor=tk.W, padx=10, pady=2)
+
+        if plan.errors:
+            error_frame = ttk.Frame(self)
+            error_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+            columns = ("Line", "Column", "Value", "Problem")
+            tree = ttk.Treeview(error_frame, columns=columns, show="headings", height=12)
+            for col, width in zip(columns, (60, 160, 180, 260)):
+                tree.heading(col, text=col)
+                tree.column(col, width=width, anchor="w")
+            scrollbar = ttk.Scrollbar(error_frame, orient=tk.VERTICAL, command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            for error in sorted(plan.errors)[:MAX_ERRORS_SHOWN]:
+                tree.insert("", tk.END, values=error)
+            if len(plan.errors) > MAX_ERRORS_SHOWN:
+                ttk.Label(self, text=f"Showing the first {MAX_ERRORS_SHOWN} of {len(plan.errors)} problems; "
+                                     "save the report to see them all").pack(anchor=tk.W, padx=10)
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(pady=12)
+        import_button = ttk.Button(button_frame, text=f"Import {valid} Rows", command=self.import_records)
+        import_button.pack(side=tk.LEFT, padx=10, ipadx=8, ipady=4)
+        if not valid:
+            import_button.state(["disabled"])
+        if plan.errors:
+            ttk.Button(button_frame, text="Save Error Report...",
+                       command=self.save_report).pack(side=tk.LEFT, padx=10, ipadx=8, ipady=4)
+        ttk.Button(button_frame, text="Cancel", command=self.destroy).pack(side=tk.LEFT, padx=10, ipadx=8, ipady=4)
+
+    def import_records(self):
+        try:
+            count = commit_import(self.db, self.plan)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import data: {str(e)}", parent=self)
+            return
+        if self.on_import:
+            self.on_import()
+        self.destroy()
+        messagebox.showinfo("Success", f"{count} records imported successfully!")
+
+    def save_report(self):
+        path = filedialog.asksaveasfilename(parent=self, title="Save error report",
+                                            defaultextension=".csv",
+                                            filetypes=(("CSV files", "*.csv"), ("All files", "*.*")))
+        if path:
+            self.plan.write_report(path)
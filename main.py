@@ -1,28 +1,50 @@
 import tkinter as tk
+import tkinter.font
 from tkinter import ttk
 from ttkthemes import ThemedTk
-from database import Database
-from agar_plates_tab import AgarPlatesTab
-from liquid_culture_tab import LiquidCultureTab
-from grain_jars_tab import GrainJarsTab
-from bulk_tubs_tab import BulkTubsTab
-from clone_library_tab import CloneLibraryTab
-from dashboard_tab import DashboardTab
-from reminders_tab import RemindersTab
+from database import Database, TABLE_COLUMNS
+from search_panel import GlobalSearchPanel
 import tkinter.messagebox as messagebox
 import sys
 from datetime import datetime, timedelta
 import calendar
-import smtplib
-from email.mime.text import MIMEText
+import importlib
 import os
 from dotenv import load_dotenv
-import time # Import time module for delay
+import time
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Tabs in display order: tab name -> (module, class). Tab modules (and the
+# heavy libraries they pull in, like matplotlib and tkcalendar) are only
+# imported when the tab is first selected.
+TAB_CLASSES = {
+    "Agar Plates": ("agar_plates_tab", "AgarPlatesTab"),
+    "Liquid Culture": ("liquid_culture_tab", "LiquidCultureTab"),
+    "Grain Jars": ("grain_jars_tab", "GrainJarsTab"),
+    "Bulk Tubs": ("bulk_tubs_tab", "BulkTubsTab"),
+    "Clone Library": ("clone_library_tab", "CloneLibraryTab"),
+    "Dashboard": ("dashboard_tab", "DashboardTab"),
+    "Reminders": ("reminders_tab", "RemindersTab"),
+}
+
+# Set STARTUP_TIMINGS=1 (in the environment or .env) to print how long each
+# startup stage takes
+SHOW_STARTUP_TIMINGS = os.getenv("STARTUP_TIMINGS", "").lower() in ("1", "true", "yes")
+
+# Tab showing each record table, for jumping to search results
+RECORD_TABS = {
+    "agar_plates": "Agar Plates",
+    "liquid_cultures": "Liquid Culture",
+    "grain_jars": "Grain Jars",
+    "bulk_tubs": "Bulk Tubs",
+    "clone_library": "Clone Library",
+}
+
 class SplashScreen(tk.Toplevel):
+    """Startup window showing the progress of the real startup stages"""
+
     def __init__(self, parent):
         tk.Toplevel.__init__(self, parent)
         self.parent = parent
@@ -34,36 +56,24 @@ class SplashScreen(tk.Toplevel):
 
         self.overrideredirect(True) # Remove window decorations
         self.attributes("-topmost", True) # Keep on top
-        self.attributes("-alpha", 0.0) # Start fully transparent
-
-        # No need to re-center here, as main_geometry already contains position
-        self.update_idletasks()
-
-        ttk.Label(self, text="Loading MycoTracker...", font=("TkDefaultFont", 18, "bold")).pack(expand=True)
-
-        self.fade_in()
-
-    def fade_in(self):
-        alpha = self.attributes("-alpha")
-        if alpha < 1.0:
-            alpha += 0.05 # Increment transparency
-            self.attributes("-alpha", alpha)
-            self.after(50, self.fade_in) # Call fade_in again after 50ms
-        else:
-            # Once fully faded in, keep it for a moment, then fade out or destroy
-            self.after(1000, self.fade_out) # Keep for 1 second, then start fading out
-
-    def fade_out(self):
-        alpha = self.attributes("-alpha")
-        if alpha > 0.0:
-            alpha -= 0.05 # Decrement transparency
-            self.attributes("-alpha", alpha)
-            self.after(50, self.fade_out) # Call fade_out again after 50ms
-        else:
-            self.destroy() # Destroy splash screen when fully transparent
+
+        content = ttk.Frame(self)
+        content.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+        ttk.Label(content, text="Loading MycoTracker...", font=("TkDefaultFont", 18, "bold")).pack(pady=10)
+        self.progress = ttk.Progressbar(content, length=400, mode="determinate", maximum=1.0)
+        self.progress.pack(pady=5)
+        self.stage_label = ttk.Label(content, text="")
+        self.stage_label.pack(pady=5)
+        self.update()
+
+    def set_progress(self, stage, fraction):
+        """Show the stage about to run. Startup blocks the event loop, so redraw right away."""
+        self.stage_label.config(text=stage)
+        self.progress["value"] = fraction
+        self.update()
 
 class MycoTrackerApp:
-    def __init__(self, root):
+    def __init__(self, root, splash=None):
         self.root = root
         self.root.title("MycoTracker - Psilocybe Cubensis Cultivation Tracker")
         self.root.geometry("1200x800")  # Reduced window size
@@ -82,46 +92,97 @@ class MycoTrackerApp:
         heading_font = tk.font.nametofont("TkHeadingFont")
         heading_font.configure(size=16, weight="bold")
 
-        # Initialize database
-        self.db = Database()
-        
+        # Run the startup stages, reporting progress on the splash screen if given
+        stages = [
+            ("Opening database", self.open_database),
+            ("Updating database schema", self.migrate_database),
+            ("Warming up caches", self.warm_caches),
+            (f"Loading {next(iter(TAB_CLASSES))}", self.build_interface),
+        ]
+        startup_start = time.perf_counter()
+        for number, (stage_name, stage) in enumerate(stages):
+            if splash:
+                splash.set_progress(stage_name, number / len(stages))
+            stage_start = time.perf_counter()
+            stage()
+            if SHOW_STARTUP_TIMINGS:
+                print(f"Startup: {stage_name} took {(time.perf_counter() - stage_start) * 1000:.0f} ms")
+        if SHOW_STARTUP_TIMINGS:
+            print(f"Startup: finished in {(time.perf_counter() - startup_start) * 1000:.0f} ms")
+
+        # Start reminder checking once the main loop is running
+        self.root.after_idle(self.check_for_reminders)
+
+    def open_database(self):
+        self.db = Database(initialize=False)
+
+    def migrate_database(self):
+        self.db.create_tables()
+
+    def warm_caches(self):
+        """Load the record tables' pages, the ID registry and the autocomplete index before the tabs need them"""
+        for table_name in TABLE_COLUMNS:
+            self.db.cursor.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()
+        self.db.id_registry.refresh()
+        self.db.completer.refresh()
+
+    def build_interface(self):
         # Create main container
         self.main_container = ttk.Frame(self.root)
         self.main_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=12)  # More padding
+
+        # Search across all record tables (Ctrl+F)
+        self.search_panel = GlobalSearchPanel(self.main_container, self.db, self.open_record)
+        self.search_panel.pack(fill=tk.X, pady=(0, 10))
+        self.root.bind("<Control-f>", lambda event: self.search_panel.focus())
         
         # Create notebook (tabbed interface)
         self.notebook = ttk.Notebook(self.main_container)
         self.notebook.pack(fill=tk.BOTH, expand=True)
         
-        # Create tabs
-        self.tabs = {
-            "Agar Plates": AgarPlatesTab(self.notebook, self.db),
-            "Liquid Culture": LiquidCultureTab(self.notebook, self.db),
-            "Grain Jars": GrainJarsTab(self.notebook, self.db),
-            "Bulk Tubs": BulkTubsTab(self.notebook, self.db),
-            "Clone Library": CloneLibraryTab(self.notebook, self.db),
-            "Dashboard": DashboardTab(self.notebook, self.db),
-            "Reminders": RemindersTab(self.notebook, self.db)
-        }
-        
-        # Add tabs to notebook
-        for tab_name, tab_frame in self.tabs.items():
-            self.notebook.add(tab_frame, text=tab_name)
+        # Add an empty frame per tab; the tab itself is built on first selection
+        self.tabs = {}
+        self.tab_frames = {}
+        for tab_name in TAB_CLASSES:
+            self.tab_frames[tab_name] = ttk.Frame(self.notebook)
+            self.notebook.add(self.tab_frames[tab_name], text=tab_name)
+        self.build_tab(next(iter(TAB_CLASSES)))
 
         # Bind tab change event to refresh function
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
 
-        # Start reminder checking
-        self.check_for_reminders()
+    def build_tab(self, tab_name):
+        """Import and create a tab inside its notebook frame, once"""
+        if tab_name not in self.tabs:
+            module_name, class_name = TAB_CLASSES[tab_name]
+            tab_class = getattr(importlib.import_module(module_name), class_name)
+            tab = tab_class(self.tab_frames[tab_name], self.db)
+            tab.pack(fill=tk.BOTH, expand=True)
+            self.tabs[tab_name] = tab
+        return self.tabs[tab_name]
+
+    def open_record(self, table_name, record_id):
+        """Switch to a record's tab and select it there"""
+        tab_name = RECORD_TABS[table_name]
+        tab = self.build_tab(tab_name)
+        self.notebook.select(self.tab_frames[tab_name])
+        tab.show_record(record_id)
 
     def on_tab_change(self, event):
         selected_tab_name = self.notebook.tab(self.notebook.select(), "text")
-        if selected_tab_name in self.tabs:
-            current_tab = self.tabs[selected_tab_name]
-            if hasattr(current_tab, 'refresh'):
-                current_tab.refresh()
+        if selected_tab_name not in TAB_CLASSES:
+            return
+        if selected_tab_name not in self.tabs:
+            self.build_tab(selected_tab_name) # A new tab already shows current data
+            return
+        current_tab = self.tabs[selected_tab_name]
+        if hasattr(current_tab, 'refresh'):
+            current_tab.refresh()
 
     def send_email_notification(self, recipient_email, task, reminder_date, reminder_time, recurrence_type, recurrence_interval, recurrence_end_date, priority, notes, category):
+        import smtplib
+        from email.mime.text import MIMEText
+
         sender_email = os.getenv("SENDER_EMAIL")
         sender_password = os.getenv("SENDER_PASSWORD")
         smtp_server = os.getenv("SMTP_SERVER")
@@ -275,14 +336,16 @@ if __name__ == "__main__":
     root.geometry(f"{app_width}x{app_height}+{x}+{y}")
     root.withdraw() # Hide the main window initially
 
-    # Pass root to splash screen, so it can inherit geometry
-    splash = SplashScreen(root)
-    root.wait_window(splash) # Wait for the splash screen to close
-
     style = ttk.Style(root)
     root.set_theme("equilux")
     style.theme_use("equilux")
-    
-    app = MycoTrackerApp(root)
-    root.deiconify() # Show the main window after splash screen is done
-    root.mainloop() 
\ No newline at end of file
+
+    # Pass root to splash screen, so it can inherit geometry. The app starts
+    # up while the splash is visible and the splash closes once the first
+    # tab is ready.
+    splash = SplashScreen(root)
+    app = MycoTrackerApp(root, splash)
+    root.deiconify() # Show the main window now that the first tab is built
+    root.update_idletasks()
+    splash.destroy()
+    root.mainloop()
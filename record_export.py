@@ -0,0 +1,211 @@
+"""Export engine for the record tables.
+
+Rows are streamed straight from SQLite in chunks and written as CSV, JSONL
+or a standalone SQLite file. Exports run on a worker thread with their own
+database connection; the UI polls ExportJob for progress and can cancel it.
+Every format keeps all columns (including timestamps) under their database
+names, so read_export() can load an exported file back. JSONL and SQLite
+exports are exact. CSV has a single kind of empty field: it reads back as
+empty text in text columns and as NULL elsewhere, so a NULL note comes back
+as '' (which the application treats the same way).
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+from database import TABLE_COLUMNS, PRIMARY_KEYS
+from record_query import compile_query
+
+# Output formats: name -> (file extension, description for file dialogs)
+EXPORT_FORMATS = {
+    "csv": (".csv", "CSV files"),
+    "jsonl": (".jsonl", "JSON Lines files"),
+    "sqlite": (".sqlite", "SQLite database files"),
+}
+
+EXPORT_CHUNK_SIZE = 5000
+
+class ExportCancelled(Exception):
+    """Raised inside the worker when an export is cancelled"""
+
+class _CsvWriter:
+    def __init__(self, path, table_name, columns):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, rows):
+        # NULLs and empty text both become empty fields, see read_export()
+        self.writer.writerows(["" if value is None else value for value in row] for row in rows)
+
+    def close(self):
+        self.file.close()
+
+class _JsonlWriter:
+    def __init__(self, path, table_name, columns):
+        self.file = open(path, "w", encoding="utf-8")
+        self.columns = columns
+
+    def write(self, rows):
+        self.file.writelines(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + "\n"
+                             for row in rows)
+
+    def close(self):
+        self.file.close()
+
+class _SqliteWriter:
+    def __init__(self, path, table_name, columns, create_sql):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(create_sql)
+        self.sql = (f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})")
+
+    def write(self, rows):
+        self.conn.executemany(self.sql, rows)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+class ExportJob:
+    """Export the rows of a table matching a filter query to a file.
+
+    Call start() to run the export on a worker thread, then poll `done`,
+    `total`, `finished` and `error` from the UI thread. cancel() stops the
+    export after the current chunk and removes the partial file. `record_ids`
+    limits the export to those records and `where` is an extra SQL condition,
+    as in record_query.query_records().
+    """
+
+    def __init__(self, db_name, table_name, path, fmt="csv", query="", record_ids=None,
+                 where=None, chunk_size=EXPORT_CHUNK_SIZE):
+        self.db_name = db_name
+        self.table_name = table_name
+        self.path = path
+        self.fmt = fmt
+        self.query = query.strip()
+        self.record_ids = record_ids
+        self.where = where
+        self.chunk_size = chunk_size
+        self.total = 0
+        self.done = 0
+        self.finished = False
+        self.cancelled = False
+        self.error = None
+        self._cancel_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def wait(self):
+        """Block until the worker thread has finished"""
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        try:
+            self.run()
+        except ExportCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = True
+
+    def run(self):
+        """Run the export on the calling thread"""
+        where, params = compile_query(self.table_name, self.query)
+        if self.where:
+            where = f"({self.where}) AND {where}"
+        columns = [name for name, _ in TABLE_COLUMNS[self.table_name]]
+
+        # SQLite connections can't be shared between threads, so the worker opens its own
+        conn = sqlite3.connect(self.db_name)
+        writer = None
+        try:
+            cursor = conn.cursor()
+            if self.record_ids is not None:
+                cursor.execute("CREATE TEMP TABLE export_ids (record_id TEXT PRIMARY KEY)")
+                cursor.executemany("INSERT OR IGNORE INTO temp.export_ids VALUES (?)",
+                                   ((record_id,) for record_id in self.record_ids))
+                where += f" AND {PRIMARY_KEYS[self.table_name]} IN (SELECT record_id FROM temp.export_ids)"
+
+            cursor.execute(f"SELECT COUNT(*) FROM {self.table_name} WHERE {where}", params)
+            self.total = cursor.fetchone()[0]
+
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            if self.fmt == "sqlite":
+                create_sql = cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                            (self.table_name,)).fetchone()[0]
+                writer = _SqliteWriter(self.path, self.table_name, columns, create_sql)
+            elif self.fmt == "jsonl":
+                writer = _JsonlWriter(self.path, self.table_name, columns)
+            else:
+                writer = _CsvWriter(self.path, self.table_name, columns)
+
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {self.table_name} WHERE {where}", params)
+            while True:
+                if self._cancel_event.is_set():
+                    raise ExportCancelled()
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                writer.write(rows)
+                self.done += len(rows)
+        except BaseException:
+            if writer:
+                writer.close()
+                writer = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            raise
+        finally:
+            if writer:
+                writer.close()
+            conn.close()
+
+def _typed(value, col_type):
+    if value == "":
+        return "" if col_type == "text" else None
+    if col_type == "int":
+        return int(value)
+    if col_type == "float":
+        return float(value)
+    return value
+
+def read_export(path, table_name):
+    """Read a file written by ExportJob back into rows in schema order.
+
+    Returns None if the file is a CSV without the full set of database
+    column names in its header (i.e. not one of our exports).
+    """
+    columns = TABLE_COLUMNS[table_name]
+    names = [name for name, _ in columns]
+
+    if path.lower().endswith((".sqlite", ".db")):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute(f"SELECT {', '.join(names)} FROM {table_name}").fetchall()
+        finally:
+            conn.close()
+
+    if path.lower().endswith(".jsonl"):
+        with open(path, encoding="utf-8") as jsonlfile:
+            records = (json.loads(line) for line in jsonlfile if line.strip())
+            return [tuple(record.get(name) for name in names) for record in records]
+
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, [])
+        if not set(names) <= set(header):
+            return None
+        positions = [header.index(name) for name in names]
+        return [tuple(_typed(row[position], col_type) for position, (_, col_type) in zip(positions, columns))
+                for row in reader if row]
@@ -0,0 +1,277 @@
+"""Typed import pipeline for the record tables.
+
+plan_import() reads a CSV file (or a JSONL/SQLite file written by Export...),
+maps its headers to table columns, converts whole columns to their types and
+validates every row, without touching the database. The resulting ImportPlan
+holds the valid records plus a per-row error report, so the user can review
+a dry run before commit_import() writes anything.
+
+Headers are matched case-insensitively against the column names, the short
+field names of the search box (see record_query.FIELD_ALIASES) and the
+headings of older CSV exports. Files whose header names no known column are
+read the old way: columns in schema order, timestamps left out.
+"""
+import ast
+import csv
+import re
+from datetime import date, datetime
+from database import TABLE_COLUMNS, PRIMARY_KEYS
+from id_registry import SOURCE_TABLES
+from record_query import FIELD_ALIASES
+from record_export import read_export
+
+# Headings used by older exports that the other aliases don't cover
+HEADER_ALIASES = {
+    "liquid_cultures": {"volume_ml": "volume_remaining"},
+    "bulk_tubs": {
+        "first_pins": "first_pins_date",
+        "flush_1_g": "harvest_weight_flush1", "harvest_weight_flush_1_g": "harvest_weight_flush1",
+        "flush_2_g": "harvest_weight_flush2", "harvest_weight_flush_2_g": "harvest_weight_flush2",
+        "flush_3_g": "harvest_weight_flush3", "harvest_weight_flush_3_g": "harvest_weight_flush3",
+    },
+}
+
+# Allowed (min, max) values of numeric columns; None leaves a side open
+VALUE_RANGES = {
+    ("liquid_cultures", "volume_remaining"): (0, None),
+    ("grain_jars", "colonization_percentage"): (0, 100),
+    ("bulk_tubs", "harvest_weight_flush1"): (0, None),
+    ("bulk_tubs", "harvest_weight_flush2"): (0, None),
+    ("bulk_tubs", "harvest_weight_flush3"): (0, None),
+    ("clone_library", "archived"): (0, 1),
+}
+
+# ID formats enforced by the entry forms
+ID_PATTERNS = {
+    "grain_jars": (re.compile(r"GJ-\d{4}"), "GJ-XXXX"),
+}
+
+# Date formats accepted besides ISO (YYYY-MM-DD, optionally with a time part)
+DATE_FORMATS = ("%m/%d/%Y", "%d.%m.%Y", "%Y/%m/%d", "%m/%d/%y")
+
+TIMESTAMP_COLUMNS = ("created_at", "updated_at")
+
+# Number of errors kept per import; rows beyond that are still rejected
+MAX_REPORTED_ERRORS = 10000
+
+def _normalize_header(text):
+    return re.sub(r"[^0-9a-z]+", "_", str(text).strip().lower()).strip("_")
+
+def map_headers(table_name, header):
+    """Return the table column for each header field (None if unknown)"""
+    names = {name for name, _ in TABLE_COLUMNS[table_name]}
+    aliases = {**FIELD_ALIASES.get(table_name, {}), **HEADER_ALIASES.get(table_name, {})}
+    mapping = []
+    for field in header:
+        key = _normalize_header(field)
+        column = key if key in names else aliases.get(key)
+        mapping.append(column if column not in mapping else None)
+    return mapping
+
+def _parse_date(text):
+    """Return an ISO date; ISO date and time values (e.g. from Mark as Shaken) are kept whole"""
+    text = text.strip()
+    try:
+        return date.fromisoformat(text).isoformat()
+    except ValueError:
+        pass
+    try:
+        datetime.fromisoformat(text)
+        return text
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            pass
+    raise ValueError("not a date")
+
+def _parse_int(text):
+    number = float(text)
+    if not number.is_integer():
+        raise ValueError("not a whole number")
+    return int(number)
+
+# Text and timestamp columns are only stripped
+CONVERTERS = {
+    "date": _parse_date,
+    "int": _parse_int,
+    "float": float,
+}
+
+TYPE_NAMES = {"date": "a date", "int": "a whole number", "float": "a number"}
+
+_MISSING = object()
+_INVALID = object()
+
+class ImportPlan:
+    """The outcome of a dry run: valid records in schema order plus errors.
+
+    `errors` is a list of (line number, column, value, message) tuples;
+    line numbers count the header as line 1 for CSV files.
+    """
+
+    def __init__(self, table_name, path):
+        self.table_name = table_name
+        self.path = path
+        self.mapped_columns = []
+        self.ignored_headers = []
+        self.positional = False
+        self.row_count = 0
+        self.records = []
+        self.errors = []
+        self.error_lines = set()
+
+    def add_error(self, line, column, value, message):
+        self.error_lines.add(line)
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, column, value, message))
+
+    def write_report(self, path):
+        """Save the error report as CSV"""
+        with open(path, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Line", "Column", "Value", "Problem"])
+            writer.writerows(sorted(self.errors))
+
+def _column_defaults(db, table_name):
+    """Return {column: default value} and the NOT NULL columns of a table"""
+    db.cursor.execute(f"PRAGMA table_info({table_name})")
+    defaults, required = {}, set()
+    for _, name, _, notnull, default, _ in db.cursor.fetchall():
+        if default is not None:
+            defaults[name] = ast.literal_eval(default)
+        if notnull and name not in TIMESTAMP_COLUMNS:
+            required.add(name)
+    return defaults, required
+
+def _read_rows(path, table_name):
+    """Return (header, rows, first data line number) for a supported file"""
+    if path.lower().endswith((".jsonl", ".sqlite", ".db")):
+        return [name for name, _ in TABLE_COLUMNS[table_name]], read_export(path, table_name), 1
+    with open(path, newline="", encoding="utf-8-sig") as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, [])
+        return header, [row for row in reader if any(row)], 2
+
+def plan_import(db, table_name, path):
+    """Read and validate a file for import into `table_name` without writing anything"""
+    plan = ImportPlan(table_name, path)
+    header, rows, first_line = _read_rows(path, table_name)
+    plan.row_count = len(rows)
+    primary_key = PRIMARY_KEYS[table_name]
+    column_types = dict(TABLE_COLUMNS[table_name])
+
+    mapping = map_headers(table_name, header)
+    if primary_key not in mapping:
+        # No usable header: the old import format, columns in schema order
+        plan.positional = True
+        data_columns = [name for name, _ in TABLE_COLUMNS[table_name] if name not in TIMESTAMP_COLUMNS]
+        mapping = data_columns[:len(header)]
+    plan.mapped_columns = [column for column in mapping if column]
+    plan.ignored_headers = [field for field, column in zip(header, mapping) if not column]
+
+    # Convert column by column; repeated values (dates, sources...) are converted once
+    width = len(mapping)
+    padded = (row if len(row) >= width else list(row) + [""] * (width - len(row)) for row in rows)
+    columns = list(zip(*padded)) or [()] * width
+    converted = {}
+    invalid_cells = set()
+    for position, column in enumerate(mapping):
+        if not column:
+            continue
+        col_type = column_types[column]
+        if col_type in ("text", "timestamp"):
+            # Text can't fail to convert, and IDs and notes rarely repeat. Empty
+            # text stays empty rather than NULL, as the entry forms save it
+            converted[column] = [None if value is None else str(value).strip()
+                                 for value in columns[position]]
+            continue
+        convert = CONVERTERS[col_type]
+        cache = {}
+        values = []
+        for index, value in enumerate(columns[position]):
+            if value is None or value == "":
+                values.append(None)
+                continue
+            result = cache.get(value, _MISSING)
+            if result is _MISSING:
+                try:
+                    result = convert(value.strip() if isinstance(value, str) else value)
+                except (TypeError, ValueError):
+                    result = _INVALID
+                cache[value] = result
+            if result is _INVALID:
+                plan.add_error(index + first_line, column, value, f"Must be {TYPE_NAMES[col_type]}")
+                invalid_cells.add((index, column))
+                result = None
+            values.append(result)
+        converted[column] = values
+
+    defaults, required = _column_defaults(db, table_name)
+    required.add(primary_key)
+    timestamp = db.get_timestamp()
+    empty = [None] * plan.row_count
+    for column in TIMESTAMP_COLUMNS:
+        converted[column] = [value or timestamp for value in converted.get(column, empty)]
+    for column, default in defaults.items():
+        converted[column] = [default if value is None else value for value in converted.get(column, empty)]
+
+    # Required fields and value ranges
+    for column in required:
+        for index, value in enumerate(converted.get(column, empty)):
+            if (value is None or value == "") and (index, column) not in invalid_cells:
+                plan.add_error(index + first_line, column, "", "Required")
+    for (range_table, column), (low, high) in VALUE_RANGES.items():
+        if range_table != table_name or column not in converted:
+            continue
+        for index, value in enumerate(converted[column]):
+            if value is not None and ((low is not None and value < low) or (high is not None and value > high)):
+                bounds = f"between {low} and {high}" if high is not None else f"at least {low}"
+                plan.add_error(index + first_line, column, value, f"Must be {bounds}")
+
+    # IDs: format, duplicates within the file and records that already exist
+    ids = converted.get(primary_key, empty)
+    pattern, pattern_text = ID_PATTERNS.get(table_name, (None, None))
+    registry = db.id_registry
+    registry.refresh()
+    existing = registry.ids[table_name]
+    seen = set()
+    for index, record_id in enumerate(ids):
+        if not record_id:
+            continue
+        if pattern and not pattern.fullmatch(record_id):
+            plan.add_error(index + first_line, primary_key, record_id, f"ID must look like {pattern_text}")
+        if record_id in existing:
+            plan.add_error(index + first_line, primary_key, record_id, "ID already exists")
+        elif record_id in seen:
+            plan.add_error(index + first_line, primary_key, record_id, "ID appears more than once in the file")
+        seen.add(record_id)
+
+    # Sources must exist; checked for the whole file against the ID registry
+    if table_name in SOURCE_TABLES:
+        source_column = SOURCE_TABLES[table_name][0]
+        sources = converted.get(source_column, empty)
+        unknown = set(registry.find_unknown_sources(table_name, {value for value in sources if value}))
+        if unknown:
+            for index, value in enumerate(sources):
+                if value in unknown:
+                    plan.add_error(index + first_line, source_column, value, "Source ID does not exist")
+
+    if table_name == "grain_jars":
+        for index, (inoculated, shaken) in enumerate(zip(converted.get("inoculation_date", empty),
+                                                              converted.get("shake_date", empty))):
+            if inoculated and shaken and shaken[:10] < inoculated[:10]:
+                plan.add_error(index + first_line, "shake_date", shaken, "Shake date is before inoculation date")
+
+    names = [name for name, _ in TABLE_COLUMNS[table_name]]
+    records = zip(*(converted.get(name, empty) for name in names))
+    plan.records = [record for index, record in enumerate(records)
+                    if index + first_line not in plan.error_lines]
+    return plan
+
+def commit_import(db, plan):
+    """Insert the valid records of a plan in one transaction and return their count"""
+    db.import_records(plan.table_name, plan.records)
+    return len(plan.records)
@@ -0,0 +1,243 @@
+"""Small filter language for record tables, compiled to parameterized SQL.
+
+A query is a whitespace separated list of terms, all of which must match:
+
+    colonization>=80           comparison (>=, <=, >, <, =, !=)
+    source:ABT-*               field match, * and ? are wildcards
+    shaken:none                field is empty (also: "any" for not empty)
+    inoc:2025-06..2025-07      inclusive range, either end may be left open
+    inoc:2025-06               partial dates match the whole month/year
+    "green mold"  mold         free text, matched against every column
+    -notes:mold                a leading "-" negates any term
+
+Usage from other modules or scripts:
+
+    where, params = compile_query("grain_jars", "colonization>=80 shaken:none")
+    rows = query_records(db, "grain_jars", "source:ABT-*")
+
+Or from the command line:
+
+    python record_query.py grain_jars 'colonization>=80 shaken:none'
+"""
+import re
+from datetime import date
+from functools import lru_cache
+from database import TABLE_COLUMNS, PRIMARY_KEYS
+
+# Short field names accepted in queries, in addition to the full column names
+FIELD_ALIASES = {
+    "agar_plates": {
+        "id": "plate_id", "plate": "plate_id", "strain": "strain_name",
+        "date": "date_inoculated", "inoc": "date_inoculated", "inoculated": "date_inoculated",
+        "growth": "growth_description", "contamination": "contamination_notes",
+        "contam": "contamination_notes", "notes": "contamination_notes",
+    },
+    "liquid_cultures": {
+        "id": "lc_id", "lc": "lc_id", "source": "source_id", "strain": "strain_name",
+        "date": "inoculation_date", "inoc": "inoculation_date", "growth": "growth_description",
+        "volume": "volume_remaining",
+    },
+    "grain_jars": {
+        "id": "jar_id", "jar": "jar_id", "source": "source_id",
+        "date": "inoculation_date", "inoc": "inoculation_date",
+        "colonization": "colonization_percentage", "col": "colonization_percentage",
+        "shaken": "shake_date", "shake": "shake_date", "contamination": "contamination_notes",
+        "contam": "contamination_notes", "notes": "contamination_notes",
+    },
+    "bulk_tubs": {
+        "id": "tub_id", "tub": "tub_id", "source": "spawn_source", "spawn": "spawn_source",
+        "substrate": "substrate_type", "date": "date_to_bulk", "bulk": "date_to_bulk",
+        "pins": "first_pins_date", "flush1": "harvest_weight_flush1",
+        "flush2": "harvest_weight_flush2", "flush3": "harvest_weight_flush3",
+        "notes": "performance_notes",
+    },
+    "clone_library": {
+        "id": "clone_id", "clone": "clone_id", "strain": "parent_strain", "parent": "parent_strain",
+        "date": "date_taken", "taken": "date_taken", "tissue": "tissue_source",
+        "growth": "growth_characteristics", "notes": "performance_notes",
+    },
+}
+
+# Fields computed from several columns: name -> (table, SQL expression, type)
+COMPUTED_FIELDS = {
+    ("bulk_tubs", "yield"): ("(COALESCE(harvest_weight_flush1, 0) + COALESCE(harvest_weight_flush2, 0)"
+                             " + COALESCE(harvest_weight_flush3, 0))", "float"),
+}
+
+# Free-form text columns: "field:value" matches a substring instead of the whole value
+NOTE_COLUMNS = {
+    "growth_description", "contamination_notes", "performance_notes", "growth_characteristics",
+}
+
+TERM_PATTERN = re.compile(r'(-?)(?:(\w+)(>=|<=|!=|=|>|<|:))?(?:"([^"]*)"?|(\S+))')
+
+class QueryError(ValueError):
+    """Raised when a filter query cannot be parsed for a table"""
+
+def _like_pattern(text):
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def _date_bounds(text):
+    """Return the [start, end) ISO date strings covered by a (partial) date"""
+    try:
+        parts = [int(part) for part in text.split("-")]
+        if len(parts) == 1:
+            start, end = date(parts[0], 1, 1), date(parts[0] + 1, 1, 1)
+        elif len(parts) == 2:
+            start = date(parts[0], parts[1], 1)
+            end = date(parts[0] + parts[1] // 12, parts[1] % 12 + 1, 1)
+        elif len(parts) == 3:
+            start = date(parts[0], parts[1], parts[2])
+            end = date.fromordinal(start.toordinal() + 1)
+        else:
+            raise ValueError
+    except ValueError:
+        raise QueryError(f"Invalid date '{text}' (use YYYY, YYYY-MM or YYYY-MM-DD)")
+    return start.isoformat(), end.isoformat()
+
+def _number(text, field):
+    try:
+        return float(text) if "." in text else int(text)
+    except ValueError:
+        raise QueryError(f"'{field}' needs a number, got '{text}'")
+
+def _resolve_field(table_name, field):
+    field = field.lower()
+    if (table_name, field) in COMPUTED_FIELDS:
+        return COMPUTED_FIELDS[(table_name, field)]
+    column = FIELD_ALIASES[table_name].get(field, field)
+    for name, col_type in TABLE_COLUMNS[table_name]:
+        if name == column:
+            return name, col_type
+    raise QueryError(f"Unknown field '{field}'")
+
+def _compile_free_text(table_name, text):
+    columns = [name for name, col_type in TABLE_COLUMNS[table_name] if col_type != "timestamp"]
+    pattern = _like_pattern(text)
+    sql = " OR ".join(f"{name} LIKE ? ESCAPE '\\'" for name in columns)
+    return f"({sql})", [pattern] * len(columns)
+
+def _compile_range(expr, col_type, field, low, high):
+    clauses, params = [], []
+    if col_type == "date":
+        if low:
+            clauses.append(f"{expr} >= ?")
+            params.append(_date_bounds(low)[0])
+        if high:
+            clauses.append(f"{expr} < ?")
+            params.append(_date_bounds(high)[1])
+    elif col_type in ("int", "float"):
+        if low:
+            clauses.append(f"{expr} >= ?")
+            params.append(_number(low, field))
+        if high:
+            clauses.append(f"{expr} <= ?")
+            params.append(_number(high, field))
+    else:
+        if low:
+            clauses.append(f"{expr} >= ?")
+            params.append(low)
+        if high:
+            clauses.append(f"{expr} <= ?")
+            params.append(high)
+    if not clauses:
+        raise QueryError(f"Empty range for '{field}'")
+    return "(" + " AND ".join(clauses) + ")", params
+
+def _compile_field(table_name, field, operator, value):
+    expr, col_type = _resolve_field(table_name, field)
+
+    if operator in (":", "=") and value.lower() in ("none", "null", "empty"):
+        return f"({expr} IS NULL OR {expr} = '')", []
+    if operator in (":", "=") and value.lower() == "any":
+        return f"({expr} IS NOT NULL AND {expr} != '')", []
+    if operator in (":", "=") and ".." in value:
+        low, high = value.split("..", 1)
+        return _compile_range(expr, col_type, field, low, high)
+
+    if col_type == "date":
+        start, end = _date_bounds(value)
+        if operator in (":", "="):
+            return f"({expr} >= ? AND {expr} < ?)", [start, end]
+        if operator == "!=":
+            # Records without a date aren't on that date either
+            return f"({expr} >= ? AND {expr} < ?) IS NOT 1", [start, end]
+        bound = {">=": start, ">": end, "<": start, "<=": end}[operator]
+        sql_operator = {">=": ">=", ">": ">=", "<": "<", "<=": "<"}[operator]
+        return f"{expr} {sql_operator} ?", [bound]
+
+    if col_type in ("int", "float"):
+        number = _number(value, field)
+        sql_operator = "=" if operator == ":" else operator
+        return f"{expr} {sql_operator} ?", [number]
+
+    if operator == ":" and ("*" in value or "?" in value):
+        # GLOB keeps a leading literal prefix usable by the column's index
+        return f"{expr} GLOB ?", [value]
+    if operator == ":" and expr in NOTE_COLUMNS:
+        return f"{expr} LIKE ? ESCAPE '\\'", [_like_pattern(value)]
+    sql_operator = "=" if operator == ":" else operator
+    return f"{expr} {sql_operator} ?", [value]
+
+@lru_cache(maxsize=256)
+def compile_query(table_name, text):
+    """Compile a filter query into a (WHERE clause, params) pair for a table.
+
+    An empty query compiles to ("1", ()). Raises QueryError for invalid input.
+    """
+    if table_name not in TABLE_COLUMNS:
+        raise QueryError(f"Unknown table '{table_name}'")
+
+    clauses, params = [], []
+    for match in TERM_PATTERN.finditer(text):
+        negate, field, operator, quoted, bare = match.groups()
+        value = quoted if quoted is not None else bare
+        if field is None:
+            if not value:
+                continue
+            sql, term_params = _compile_free_text(table_name, value)
+        else:
+            if not value:
+                raise QueryError(f"Missing value for '{field}'")
+            sql, term_params = _compile_field(table_name, field, operator, value)
+        # "IS NOT 1" rather than NOT, which is NULL (no match) for empty columns
+        clauses.append(f"({sql}) IS NOT 1" if negate else sql)
+        params.extend(term_params)
+
+    if not clauses:
+        return "1", ()
+    return " AND ".join(clauses), tuple(params)
+
+def query_records(db, table_name, text, columns="*", where=None):
+    """Return the rows of a table matching a filter query.
+
+    `where` is an optional extra SQL condition (without parameters) that the
+    rows must also satisfy, e.g. "archived = 0".
+    """
+    sql_where, params = compile_query(table_name, text.strip())
+    if where:
+        sql_where = f"({where}) AND {sql_where}"
+    db.cursor.execute(f"SELECT {columns} FROM {table_name} WHERE {sql_where}", params)
+    return db.cursor.fetchall()
+
+if __name__ == "__main__":
+    import argparse
+    import csv
+    import sys
+    from database import Database
+
+    parser = argparse.ArgumentParser(description="Print the records matching a filter query as CSV")
+    parser.add_argument("table", choices=sorted(PRIMARY_KEYS))
+    parser.add_argument("query", nargs="?", default="")
+    parser.add_argument("--db", default="mycotracker.db", help="Database file")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    try:
+        rows = query_records(db, args.table, args.query)
+    except QueryError as e:
+        sys.exit(f"Invalid query: {e}")
+    writer = csv.writer(sys.stdout)
+    writer.writerow([name for name, _ in TABLE_COLUMNS[args.table]])
+    writer.writerows(rows)
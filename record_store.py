@@ -0,0 +1,136 @@
+"""Compact in-memory copy of a tab's records.
+
+The tabs used to keep every fetched row as a tuple of Python objects. A
+RecordStore keeps one array per column instead: numbers in typed arrays,
+dates as day ordinals and text dictionary-encoded, so a strain name or
+substrate type repeated across thousands of rows is stored once. Values
+that don't fit their column's type (a date with a time part, text in a
+number column) are kept as they are, so rows read back exactly as fetched.
+"""
+import math
+from array import array
+from datetime import date
+
+# Stands in for NULL in integer columns
+INT_NULL = -2 ** 63
+
+class _TextColumn:
+    def __init__(self, values):
+        lookup = {None: 0}
+        self.codes = array("I", [lookup.setdefault(value, len(lookup)) for value in values])
+        self.strings = list(lookup)
+
+    def __getitem__(self, index):
+        return self.strings[self.codes[index]]
+
+    def to_list(self):
+        strings = self.strings
+        return [strings[code] for code in self.codes]
+
+class _ExceptionColumn:
+    """Base for array columns; values the array can't hold go in `exceptions`"""
+
+    def __getitem__(self, index):
+        if index in self.exceptions:
+            return self.exceptions[index]
+        return self.decode(self.data[index])
+
+    def to_list(self):
+        decode = self.decode
+        values = [decode(item) for item in self.data]
+        for index, value in self.exceptions.items():
+            values[index] = value
+        return values
+
+    def _set_exceptions(self, values, fits):
+        """Store the values for which `fits` is false as exceptions"""
+        self.exceptions = {index: value for index, value in enumerate(values)
+                           if value is not None and not fits(value)}
+
+class _DateColumn(_ExceptionColumn):
+    def __init__(self, values):
+        # Dates repeat a lot, so each distinct value is parsed once
+        ordinals = {None: 0}
+        for value in set(values):
+            if value is not None:
+                try:
+                    parsed = date.fromisoformat(value)
+                    ordinals[value] = parsed.toordinal() if parsed.isoformat() == value else 0
+                except (TypeError, ValueError):
+                    ordinals[value] = 0
+        self.data = array("i", [ordinals[value] for value in values])
+        self._set_exceptions(values, ordinals.__getitem__)
+        self._strings = {}
+
+    def decode(self, ordinal):
+        if not ordinal:
+            return None
+        text = self._strings.get(ordinal)
+        if text is None:
+            text = self._strings[ordinal] = date.fromordinal(ordinal).isoformat()
+        return text
+
+class _IntColumn(_ExceptionColumn):
+    def __init__(self, values):
+        fits = lambda value: type(value) is int and value != INT_NULL
+        self._set_exceptions(values, fits)
+        self.data = array("q", [value if value is not None and fits(value) else INT_NULL
+                                for value in values])
+
+    @staticmethod
+    def decode(value):
+        return None if value == INT_NULL else value
+
+class _FloatColumn(_ExceptionColumn):
+    def __init__(self, values):
+        fits = lambda value: type(value) is float and not math.isnan(value)
+        self._set_exceptions(values, fits)
+        self.data = array("d", [value if value is not None and fits(value) else math.nan
+                                for value in values])
+
+    @staticmethod
+    def decode(value):
+        return None if math.isnan(value) else value
+
+COLUMN_CLASSES = {
+    "text": _TextColumn,
+    "timestamp": _TextColumn,
+    "date": _DateColumn,
+    "int": _IntColumn,
+    "float": _FloatColumn,
+}
+
+class RecordStore:
+    """Read-only rows stored column by column.
+
+    Built from row tuples and the types of the columns to keep (as returned
+    by database.column_types); extra values at the end of each row, such as
+    the created_at/updated_at timestamps, are dropped. Indexing and
+    iteration return row tuples; column() returns one column as a list.
+    """
+
+    def __init__(self, rows, column_types):
+        self.column_types = list(column_types)
+        rows = list(rows)
+        self._length = len(rows)
+        width = len(self.column_types)
+        values = list(zip(*rows))[:width] or [()] * width
+        self._columns = [COLUMN_CLASSES[col_type](column)
+                         for col_type, column in zip(self.column_types, values)]
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("record index out of range")
+        return tuple(column[index] for column in self._columns)
+
+    def __iter__(self):
+        return zip(*(column.to_list() for column in self._columns))
+
+    def column(self, index):
+        """Return every value of one column"""
+        return self._columns[index].to_list()
@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
+from table_sorter import TreeviewSorter
 
 class RemindersTab(ttk.Frame):
     def __init__(self, parent, db):
@@ -133,6 +134,11 @@ class RemindersTab(ttk.Frame):
         self.reminders_tree.column("Category", width=80, anchor=tk.CENTER)
         self.reminders_tree.pack(fill=tk.BOTH, expand=True)
 
+        # Clicking a heading sorts the reminders by that column
+        self.sorter = TreeviewSorter(self.reminders_tree,
+                                     ("Task", "Date", "Time", "Priority", "Recurrence", "Notes", "Category"),
+                                     ("text", "date", "text", "text", "text", "text", "text"))
+
         self.load_reminders()
 
         button_frame = ttk.Frame(list_frame)
@@ -279,6 +285,7 @@ class RemindersTab(ttk.Frame):
 
         reminders = self.db.cursor.execute(query, params).fetchall()
         
+        displayed_rows = []
         for reminder in reminders:
             recurrence_display = reminder[4] # Recurrence Type
             if reminder[4] != 'None':
@@ -298,7 +305,13 @@ class RemindersTab(ttk.Frame):
             if len(notes_display) > 50:
                 notes_display = notes_display[:47] + "..."
 
-            self.reminders_tree.insert("", "end", iid=reminder[0], values=(reminder[1], reminder[2], reminder[3], reminder[7], recurrence_display, notes_display, reminder[9]))
+            row = (reminder[1], reminder[2], reminder[3], reminder[7], recurrence_display, notes_display, reminder[9])
+            self.reminders_tree.insert("", "end", iid=reminder[0], values=row)
+            displayed_rows.append(row)
+
+        # Keep the user's chosen sort order across reloads
+        self.sorter.set_records([str(reminder[0]) for reminder in reminders], displayed_rows)
+        self.sorter.apply()
 
         self.date_entry.delete(0, tk.END)
         self.time_entry.delete(0, tk.END)
@@ -0,0 +1,225 @@
+"""Render the dashboard charts and summary tables to one zip file, without Tk.
+
+    python report.py --format pdf --output weekly_report.zip
+
+The data is queried once, in this process, through Database.chart_data.
+Each chart is then drawn by a worker of a process pool on a plain matplotlib
+Figure (Agg for PNG, matplotlib's own SVG/PDF writers otherwise; no pyplot
+and no GUI backend) and sent back as file bytes, so the charts render in
+parallel. The summary tables are written to the bundle as CSV files.
+"""
+import csv
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from chart_data import RECORD_CATEGORIES, TIMELINE_DAYS
+from yield_engine import (GROUPINGS, GROUP_TABLE_COLUMNS, INTERVAL_TABLE_COLUMNS, CONFIDENCE, chart_groups,
+                          group_rows, largest_groups, interval_rows)
+from strain_leaderboard import LEADERBOARD_COLUMNS, table_row
+from contamination import (RECORD_COHORTS, CONTAMINATION_TABLE_COLUMNS, MAX_CHART_COHORTS, MIN_CHART_RECORDS,
+                           SURVIVAL_DAYS, worst_cohorts, cohort_rows)
+
+FORMATS = ("png", "svg", "pdf")
+
+# Resolution of PNG charts
+REPORT_DPI = 150
+
+# Groups listed in each yield table of the report
+MAX_TABLE_GROUPS = 100
+
+# Cohorts listed in each contamination table of the report
+MAX_TABLE_COHORTS = 100
+
+# Ancestors listed in the strain leaderboard table
+MAX_LEADERBOARD_ROWS = 100
+
+# Chart drawing functions, run in the worker processes as draw(figure, *data)
+
+def _draw_record_distribution(fig, counts):
+    from charts import PieChart
+    PieChart(fig.subplots(), list(RECORD_CATEGORIES), 'Record Distribution by Category',
+             start_angle=90).update(counts)
+
+def _draw_growth_timeline(fig, curves, mean_curve, title):
+    from charts import GrowthTimelineChart
+    GrowthTimelineChart(fig.subplots()).update(curves, mean_curve, title)
+
+def _draw_statistics(fig, contamination_counts, colonization_days):
+    from charts import PieChart, HistogramChart
+    ax1, ax2 = fig.subplots(1, 2)
+    PieChart(ax1, ['Contaminated', 'Clean'], 'Contamination Rate (Grain Jars)',
+             colors=['#ff9999', '#66b3ff']).update(contamination_counts)
+    HistogramChart(ax2, 'Colonization Speed Distribution (Grain Jars)',
+                   'Days to Colonize', 'Number of Jars').update(colonization_days)
+
+def _draw_yield_analysis(fig, dates, weights):
+    from charts import StackedBarChart, FLUSH_SERIES
+    StackedBarChart(fig.subplots(), FLUSH_SERIES, 'Yield by Flush (Bulk Tubs)', 'Date to Bulk',
+                    'Harvest Weight (g)').update(dates, weights.T)
+    fig.autofmt_xdate()
+
+def _draw_yield_breakdown(fig, labels, means, ratios, percentiles, title):
+    from charts import GroupedYieldChart, FLUSH_SERIES
+    GroupedYieldChart(fig.subplots(), FLUSH_SERIES, 'Yield per Tub (g)').update(
+        labels, means, ratios, percentiles, title)
+
+def _draw_yield_comparison(fig, labels, means, lower, upper, title):
+    from charts import IntervalChart
+    IntervalChart(fig.subplots(), f'Mean Yield per Tub (g), {CONFIDENCE:.0%} Bootstrap Interval').update(
+        labels, means, lower, upper, title)
+
+def _draw_contamination_cohorts(fig, days, curves, overall, title):
+    from charts import SurvivalChart
+    SurvivalChart(fig.subplots(), MAX_CHART_COHORTS).update(days, curves, overall, title)
+
+DRAWERS = {
+    "record_distribution": _draw_record_distribution,
+    "growth_timeline": _draw_growth_timeline,
+    "statistics": _draw_statistics,
+    "yield_analysis": _draw_yield_analysis,
+    "yield_breakdown": _draw_yield_breakdown,
+    "yield_comparison": _draw_yield_comparison,
+    "contamination_cohorts": _draw_contamination_cohorts,
+}
+
+def _start_worker():
+    # Import matplotlib once per worker rather than in the first chart's time
+    import matplotlib
+    import matplotlib.figure
+    import matplotlib.backends.backend_agg
+    matplotlib.rcParams.update({'font.size': 10})
+
+def _render(job):
+    """Draw one chart and return it as `fmt` file bytes"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    drawer, figsize, data, fmt = job
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    DRAWERS[drawer](fig, *data)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=REPORT_DPI)
+    return buffer.getvalue()
+
+def chart_jobs(db):
+    """Yield (file name without extension, drawer, figure size, data) per chart,
+    querying each chart's data just before it is yielded"""
+    chart_data = db.chart_data
+    yield "record_distribution", "record_distribution", (6, 6), (chart_data.record_counts(),)
+
+    timeline = chart_data.growth_timeline()
+    if timeline.curves:
+        title = f'Colonization Progress of {len(timeline.curves)} Jars (Last {TIMELINE_DAYS} Days)'
+    else:
+        title = f'Colonization Progress (Last {TIMELINE_DAYS} Days)'
+    yield "growth_timeline", "growth_timeline", (10, 6), (timeline.curves, timeline.mean_curve, title)
+
+    yield "statistics", "statistics", (12, 6), (chart_data.contamination_counts(), chart_data.colonization_days())
+
+    yields = chart_data.flush_yields()
+    yield "yield_analysis", "yield_analysis", (10, 6), (yields.dates, yields.weights)
+
+    for grouping_label, grouping in GROUPINGS.items():
+        groups = chart_data.yield_groups(grouping)
+        shown = chart_groups(groups, grouping)
+        title = f'Mean Yield per Tub by {grouping_label}'
+        if len(shown) < len(groups.labels):
+            title += f' ({len(shown)} of {len(groups.labels)})'
+        yield (_yield_file_name(grouping_label), "yield_breakdown", (10, 6),
+               ([groups.labels[index] for index in shown], groups.means[shown],
+                groups.flush_ratios[shown], groups.percentiles[shown], title))
+
+    intervals = chart_data.yield_intervals("substrates")
+    yield ("yield_comparison_by_substrate", "yield_comparison", (10, 6),
+           (intervals.labels, intervals.means, intervals.lower, intervals.upper, 'Mean Yield per Tub by Substrate'))
+
+    for records, cohorts in RECORD_COHORTS.items():
+        for cohort in cohorts:
+            rates, curves = chart_data.contamination_cohorts(records, cohort)
+            if not rates.labels:
+                continue
+            shown = worst_cohorts(rates, MAX_CHART_COHORTS, MIN_CHART_RECORDS)
+            lines = [(f'{rates.labels[index]} ({100 * rates.rates[index]:.0f}%)', curves.survival[index])
+                     for index in shown]
+            title = f'{records} Still Clean by {cohort} (Highest Contamination Rates)'
+            yield (_contamination_file_name(records, cohort), "contamination_cohorts", (10, 6),
+                   (list(range(SURVIVAL_DAYS + 1)), lines, curves.overall, title))
+
+def _yield_file_name(grouping_label):
+    return f"yield_by_{grouping_label.lower().replace(' ', '_')}"
+
+def _contamination_file_name(records, cohort):
+    return f"contamination_{records.lower().replace(' ', '_')}_by_{cohort.lower().replace(' ', '_')}"
+
+def summary_tables(db):
+    """Return {file name without extension: (header, rows)} of the report's tables"""
+    chart_data = db.chart_data
+    upcoming = sorted(chart_data.completion_forecast().items(), key=lambda item: item[1])
+    tables = {
+        "record_counts": (("Category", "Count"),
+                          [(label, int(count)) for label, count in zip(RECORD_CATEGORIES, chart_data.record_counts())]),
+        "upcoming_completions": (("Jar ID", "Est. Complete"), upcoming),
+        "strain_leaderboard": (LEADERBOARD_COLUMNS,
+                               [table_row(row) for row in db.strain_leaderboard.rows(MAX_LEADERBOARD_ROWS)]),
+    }
+    for grouping_label, grouping in GROUPINGS.items():
+        groups = chart_data.yield_groups(grouping)
+        tables[_yield_file_name(grouping_label)] = (
+            GROUP_TABLE_COLUMNS, group_rows(groups, largest_groups(groups, MAX_TABLE_GROUPS)))
+    tables["yield_comparison_by_substrate"] = (INTERVAL_TABLE_COLUMNS,
+                                               interval_rows(chart_data.yield_intervals("substrates")))
+    for records, cohorts in RECORD_COHORTS.items():
+        for cohort in cohorts:
+            rates, _ = chart_data.contamination_cohorts(records, cohort)
+            tables[_contamination_file_name(records, cohort)] = (
+                CONTAMINATION_TABLE_COLUMNS, cohort_rows(rates, worst_cohorts(rates, MAX_TABLE_COHORTS)))
+    return tables
+
+def build_report(db, output, fmt="png", workers=None):
+    """Write every chart (as `fmt`) and summary table to the zip file `output`.
+
+    Returns the names of the files in the bundle.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    names = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker) as pool, \
+            zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as bundle:
+        # Each chart starts rendering while the next one's data is queried
+        charts = [(name, pool.submit(_render, (drawer, figsize, data, fmt)))
+                  for name, drawer, figsize, data in chart_jobs(db)]
+        for name, (header, rows) in summary_tables(db).items():
+            text = io.StringIO()
+            writer = csv.writer(text)
+            writer.writerow(header)
+            writer.writerows(rows)
+            names.append(f"tables/{name}.csv")
+            bundle.writestr(names[-1], text.getvalue())
+        for name, chart in charts:
+            names.append(f"charts/{name}.{fmt}")
+            bundle.writestr(names[-1], chart.result())
+    return names
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+    from database import Database
+
+    parser = argparse.ArgumentParser(description="Render the dashboard charts and summary tables to a zip file")
+    parser.add_argument("--db", default="mycotracker.db", help="Database file")
+    parser.add_argument("--format", choices=FORMATS, default="png", help="Chart file format")
+    parser.add_argument("--output", help="Zip file to write (default: mycotracker_report_<date>.zip)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Charts rendered at once")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        sys.exit(f"Database not found: {args.db}")
+    output = args.output or f"mycotracker_report_{datetime.now().date().isoformat()}.zip"
+    start = time.perf_counter()
+    names = build_report(Database(args.db), output, args.format, args.workers)
+    print(f"Wrote {len(names)} files to {output} in {time.perf_counter() - start:.1f}s")
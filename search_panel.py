@@ -0,0 +1,94 @@
+import tkinter as tk
+from tkinter import ttk
+from global_search import search, group_label, MIN_TERM_LENGTH
+
+# Delay after the last keystroke before searching (ms)
+SEARCH_DELAY = 150
+
+class GlobalSearchPanel(ttk.Frame):
+    """Search box for all record tables, with results grouped by table.
+
+    Double-clicking a result (or pressing Enter on it) calls
+    `open_record(table_name, record_id)`.
+    """
+
+    def __init__(self, parent, db, open_record):
+        super().__init__(parent)
+        self.db = db
+        self.open_record = open_record
+        self._pending = None
+
+        search_bar = ttk.Frame(self)
+        search_bar.pack(fill=tk.X)
+        ttk.Label(search_bar, text="Search everything:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace("w", self.schedule_search)
+        self.entry = ttk.Entry(search_bar, textvariable=self.search_var, font=(None, 14))
+        self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+        self.entry.bind("<Escape>", lambda event: self.search_var.set(""))
+        self.entry.bind("<Down>", self.focus_results)
+        self.status_label = ttk.Label(search_bar, text="")
+        self.status_label.pack(side=tk.LEFT)
+
+        # Results are only shown while there is a search
+        self.results_frame = ttk.Frame(self)
+        self.tree = ttk.Treeview(self.results_frame, columns=("Details",), height=8, selectmode="browse")
+        self.tree.heading("#0", text="Record")
+        self.tree.heading("Details", text="Details")
+        self.tree.column("#0", width=260)
+        self.tree.column("Details", width=700)
+        scrollbar = ttk.Scrollbar(self.results_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<Double-1>", self.open_selected)
+        self.tree.bind("<Return>", self.open_selected)
+        self.tree.bind("<Escape>", lambda event: self.search_var.set(""))
+
+    def focus(self):
+        self.entry.focus_set()
+        self.entry.select_range(0, tk.END)
+
+    def focus_results(self, event=None):
+        children = self.tree.get_children()
+        if children:
+            first = self.tree.get_children(children[0])[0]
+            self.tree.focus_set()
+            self.tree.selection_set(first)
+            self.tree.focus(first)
+
+    def schedule_search(self, *args):
+        if self._pending:
+            self.after_cancel(self._pending)
+        self._pending = self.after(SEARCH_DELAY, self.run_search)
+
+    def run_search(self):
+        self._pending = None
+        text = self.search_var.get().strip()
+        self.tree.delete(*self.tree.get_children())
+        if not text:
+            self.status_label.config(text="")
+            self.results_frame.pack_forget()
+            return
+
+        results = search(self.db, text)
+        total = sum(len(rows) for rows in results.values())
+        if total:
+            self.status_label.config(text=f"{total} found")
+        elif len(text) < MIN_TERM_LENGTH:
+            self.status_label.config(text=f"Type at least {MIN_TERM_LENGTH} characters")
+        else:
+            self.status_label.config(text="No matches")
+
+        for table_name, rows in results.items():
+            group = self.tree.insert("", tk.END, text=group_label(table_name, len(rows)), open=True)
+            for record_id, details in rows:
+                # Item IDs carry the table and record ID for open_selected()
+                self.tree.insert(group, tk.END, iid=f"{table_name}\t{record_id}", text=record_id, values=(details,))
+        self.results_frame.pack(fill=tk.BOTH, expand=True, pady=(6, 0))
+
+    def open_selected(self, event=None):
+        selection = self.tree.selection()
+        if selection and "\t" in selection[0]:
+            table_name, record_id = selection[0].split("\t", 1)
+            self.open_record(table_name, record_id)
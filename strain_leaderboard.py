@@ -0,0 +1,241 @@
+"""Yield, contamination and colonization speed per clone or agar plate.
+
+A clone or plate's value is in what descends from it: the liquid cultures
+started from it, the grain jars inoculated from those (or straight from
+the plate) and the bulk tubs spawned from the jars. Each jar and tub is
+traced to that ancestor with one join through its jar and LC, and the
+results are summed per ancestor with NumPy in one pass.
+
+After that the sums are kept current from the ID registry's change batches:
+a changed jar or tub has its old contribution subtracted and its new one
+added, so recording a harvest costs one small query. Only an LC moved to
+another source while it has jars, or a very large batch, makes the next read
+rebuild everything.
+"""
+from collections import namedtuple
+import numpy as np
+from database import PRIMARY_KEYS
+from contamination import is_contaminated, classify
+
+# Tables whose records a leaderboard entry is computed from
+LINEAGE_TABLES = ("clone_library", "agar_plates", "liquid_cultures", "grain_jars", "bulk_tubs")
+
+# Changes per table in one batch above which the leaderboard is rebuilt
+REBUILD_THRESHOLD = 2000
+
+# Max IDs per "IN (...)" query
+FETCH_CHUNK_SIZE = 500
+
+# Columns of the per-ancestor sums
+JARS, CONTAMINATED, SHAKEN, SHAKE_DAYS, TUBS, HARVESTED, YIELD = range(7)
+
+# Jars and tubs with their ancestor: a jar's source is an LC (whose source
+# is the ancestor) or a plate; records whose lineage is broken get NULL
+JAR_SQL = """
+    SELECT j.jar_id, COALESCE(lc.source_id, j.source_id), j.contamination_notes,
+           JULIANDAY(substr(j.shake_date, 1, 10)) - JULIANDAY(substr(j.inoculation_date, 1, 10))
+    FROM grain_jars j
+    LEFT JOIN liquid_cultures lc ON lc.lc_id = j.source_id
+"""
+TUB_SQL = """
+    SELECT t.tub_id, CASE WHEN j.jar_id IS NOT NULL THEN COALESCE(lc.source_id, j.source_id) END,
+           COALESCE(t.harvest_weight_flush1, t.harvest_weight_flush2, t.harvest_weight_flush3) IS NOT NULL,
+           COALESCE(t.harvest_weight_flush1, 0) + COALESCE(t.harvest_weight_flush2, 0)
+               + COALESCE(t.harvest_weight_flush3, 0)
+    FROM bulk_tubs t
+    LEFT JOIN grain_jars j ON j.jar_id = t.spawn_source
+    LEFT JOIN liquid_cultures lc ON lc.lc_id = j.source_id
+"""
+
+LEADERBOARD_COLUMNS = ("Ancestor", "Type", "Strain", "Jars", "Contamination %", "Days to Shake",
+                       "Tubs", "Harvested", "Total Yield (g)", "Yield per Tub (g)")
+
+# One row of LEADERBOARD_COLUMNS; rates and means are None without data
+LeaderboardRow = namedtuple("LeaderboardRow", "ancestor kind strain jars contamination_rate "
+                                              "days_to_shake tubs harvested total_yield yield_per_tub")
+
+def table_row(row):
+    """A LeaderboardRow as LEADERBOARD_COLUMNS values rounded for display, '' for no data"""
+    def rounded(value, scale=1):
+        return "" if value is None else round(value * scale, 1)
+    return (row.ancestor, row.kind, row.strain, row.jars, rounded(row.contamination_rate, 100),
+            rounded(row.days_to_shake), row.tubs, row.harvested, round(row.total_yield, 1),
+            rounded(row.yield_per_tub))
+
+def _jar_stats(contaminated, days):
+    """Per-jar contribution to the sums, as arrays of the jar columns"""
+    shaken = ~np.isnan(days)
+    return {JARS: np.ones(len(days)), CONTAMINATED: contaminated.astype(float),
+            SHAKEN: shaken.astype(float), SHAKE_DAYS: np.where(shaken, days, 0.0)}
+
+def _tub_stats(harvested, weights):
+    return {TUBS: np.ones(len(weights)), HARVESTED: harvested.astype(float),
+            YIELD: np.where(harvested, weights, 0.0)}
+
+class StrainLeaderboard:
+    """Per-ancestor sums over the lineage, kept current incrementally"""
+
+    def __init__(self, db):
+        self.db = db
+        self.stale = True
+        self.sums = np.zeros((0, 7))
+        self.ancestors = []       # row of `sums` -> ancestor ID
+        self.rows_by_ancestor = {}
+        self.jars = {}            # jar ID -> (row, contaminated, days to shake or NaN)
+        self.tubs = {}            # tub ID -> (row, harvested, total yield)
+        self.lc_sources = {}      # LC ID -> source ID
+        db.id_registry.listeners.append(self.apply_changes)
+
+    def _row(self, ancestor):
+        row = self.rows_by_ancestor.get(ancestor)
+        if row is None:
+            row = self.rows_by_ancestor[ancestor] = len(self.ancestors)
+            self.ancestors.append(ancestor)
+            if row >= len(self.sums):
+                self.sums = np.concatenate((self.sums, np.zeros((max(row, 16), 7))))
+        return row
+
+    def rebuild(self):
+        """Recompute every sum from scratch"""
+        self.db.id_registry.refresh()
+        self.sums = np.zeros((0, 7))
+        self.ancestors, self.rows_by_ancestor = [], {}
+
+        self.db.cursor.execute(f"{JAR_SQL} WHERE COALESCE(lc.source_id, j.source_id) IS NOT NULL")
+        jar_rows = self.db.cursor.fetchall()
+        self.db.cursor.execute(f"{TUB_SQL} WHERE j.jar_id IS NOT NULL")
+        tub_rows = self.db.cursor.fetchall()
+        self.db.cursor.execute("SELECT lc_id, source_id FROM liquid_cultures")
+        self.lc_sources = dict(self.db.cursor.fetchall())
+
+        jar_ancestors = np.array([self._row(row[1]) for row in jar_rows], dtype=np.intp)
+        contaminated = classify([row[2] for row in jar_rows])
+        days = np.array([row[3] for row in jar_rows], dtype=float)
+        tub_ancestors = np.array([self._row(row[1]) for row in tub_rows], dtype=np.intp)
+        harvested = np.array([row[2] for row in tub_rows], dtype=bool)
+        weights = np.array([row[3] for row in tub_rows], dtype=float)
+
+        self.sums = np.zeros((len(self.ancestors), 7))
+        for ancestors, stats in ((jar_ancestors, _jar_stats(contaminated, days)),
+                                 (tub_ancestors, _tub_stats(harvested, weights))):
+            for column, values in stats.items():
+                self.sums[:, column] = np.bincount(ancestors, weights=values, minlength=len(self.ancestors))
+
+        self.jars = dict(zip((row[0] for row in jar_rows), zip(jar_ancestors.tolist(), contaminated.tolist(),
+                                                                days.tolist())))
+        self.tubs = dict(zip((row[0] for row in tub_rows), zip(tub_ancestors.tolist(), harvested.tolist(),
+                                                                weights.tolist())))
+        self.stale = False
+
+    def _add_jar(self, jar, sign):
+        row, contaminated, days = jar
+        shaken = days == days  # not NaN
+        self.sums[row, [JARS, CONTAMINATED, SHAKEN, SHAKE_DAYS]] += sign * np.array(
+            [1.0, contaminated, shaken, days if shaken else 0.0])
+
+    def _add_tub(self, tub, sign):
+        row, harvested, weight = tub
+        self.sums[row, [TUBS, HARVESTED, YIELD]] += sign * np.array(
+            [1.0, harvested, weight if harvested else 0.0])
+
+    def _fetch(self, sql, column, ids):
+        rows = []
+        ids = list(ids)
+        for start in range(0, len(ids), FETCH_CHUNK_SIZE):
+            chunk = ids[start:start + FETCH_CHUNK_SIZE]
+            self.db.cursor.execute(f"{sql} WHERE {column} IN ({', '.join('?' * len(chunk))})", chunk)
+            rows.extend(self.db.cursor.fetchall())
+        return rows
+
+    def _update_jars(self, jar_ids):
+        for jar_id in jar_ids:
+            jar = self.jars.pop(jar_id, None)
+            if jar is not None:
+                self._add_jar(jar, -1)
+        for jar_id, ancestor, notes, days in self._fetch(JAR_SQL, "j.jar_id", jar_ids):
+            if ancestor is not None:
+                jar = self.jars[jar_id] = (self._row(ancestor), is_contaminated(notes),
+                                           float("nan") if days is None else days)
+                self._add_jar(jar, 1)
+
+    def _update_tubs(self, tub_ids, by_jar=False):
+        rows = self._fetch(TUB_SQL, "t.spawn_source" if by_jar else "t.tub_id", tub_ids)
+        for tub_id in (tub_ids if not by_jar else [row[0] for row in rows]):
+            tub = self.tubs.pop(tub_id, None)
+            if tub is not None:
+                self._add_tub(tub, -1)
+        for tub_id, ancestor, harvested, weight in rows:
+            if ancestor is not None:
+                tub = self.tubs[tub_id] = (self._row(ancestor), bool(harvested), weight)
+                self._add_tub(tub, 1)
+
+    def apply_changes(self, changes):
+        """Patch the sums with a batch of changes from the ID registry"""
+        if self.stale:
+            return
+        if changes is None:
+            self.stale = True
+            return
+
+        changed = {}
+        for table_name, record_id, operation in changes:
+            changed.setdefault(table_name, {})[record_id] = operation
+        if any(len(operations) > REBUILD_THRESHOLD for operations in changed.values()):
+            self.stale = True
+            return
+
+        lc_ids = changed.get("liquid_cultures", {})
+        if lc_ids:
+            rows = dict(self._fetch("SELECT lc_id, source_id FROM liquid_cultures", "lc_id", lc_ids))
+            moved = [lc_id for lc_id in lc_ids if rows.get(lc_id) != self.lc_sources.get(lc_id)]
+            if moved and self._fetch("SELECT 1 FROM grain_jars", "source_id", moved):
+                # Every jar and tub below a moved LC has a new ancestor
+                self.stale = True
+                return
+            for lc_id in lc_ids:
+                if lc_id in rows:
+                    self.lc_sources[lc_id] = rows[lc_id]
+                else:
+                    self.lc_sources.pop(lc_id, None)
+
+        jar_ids = list(changed.get("grain_jars", {}))
+        if jar_ids:
+            self._update_jars(jar_ids)
+            # Tubs spawned from a changed jar may now have another ancestor
+            self._update_tubs(jar_ids, by_jar=True)
+        tub_ids = list(changed.get("bulk_tubs", {}))
+        if tub_ids:
+            self._update_tubs(tub_ids)
+        # Changes to clones and plates only affect the names looked up in rows()
+
+    def rows(self, limit=None):
+        """Return LeaderboardRows of the ancestors with descendants, highest total yield first"""
+        self.db.id_registry.refresh()
+        if self.stale:
+            self.rebuild()
+        count = len(self.ancestors)
+        sums = self.sums[:count]
+        present = np.flatnonzero((sums[:, JARS] > 0) | (sums[:, TUBS] > 0))
+        order = present[np.lexsort((-sums[present, TUBS], -sums[present, YIELD]))][:limit]
+        ancestors = [self.ancestors[row] for row in order]
+        names = self._ancestor_names(ancestors)
+
+        rows = []
+        for ancestor, (jars, contaminated, shaken, shake_days, tubs, harvested, total) in zip(
+                ancestors, sums[order].tolist()):
+            kind, strain = names.get(ancestor, ("(deleted)", ""))
+            rows.append(LeaderboardRow(
+                ancestor, kind, strain, round(jars), contaminated / jars if jars else None,
+                shake_days / shaken if shaken else None, round(tubs), round(harvested), total,
+                total / harvested if harvested else None))
+        return rows
+
+    def _ancestor_names(self, ancestors):
+        """{ancestor ID: (type label, strain name)} for clones and plates"""
+        names = {}
+        for table_name, kind, strain_column in (("agar_plates", "Plate", "strain_name"),
+                                                ("clone_library", "Clone", "parent_strain")):
+            sql = f"SELECT {PRIMARY_KEYS[table_name]}, {strain_column} FROM {table_name}"
+            for ancestor, strain in self._fetch(sql, PRIMARY_KEYS[table_name], ancestors):
+                names[ancestor] = (kind, strain or "")
+        return names
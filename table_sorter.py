@@ -0,0 +1,130 @@
+from datetime import date
+from record_store import RecordStore
+
+def _text_key(value):
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text.casefold() if text else None
+
+def _date_key(value):
+    # Dates are stored as ISO strings, sometimes with a time part attached
+    # (e.g. "Mark as Shaken" stores a full timestamp), so only the date is used.
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return None
+
+def _int_key(value):
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _float_key(value):
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+SORT_KEYS = {
+    "text": _text_key,
+    "date": _date_key,
+    "timestamp": _text_key,  # ISO timestamps already sort correctly as text
+    "int": _int_key,
+    "float": _float_key,
+}
+
+class TreeviewSorter:
+    """Click-to-sort column headings for a record Treeview.
+
+    The tree items must use the record IDs as their iids. Sort orders are
+    computed once per column from the typed records (missing values always
+    last) and cached until set_records() is called with fresh data. Sorting
+    and filtering only reorder/detach the existing tree items, they never
+    rebuild the tree.
+    """
+
+    def __init__(self, tree, columns, column_types):
+        self.tree = tree
+        self.columns = list(columns)
+        self.column_types = list(column_types)
+        self.sort_column = None
+        self.descending = False
+        self.row_ids = []
+        self.records = []
+        self.visible_ids = None  # None means every row is shown
+        self._orders = {}  # column index -> (ascending row IDs, row IDs with missing values)
+
+        for index, column in enumerate(self.columns):
+            self.tree.heading(column, command=lambda i=index: self.sort_by(i))
+
+    def clear(self):
+        """Delete every row from the tree, including rows hidden by a filter"""
+        self.tree.delete(*self.row_ids)
+        self.set_records([], [])
+
+    def set_records(self, row_ids, records):
+        """Replace the data being sorted and drop all cached sort orders"""
+        self.row_ids = list(row_ids)
+        self.records = records
+        self._orders.clear()
+
+    def sort_by(self, index):
+        """Sort by the given column, toggling direction on repeated clicks"""
+        if self.sort_column == index:
+            self.descending = not self.descending
+        else:
+            self.sort_column = index
+            self.descending = False
+        self.update_headings()
+        self.apply(self.visible_ids)
+
+    def update_headings(self):
+        arrow = " ▼" if self.descending else " ▲"
+        for index, column in enumerate(self.columns):
+            self.tree.heading(column, text=column + (arrow if index == self.sort_column else ""))
+
+    def ordered_ids(self):
+        """Return all row IDs in the current sort order"""
+        if self.sort_column is None:
+            return self.row_ids
+        present, missing = self._column_order(self.sort_column)
+        return (present[::-1] if self.descending else present) + missing
+
+    def apply(self, visible_ids=None):
+        """Show the rows in sort order, keeping only `visible_ids` attached if given"""
+        self.visible_ids = visible_ids
+        ordered = self.ordered_ids()
+        if visible_ids is not None:
+            ordered = [row_id for row_id in ordered if row_id in visible_ids]
+        self.tree.set_children("", *ordered)
+
+    def reveal(self, row_id):
+        """Select and scroll to a row. Returns False if the row isn't shown."""
+        if not self.tree.exists(row_id) or (self.visible_ids is not None and row_id not in self.visible_ids):
+            return False
+        self.tree.selection_set(row_id)
+        self.tree.focus(row_id)
+        self.tree.see(row_id)
+        return True
+
+    def _column_order(self, index):
+        if index not in self._orders:
+            convert = SORT_KEYS[self.column_types[index]]
+            if isinstance(self.records, RecordStore):
+                keys = [convert(value) for value in self.records.column(index)]
+            else:
+                keys = [convert(record[index]) for record in self.records]
+            positions = [i for i, key in enumerate(keys) if key is not None]
+            positions.sort(key=keys.__getitem__)
+            row_ids = self.row_ids
+            self._orders[index] = ([row_ids[i] for i in positions],
+                                   [row_ids[i] for i, key in enumerate(keys) if key is None])
+        return self._orders[index]
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+from database import Database
+
+class StrainSuggestionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.directory.name, "test.db"))
+        self.db.cursor.executemany("INSERT INTO agar_plates VALUES (?, ?, '2025-05-01', '', '', ?, ?)", [
+            ("AP-0001", "Golden Teacher", "2025-05-01T08:00:00", "2025-05-01T08:00:00"),
+            ("AP-0002", "Blue Oyster", "2025-05-02T08:00:00", "2025-05-02T08:00:00"),
+            ("AP-0003", "Blue Meanie", "2025-05-03T08:00:00", "2025-05-03T08:00:00"),
+        ])
+        self.db.cursor.execute("INSERT INTO liquid_cultures VALUES ('LC-0001', 'AP-0003', 'Blue Meanie', "
+                               "'2025-05-04', '', '', 10, '2025-05-04T08:00:00', '2025-05-04T08:00:00')")
+        self.db.conn.commit()
+        self.completer = self.db.completer
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def rename(self, table_name, key, record_id, strain):
+        with self.db.conn:
+            self.db.cursor.execute(f"UPDATE {table_name} SET strain_name = ?, updated_at = ? WHERE {key} = ?",
+                                   (strain, self.db.get_timestamp(), record_id))
+
+    def test_renamed_strain_is_no_longer_suggested(self):
+        self.assertEqual(self.completer.suggest_strains("blue"), ["Blue Meanie", "Blue Oyster"])
+        self.rename("agar_plates", "plate_id", "AP-0002", "Pink Oyster")
+        self.assertEqual(self.completer.suggest_strains("blue"), ["Blue Meanie"])
+        self.assertEqual(self.completer.suggest_strains("pink"), ["Pink Oyster"])
+
+    def test_strain_still_in_use_is_kept(self):
+        self.rename("agar_plates", "plate_id", "AP-0003", "Enoki")
+        self.assertEqual(self.completer.suggest_strains("blue m"), ["Blue Meanie"])
+        self.rename("liquid_cultures", "lc_id", "LC-0001", "Enoki")
+        self.assertEqual(self.completer.suggest_strains("blue m"), [])
+        self.assertEqual(self.completer.suggest_strains("eno"), ["Enoki"])
+
+if __name__ == "__main__":
+    unittest.main()
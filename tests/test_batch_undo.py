@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from database import Database
+
+class BatchUndoTest(unittest.TestCase):
+    """Undo restores a batch's records but never overwrites a later edit"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.directory.name, "test.db"))
+        self.db.cursor.executemany("INSERT INTO grain_jars VALUES (?, 'LC-0001', '2025-05-01', ?, NULL, '', "
+                                   "'2025-05-01T08:00:00', '2025-05-01T08:00:00')",
+                                   [(f"GJ-{number:04d}", number * 10) for number in range(1, 5)])
+        self.db.conn.commit()
+        self.original = self.rows()
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def rows(self):
+        self.db.cursor.execute("SELECT * FROM grain_jars ORDER BY jar_id")
+        return self.db.cursor.fetchall()
+
+    def percentages(self):
+        return [row[3] for row in self.rows()]
+
+    def edit(self, jar_id, percentage):
+        with self.db.conn:
+            self.db.cursor.execute("UPDATE grain_jars SET colonization_percentage = ?, updated_at = ? "
+                                   "WHERE jar_id = ?", (percentage, self.db.get_timestamp(), jar_id))
+
+    def test_undo_batch_update_and_delete(self):
+        jar_ids = ["GJ-0001", "GJ-0002", "GJ-0003"]
+        self.assertEqual(self.db.batch_update("grain_jars", jar_ids, {"colonization_percentage": 80}, "Set 80%"), 3)
+        self.assertEqual(self.percentages(), [80, 80, 80, 40])
+        self.assertEqual(self.db.batch_delete("grain_jars", ["GJ-0002", "GJ-0004"], "Delete"), 2)
+        self.assertEqual(self.percentages(), [80, 80])
+
+        self.assertEqual(self.db.undo_last_batch("grain_jars"), "Delete")
+        self.assertEqual(self.percentages(), [80, 80, 80, 40])
+        self.assertEqual(self.db.undo_last_batch("grain_jars"), "Set 80%")
+        self.assertEqual(self.rows(), self.original)
+        self.assertIsNone(self.db.undo_last_batch("grain_jars"))
+
+    def test_undo_update_keeps_later_edit(self):
+        self.db.batch_update("grain_jars", ["GJ-0001", "GJ-0002"], {"colonization_percentage": 80}, "Set 80%")
+        self.edit("GJ-0002", 95)
+        batch_id = self.db.get_last_batch("grain_jars")[0]
+        self.assertEqual(self.db.get_undo_conflicts("grain_jars", batch_id), ["GJ-0002"])
+        self.db.undo_last_batch("grain_jars")
+        self.assertEqual(self.percentages(), [10, 95, 30, 40])
+
+    def test_undo_delete_keeps_record_created_again(self):
+        self.db.batch_delete("grain_jars", ["GJ-0001", "GJ-0002"], "Delete")
+        with self.db.conn:
+            self.db.cursor.execute("INSERT INTO grain_jars VALUES ('GJ-0002', 'LC-0001', '2025-06-01', 5, NULL, '', "
+                                   "'2025-06-01T08:00:00', '2025-06-01T08:00:00')")
+        batch_id = self.db.get_last_batch("grain_jars")[0]
+        self.assertEqual(self.db.get_undo_conflicts("grain_jars", batch_id), ["GJ-0002"])
+        self.db.undo_last_batch("grain_jars")
+        self.assertEqual(self.rows()[0], self.original[0])
+        self.assertEqual(self.rows()[1][2:4], ("2025-06-01", 5))
+
+if __name__ == "__main__":
+    unittest.main()
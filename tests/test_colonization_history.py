@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from database import Database
+from colonization_history import jar_history
+
+class BatchHistoryTest(unittest.TestCase):
+    """Batch edits, deletes and their undo keep the colonization history true"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.directory.name, "test.db"))
+        now = self.db.get_timestamp()
+        self.db.cursor.executemany("INSERT INTO grain_jars VALUES (?, 'LC-0001', '2025-05-01', ?, NULL, NULL, ?, ?)",
+                                   [("GJ-0001", 20, now, now), ("GJ-0002", 30, now, now)])
+        self.db.cursor.execute("UPDATE grain_jars SET colonization_percentage = 50 WHERE jar_id = 'GJ-0001'")
+        self.db.conn.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def percentages(self, jar_id):
+        return [percentage for _, percentage in jar_history(self.db, jar_id)]
+
+    def test_undo_batch_update_removes_its_readings(self):
+        self.db.batch_update("grain_jars", ["GJ-0001", "GJ-0002"], {"colonization_percentage": 80}, "Set 80%")
+        self.assertEqual(self.percentages("GJ-0001"), [20, 50, 80])
+        self.db.undo_last_batch("grain_jars")
+        self.assertEqual(self.percentages("GJ-0001"), [20, 50])
+        self.assertEqual(self.percentages("GJ-0002"), [30])
+
+    def test_delete_removes_history(self):
+        self.db.cursor.execute("DELETE FROM grain_jars WHERE jar_id = 'GJ-0002'")
+        self.db.batch_delete("grain_jars", ["GJ-0001"], "Delete")
+        self.db.cursor.execute("SELECT COUNT(*) FROM colonization_observations")
+        self.assertEqual(self.db.cursor.fetchone()[0], 0)
+
+    def test_undo_batch_delete_restores_history_once(self):
+        before = jar_history(self.db, "GJ-0001")
+        self.db.batch_delete("grain_jars", ["GJ-0001"], "Delete")
+        self.db.undo_last_batch("grain_jars")
+        self.assertEqual(jar_history(self.db, "GJ-0001"), before)
+
+    def test_single_edits_after_undo_are_recorded(self):
+        self.db.batch_update("grain_jars", ["GJ-0001"], {"colonization_percentage": 80}, "Set 80%")
+        self.db.undo_last_batch("grain_jars")
+        with self.db.conn:
+            self.db.cursor.execute("UPDATE grain_jars SET colonization_percentage = 60 WHERE jar_id = 'GJ-0001'")
+        self.assertEqual(self.percentages("GJ-0001"), [20, 50, 60])
+
+if __name__ == "__main__":
+    unittest.main()
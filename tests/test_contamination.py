@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+from contamination import is_contaminated, classify
+
+# (notes, contaminated)
+CASES = [
+    # Empty and healthy notes
+    (None, False),
+    ("", False),
+    ("   ", False),
+    ("clean", False),
+    ("Nice flush", False),
+    ("fully colonized, healthy white mycelium", False),
+    ("fuzzy mycelium, looks great", False),
+    ("some blue bruising on stems", False),
+    # Strain names with colors in them
+    ("Pink Oyster flush, great", False),
+    ("Black Pearl strain", False),
+    ("Golden Teacher, green tinted lid", False),
+    ("Blue Oyster, red tub", False),
+    ("Pink Oyster with green mold", True),
+    # Words that only start like a contaminant
+    ("smells earthy, healthy", False),
+    ("sourced grain from farm", False),
+    ("rotated shelf", False),
+    ("moldable lid", False),
+    ("Trichome-like hyphae", False),
+    # Contaminants and symptoms
+    ("trich", True),
+    ("Trichoderma on the side", True),
+    ("green mold near filter", True),
+    ("mouldy corner", True),
+    ("cobweb on casing", True),
+    ("bacterial blotch", True),
+    ("wet spots on grain", True),
+    ("sour smell", True),
+    ("smells sour", True),
+    ("smells like vinegar", True),
+    ("black spots on grain", True),
+    ("slimy grains", True),
+    ("contaminated", True),
+    ("soft rot at the base", True),
+    ("rotten", True),
+    # Negations
+    ("no sign of trich", False),
+    ("no mold", False),
+    ("mold-free", False),
+    ("trich ruled out", False),
+    ("without any contamination", False),
+    ("not contaminated", False),
+    ("contamination free", False),
+    ("Contamination: none", False),
+    ("contam - none", False),
+    ("Mold: no", False),
+    ("trich? no", False),
+    ("Trich: n/a", False),
+    ("checked for mold, none found", False),
+    ("contam - none, but cobweb on top", True),
+    ("trich? yes", True),
+    ("Mold: lots", True),
+    ("clean, but green spots", True),
+    ("no mold, but bacterial smell and wet spots", True),
+    ("no trich; cobweb on top", True),
+]
+
+class ClassifierTest(unittest.TestCase):
+    def test_cases(self):
+        for notes, contaminated in CASES:
+            with self.subTest(notes=notes):
+                self.assertIs(is_contaminated(notes), contaminated)
+
+    def test_classify_matches_is_contaminated(self):
+        notes = [case[0] for case in CASES] * 3
+        expected = np.array([case[1] for case in CASES] * 3)
+        np.testing.assert_array_equal(classify(notes), expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from database import Database, BULK_INDEX_THRESHOLD
+from global_search import search
+
+STRAINS = ["Golden Teacher", "Blue Oyster", "Lions Mane", "Pink Oyster", "Shiitake"]
+
+class GlobalSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "test.db")
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def open(self):
+        self.db = Database(self.path)
+        now = self.db.get_timestamp()
+        with self.db.conn:
+            for number, strain in enumerate(STRAINS, 1):
+                self.db.cursor.execute("INSERT INTO agar_plates VALUES (?, ?, '2025-05-01', '', '', ?, ?)",
+                                       (f"AP-{number:04d}", strain, now, now))
+
+    def renumber_rowids(self):
+        """Move the plates' rowids, as VACUUM may do for tables with TEXT primary keys"""
+        with self.db.conn:
+            self.db.cursor.execute("UPDATE agar_plates SET rowid = rowid + 100")
+        self.db.cursor.execute("VACUUM")
+
+    def assertFinds(self, text, record_ids):
+        found = [record_id for record_id, _ in search(self.db, text).get("agar_plates", [])]
+        self.assertEqual(sorted(found), sorted(record_ids), text)
+
+    def test_index_survives_renumbered_rowids(self):
+        self.open()
+        with self.db.conn:
+            self.db.cursor.execute("DELETE FROM agar_plates WHERE plate_id IN ('AP-0001', 'AP-0003')")
+        self.renumber_rowids()
+        with self.db.conn:
+            self.db.cursor.execute("UPDATE agar_plates SET strain_name = 'Enoki' WHERE plate_id = 'AP-0005'")
+            self.db.cursor.execute("DELETE FROM agar_plates WHERE plate_id = 'AP-0004'")
+        self.assertFinds("Shiitake", [])
+        self.assertFinds("Enoki", ["AP-0005"])
+        self.assertFinds("Oyster", ["AP-0002"])
+        self.assertFinds("Teacher", [])
+
+    def test_bulk_import_after_renumbered_rowids(self):
+        self.open()
+        with self.db.conn:
+            self.db.cursor.execute("DELETE FROM agar_plates WHERE plate_id = 'AP-0002'")
+        self.renumber_rowids()
+        now = self.db.get_timestamp()
+        self.db.import_records("agar_plates", [(f"AP-{number:04d}", "Reishi", "2025-05-02", "", "", now, now)
+                                               for number in range(100, 100 + BULK_INDEX_THRESHOLD)])
+        with self.db.conn:
+            self.db.cursor.execute("DELETE FROM agar_plates WHERE plate_id = 'AP-0100'")
+        self.assertEqual(len(search(self.db, "Reishi", limit=5000)["agar_plates"]), BULK_INDEX_THRESHOLD - 1)
+        self.assertFinds("Oyster", ["AP-0004"])
+
+    def test_archived_clones_are_not_found(self):
+        self.open()
+        now = self.db.get_timestamp()
+        with self.db.conn:
+            self.db.cursor.executemany("INSERT INTO clone_library VALUES (?, 'Penis Envy', '2025-05-01', 'stem', '', '', ?, ?, ?)",
+                                       [("CL-0001", 0, now, now), ("CL-0002", 1, now, now)])
+        for available in (True, False):
+            self.db.search_index_available = available
+            with self.subTest(index=available):
+                self.assertEqual(search(self.db, "Envy")["clone_library"], [("CL-0001", "Penis Envy | stem |  | ")])
+                self.assertNotIn("clone_library", search(self.db, "CL-0002"))
+        self.db.search_index_available = True
+        with self.db.conn:
+            self.db.cursor.execute("UPDATE clone_library SET archived = 1 - archived")
+        self.assertEqual([row[0] for row in search(self.db, "Envy")["clone_library"]], ["CL-0002"])
+        self.assertEqual(search(self.db, "CL-0002")["clone_library"], [("CL-0002", "Exact ID match")])
+
+    def test_reopening_keeps_the_index(self):
+        self.open()
+        self.db.close()
+        self.db = Database(self.path, initialize=False)
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        self.db.create_tables()
+        self.db.conn.set_trace_callback(None)
+        self.assertFalse([statement for statement in statements if "search_index" in statement and "DROP" in statement])
+        self.assertFinds("Oyster", ["AP-0002", "AP-0004"])
+
+    def test_without_trigram_tokenizer(self):
+        with mock.patch.object(Database, "_trigram_supported", return_value=False):
+            self.open()
+        self.assertFalse(self.db.search_index_available)
+        self.db.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_clone_library_date_taken'")
+        self.assertIsNotNone(self.db.cursor.fetchone())
+        now = self.db.get_timestamp()
+        self.db.import_records("agar_plates", [(f"AP-{number:04d}", "Reishi", "2025-05-02", "", "", now, now)
+                                               for number in range(100, 100 + BULK_INDEX_THRESHOLD)])
+        self.assertFinds("oyster", ["AP-0002", "AP-0004"])
+        self.assertFinds("AP-000 lions", ["AP-0003"])
+        self.assertEqual(len(search(self.db, "reishi", limit=10)["agar_plates"]), 10)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+from database import Database
+
+class IdRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.directory.name, "test.db"))
+        now = self.db.get_timestamp()
+        with self.db.conn:
+            self.db.cursor.execute("INSERT INTO agar_plates VALUES ('AP-0001', 'Strain', '2025-05-01', '', '', ?, ?)",
+                                   (now, now))
+        self.registry = self.db.id_registry
+        self.statements = []
+        self.db.conn.set_trace_callback(self.statements.append)
+
+    def tearDown(self):
+        self.db.conn.set_trace_callback(None)
+        self.db.close()
+        self.directory.cleanup()
+
+    def test_lookups_without_writes_run_no_queries(self):
+        self.assertTrue(self.registry.exists("AP-0001"))
+        self.statements.clear()
+        for _ in range(100):
+            self.assertTrue(self.registry.source_exists("grain_jars", "AP-0001"))
+            self.assertFalse(self.registry.exists("LC-0001"))
+        self.assertEqual(self.statements, [])
+
+    def test_writes_are_seen_by_the_next_lookup(self):
+        self.assertFalse(self.registry.exists("LC-0001"))
+        now = self.db.get_timestamp()
+        with self.db.conn:
+            self.db.cursor.execute("INSERT INTO liquid_cultures VALUES "
+                                   "('LC-0001', 'AP-0001', 'Strain', '2025-05-02', '', '', 10, ?, ?)", (now, now))
+        self.assertTrue(self.registry.source_exists("grain_jars", "LC-0001"))
+        with self.db.conn:
+            self.db.cursor.execute("DELETE FROM agar_plates WHERE plate_id = 'AP-0001'")
+        self.assertFalse(self.registry.exists("AP-0001"))
+
+    def test_find_unknown_sources(self):
+        unknown = self.registry.find_unknown_sources("grain_jars", {"AP-0001", "LC-9999", "AP-0002"})
+        self.assertEqual(unknown, ["AP-0002", "LC-9999"])
+        self.assertEqual(self.statements, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from database import Database
+
+class LcVolumeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.directory.name, "test.db"))
+        now = self.db.get_timestamp()
+        self.db.cursor.executemany("INSERT INTO liquid_cultures VALUES (?, 'AP-0001', 'Strain', '2025-05-01', '', '', ?, ?, ?)",
+                                   [("LC-0001", 100.0, now, now), ("LC-0002", None, now, now)])
+        self.db.conn.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def inoculate(self, lc_id, count, volume_per_jar=10.0):
+        now = self.db.get_timestamp()
+        return self.db.insert_id_block("grain_jars", "GJ-", count, {
+            "source_id": lc_id, "inoculation_date": "2025-05-02", "colonization_percentage": 0,
+            "created_at": now, "updated_at": now,
+        }, on_insert=lambda jar_ids: self.db.debit_lc_volume(lc_id, jar_ids, volume_per_jar))
+
+    def test_unknown_volume_is_not_checked_or_debited(self):
+        self.assertIsNone(self.db.get_lc_volume("LC-0002"))
+        self.inoculate("LC-0002", 3)
+        self.assertIsNone(self.db.get_lc_volume("LC-0002"))
+        self.assertEqual(self.db.get_lc_ledger("LC-0002"), [])
+
+    def test_delete_credits_and_undo_debits_again(self):
+        jar_ids = self.inoculate("LC-0001", 4)
+        self.assertEqual(self.db.get_lc_volume("LC-0001"), 60.0)
+        self.db.batch_delete("grain_jars", jar_ids[:3], "Delete")
+        self.assertEqual(self.db.get_lc_volume("LC-0001"), 90.0)
+        self.db.undo_last_batch("grain_jars")
+        self.assertEqual(self.db.get_lc_volume("LC-0001"), 60.0)
+        self.assertEqual(sum(entry[1] for entry in self.db.get_lc_ledger("LC-0001")), 60.0)
+
+    def test_undo_of_an_edit_leaves_the_ledger_alone(self):
+        jar_ids = self.inoculate("LC-0001", 2)
+        self.db.batch_update("grain_jars", jar_ids, {"colonization_percentage": 50}, "Set 50%")
+        self.db.undo_last_batch("grain_jars")
+        self.assertEqual(self.db.get_lc_volume("LC-0001"), 80.0)
+        self.assertEqual(len(self.db.get_lc_ledger("LC-0001")), 3)
+
+if __name__ == "__main__":
+    unittest.main()
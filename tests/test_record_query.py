@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from database import Database
+from record_query import compile_query, query_records
+
+class NegatedTermTest(unittest.TestCase):
+    """Negated terms must keep the records whose column is empty"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.directory.name, "test.db"))
+        now = self.db.get_timestamp()
+        jars = [(f"GJ-{number:04d}", "LC-0001", "2025-05-01", 50, "2025-06-10" if number % 2 else None,
+                 None if number % 3 == 0 else ("ok" if number % 3 == 1 else "green mold"), now, now)
+                for number in range(30)]
+        self.db.cursor.executemany("INSERT INTO grain_jars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", jars)
+        self.db.conn.commit()
+        self.jars = {jar[0]: jar for jar in jars}
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def matching(self, text):
+        return {row[0] for row in query_records(self.db, "grain_jars", text, columns="jar_id")}
+
+    def test_negated_field_keeps_null_notes(self):
+        expected = {jar_id for jar_id, jar in self.jars.items() if jar[5] != "ok"}
+        self.assertEqual(self.matching("-notes:ok"), expected)
+        self.assertTrue(any(self.jars[jar_id][5] is None for jar_id in expected))
+
+    def test_negated_free_text_keeps_null_notes(self):
+        expected = {jar_id for jar_id, jar in self.jars.items() if jar[5] != "green mold"}
+        self.assertEqual(self.matching("-mold"), expected)
+
+    def test_negated_date_keeps_null_dates(self):
+        expected = {jar_id for jar_id, jar in self.jars.items() if jar[4] is None}
+        self.assertEqual(self.matching("-shaken:2025-06"), expected)
+        self.assertEqual(self.matching("shaken!=2025-06"), expected)
+
+    def test_negation_and_match_partition_the_table(self):
+        for text in ("notes:ok", "notes:none", "shaken:2025-06..2025-07", "colonization>=50", "source:LC-*"):
+            with self.subTest(text=text):
+                self.assertEqual(self.matching(text) | self.matching(f"-{text}"), set(self.jars))
+                self.assertFalse(self.matching(text) & self.matching(f"-{text}"))
+
+    def test_negated_sql(self):
+        where, params = compile_query("grain_jars", "-notes:ok")
+        self.assertIn("IS NOT 1", where)
+        self.assertEqual(params, ("%ok%",))
+
+if __name__ == "__main__":
+    unittest.main()
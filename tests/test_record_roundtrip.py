@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from database import Database
+from record_export import ExportJob
+from record_import import plan_import, commit_import
+
+PLATES = [
+    ("AP-0001", "Golden Teacher", "2025-05-01", "Fast, rhizomorphic", "", "2025-05-01T09:00:00", "2025-05-03T10:00:00"),
+    ("AP-0002", "Blue Oyster", "2025-05-02", None, "Trich at the edge", "2025-05-02T09:00:00", "2025-05-02T09:00:00"),
+]
+JARS = [
+    ("GJ-0001", "AP-0001", "2025-05-10", 40, "2025-06-14T20:29:24.123456", "", "2025-05-10T08:00:00", "2025-06-14T20:29:24.123456"),
+    ("GJ-0002", "AP-0002", "2025-05-11", 0, None, "Contamination: none", "2025-05-11T08:00:00", "2025-05-11T08:00:00"),
+    ("GJ-0003", "AP-0001", "2025-05-12T07:15:00", None, "2025-05-20", "", "2025-05-12T08:00:00", "2025-05-12T08:00:00"),
+]
+
+class RecordRoundTripTest(unittest.TestCase):
+    """Exported records import back into an empty database unchanged"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = Database(self.path("source.db"))
+        self.source.cursor.executemany("INSERT INTO agar_plates VALUES (?, ?, ?, ?, ?, ?, ?)", PLATES)
+        self.source.cursor.executemany("INSERT INTO grain_jars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", JARS)
+        self.source.conn.commit()
+
+    def tearDown(self):
+        self.source.close()
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def round_trip(self, fmt, extension):
+        target = Database(self.path(f"target-{fmt}.db"))
+        try:
+            for table_name, key in (("agar_plates", "plate_id"), ("grain_jars", "jar_id")):
+                path = self.path(f"{table_name}{extension}")
+                ExportJob(self.source.db_name, table_name, path, fmt).run()
+                plan = plan_import(target, table_name, path)
+                self.assertEqual(plan.errors, [])
+                commit_import(target, plan)
+                target.cursor.execute(f"SELECT * FROM {table_name} ORDER BY {key}")
+                yield table_name, target.cursor.fetchall()
+        finally:
+            target.close()
+
+    def test_jsonl_and_sqlite_round_trips_are_exact(self):
+        for fmt, extension in (("jsonl", ".jsonl"), ("sqlite", ".sqlite")):
+            with self.subTest(fmt=fmt):
+                imported = dict(self.round_trip(fmt, extension))
+                self.assertEqual(imported["agar_plates"], PLATES)
+                self.assertEqual(imported["grain_jars"], JARS)
+
+    def test_csv_round_trip_keeps_everything_but_null_text(self):
+        imported = dict(self.round_trip("csv", ".csv"))
+        # CSV has one kind of empty field: NULL text comes back as empty text
+        self.assertEqual(imported["agar_plates"], [PLATES[0], PLATES[1][:3] + ("",) + PLATES[1][4:]])
+        self.assertEqual(imported["grain_jars"], JARS)
+
+if __name__ == "__main__":
+    unittest.main()
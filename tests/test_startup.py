@@ -0,0 +1,83 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tkinter as tk
+import unittest
+
+# Seconds `import main` may take in a fresh interpreter. It is about 0.1 s on
+# a desktop; the budget leaves room for a Raspberry Pi.
+IMPORT_BUDGET = 1.0
+
+# Seconds building the app window may take, first tab included, on an empty database
+CONSTRUCT_BUDGET = 1.5
+
+# Modules that are only imported once the tab needing them is first shown
+LAZY_MODULES = ("matplotlib", "tkcalendar")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+print(json.dumps({{"seconds": time.perf_counter() - start,
+                  "loaded": [name for name in {LAZY_MODULES!r} if name in sys.modules]}}))
+"""
+
+# Builds the app on a withdrawn root in a fresh interpreter, so the modules
+# loaded by earlier tests don't count; run from a temporary directory so the
+# app's mycotracker.db is a new, empty database
+CONSTRUCT_PROBE = f"""
+import json, sys, time, tkinter as tk
+sys.path.insert(0, {ROOT!r})
+import main
+root = tk.Tk()
+root.withdraw()
+start = time.perf_counter()
+app = main.MycoTrackerApp(root)
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds,
+                  "built": list(app.tabs),
+                  "filled": [name for name, frame in app.tab_frames.items() if frame.winfo_children()],
+                  "loaded": [name for name in {LAZY_MODULES!r} if name in sys.modules]}}))
+app.db.close()
+root.destroy()
+"""
+
+def _has_display():
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        return False
+    return True
+
+@unittest.skipUnless(all(importlib.util.find_spec(name) for name in ("ttkthemes", "dotenv")),
+                     "main.py's dependencies are not installed")
+class StartupTest(unittest.TestCase):
+    def test_import_main(self):
+        # Best of three, so one slow disk read doesn't fail the test
+        results = [json.loads(subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, check=True,
+                                             capture_output=True, text=True).stdout.splitlines()[-1])
+                   for _ in range(3)]
+        self.assertEqual(results[0]["loaded"], [])
+        self.assertLess(min(result["seconds"] for result in results), IMPORT_BUDGET)
+
+    @unittest.skipUnless(_has_display(), "no display to create Tk windows on")
+    def test_construct_app_builds_only_the_first_tab(self):
+        results = []
+        for _ in range(3):
+            with tempfile.TemporaryDirectory() as directory:
+                output = subprocess.run([sys.executable, "-c", CONSTRUCT_PROBE], cwd=directory, check=True,
+                                        capture_output=True, text=True).stdout
+            results.append(json.loads(output.splitlines()[-1]))
+        self.assertEqual(len(results[0]["built"]), 1)
+        self.assertEqual(results[0]["filled"], results[0]["built"])
+        # The first tab's form uses tkcalendar; the charts stay unloaded
+        self.assertNotIn("matplotlib", results[0]["loaded"])
+        self.assertLess(min(result["seconds"] for result in results), CONSTRUCT_BUDGET)
+
+if __name__ == "__main__":
+    unittest.main()
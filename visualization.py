@@ -2,14 +2,23 @@ import tkinter as tk
 from tkinter import ttk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from datetime import datetime, timedelta
 import numpy as np
+from chart_cache import ChartCache
+from chart_data import TIMELINE_DAYS
+
+# Tables each sub-tab's chart reads; changes elsewhere don't redraw it
+CHART_TABLES = {
+    "Growth Timeline": ("grain_jars",),
+    "Statistics": ("grain_jars",),
+    "Yield Analysis": ("bulk_tubs",),
+}
 
 class VisualizationFrame(ttk.Frame):
     def __init__(self, parent, db):
         super().__init__(parent)
         self.db = db
         self.figures = {}  # Cache for figures
+        self.chart_cache = ChartCache(db)
         self.setup_ui()
 
     def setup_ui(self):
@@ -40,12 +49,22 @@ class VisualizationFrame(ttk.Frame):
         tab_name = self.notebook.tab(current_tab, "text")
         
         # Only refresh the current tab
-        if tab_name == "Growth Timeline":
-            self.refresh_growth_timeline()
-        elif tab_name == "Statistics":
-            self.refresh_statistics()
-        elif tab_name == "Yield Analysis":
-            self.refresh_yield_analysis()
+        self.refresh_tab(tab_name)
+
+    def refresh_tab(self, tab_name):
+        """Redraw a sub-tab's chart unless its data is unchanged since the last draw"""
+        if tab_name not in CHART_TABLES or self.chart_cache.is_current(tab_name, CHART_TABLES[tab_name]):
+            return
+        refresh_chart = {
+            "Growth Timeline": self.refresh_growth_timeline,
+            "Statistics": self.refresh_statistics,
+            "Yield Analysis": self.refresh_yield_analysis,
+        }[tab_name]
+        try:
+            refresh_chart()
+        except Exception:
+            self.chart_cache.invalidate(tab_name)
+            raise
 
     def setup_growth_timeline(self):
         # Create figure for growth timeline
@@ -54,7 +73,7 @@ class VisualizationFrame(ttk.Frame):
         self.figures['growth'] = fig
         canvas = FigureCanvasTkAgg(fig, master=self.growth_tab)
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        self.refresh_growth_timeline()
+        self.refresh_tab("Growth Timeline")
 
     def setup_statistics(self):
         # Create figure for statistics
@@ -63,7 +82,7 @@ class VisualizationFrame(ttk.Frame):
         self.figures['stats'] = fig
         canvas = FigureCanvasTkAgg(fig, master=self.stats_tab)
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        self.refresh_statistics()
+        self.refresh_tab("Statistics")
 
     def setup_yield_analysis(self):
         # Create figure for yield analysis
@@ -72,45 +91,33 @@ class VisualizationFrame(ttk.Frame):
         self.figures['yield'] = fig
         canvas = FigureCanvasTkAgg(fig, master=self.yield_tab)
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        self.refresh_yield_analysis()
+        self.refresh_tab("Yield Analysis")
 
     def refresh_growth_timeline(self):
+        from charts import DownsampledLineCollection
         fig = self.figures['growth']
         ax = fig.axes[0]
         ax.clear()
 
-        # Get data for the last 30 days
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-        
-        self.db.cursor.execute('''
-            SELECT inoculation_date, colonization_percentage
-            FROM grain_jars
-            WHERE inoculation_date >= ?
-            ORDER BY inoculation_date
-        ''', (start_date.isoformat(),))
-        
-        data = self.db.cursor.fetchall()
-        
-        if data:
-            dates = [datetime.fromisoformat(row[0]) for row in data]
-            percentages = [row[1] for row in data]
-
-            # Plot data
-            ax.plot(dates, percentages, 'b-', marker='o')
-            ax.set_title('Colonization Progress (Last 30 Days)')
-            ax.set_xlabel('Date')
+        # Jars inoculated in the last 30 days, shared with the dashboard
+        timeline = self.db.chart_data.growth_timeline()
+
+        if timeline.curves:
+            ax.add_collection(DownsampledLineCollection(timeline.curves, colors='tab:blue', alpha=0.25, linewidths=1))
+            if len(timeline.mean_curve):
+                ax.plot(timeline.mean_curve[:, 0], timeline.mean_curve[:, 1], 'b-', marker='o')
+            ax.autoscale_view()
+            ax.set_ylim(0, 105)
+            ax.set_title(f'Colonization Progress (Last {TIMELINE_DAYS} Days)')
+            ax.set_xlabel('Days Since Inoculation')
             ax.set_ylabel('Colonization %')
             ax.grid(True)
-            
-            # Rotate x-axis labels for better readability
-            plt.xticks(rotation=45)
         else:
-            ax.text(0.5, 0.5, 'No data available for the last 30 days',
+            ax.text(0.5, 0.5, f'No data available for the last {TIMELINE_DAYS} days',
                    horizontalalignment='center',
                    verticalalignment='center',
                    transform=ax.transAxes)
-            ax.set_title('Colonization Progress (Last 30 Days)')
+            ax.set_title(f'Colonization Progress (Last {TIMELINE_DAYS} Days)')
         
         fig.tight_layout()
         fig.canvas.draw()
@@ -122,13 +129,7 @@ class VisualizationFrame(ttk.Frame):
         ax2.clear()
 
         # Contamination rate pie chart
-        self.db.cursor.execute('''
-            SELECT 
-                COUNT(CASE WHEN contamination_notes != '' THEN 1 END) as contaminated,
-                COUNT(CASE WHEN contamination_notes = '' THEN 1 END) as clean
-            FROM grain_jars
-        ''')
-        contaminated, clean = self.db.cursor.fetchone()
+        contaminated, clean = self.db.chart_data.contamination_counts()
         
         if contaminated + clean > 0:
             ax1.pie([contaminated, clean], 
@@ -144,15 +145,9 @@ class VisualizationFrame(ttk.Frame):
             ax1.set_title('Contamination Rate')
 
         # Colonization speed histogram
-        self.db.cursor.execute('''
-            SELECT 
-                JULIANDAY(shake_date) - JULIANDAY(inoculation_date) as days_to_colonize
-            FROM grain_jars
-            WHERE shake_date IS NOT NULL
-        ''')
-        days_data = [row[0] for row in self.db.cursor.fetchall()]
+        days_data = self.db.chart_data.colonization_days()
         
-        if days_data:
+        if len(days_data):
             ax2.hist(days_data, bins=10, color='green', alpha=0.7)
             ax2.set_title('Colonization Speed Distribution')
             ax2.set_xlabel('Days to Colonize')
@@ -173,30 +168,16 @@ class VisualizationFrame(ttk.Frame):
         ax = fig.axes[0]
         ax.clear()
 
-        # Get yield data from bulk tubs
-        self.db.cursor.execute('''
-            SELECT 
-                date_to_bulk,
-                harvest_weight_flush1,
-                harvest_weight_flush2,
-                harvest_weight_flush3
-            FROM bulk_tubs
-            WHERE date_to_bulk IS NOT NULL
-            ORDER BY date_to_bulk
-        ''')
-        
-        data = self.db.cursor.fetchall()
+        # Yield data from bulk tubs, shared with the dashboard
+        yields = self.db.chart_data.flush_yields()
         
-        if data:
-            dates = [datetime.fromisoformat(row[0]) for row in data]
-            flush1 = [row[1] or 0 for row in data]
-            flush2 = [row[2] or 0 for row in data]
-            flush3 = [row[3] or 0 for row in data]
+        if len(yields.dates):
+            flush1, flush2, flush3 = yields.weights.T
 
             # Plot stacked bar chart
-            ax.bar(dates, flush1, label='Flush 1', color='#2ecc71')
-            ax.bar(dates, flush2, bottom=flush1, label='Flush 2', color='#3498db')
-            ax.bar(dates, flush3, bottom=[f1 + f2 for f1, f2 in zip(flush1, flush2)], 
+            ax.bar(yields.dates, flush1, label='Flush 1', color='#2ecc71')
+            ax.bar(yields.dates, flush2, bottom=flush1, label='Flush 2', color='#3498db')
+            ax.bar(yields.dates, flush3, bottom=flush1 + flush2, 
                    label='Flush 3', color='#9b59b6')
 
             ax.set_title('Yield by Flush')
@@ -223,9 +204,4 @@ class VisualizationFrame(ttk.Frame):
         tab_name = self.notebook.tab(current_tab, "text")
         
         # Only refresh the current tab
-        if tab_name == "Growth Timeline":
-            self.refresh_growth_timeline()
-        elif tab_name == "Statistics":
-            self.refresh_statistics()
-        elif tab_name == "Yield Analysis":
-            self.refresh_yield_analysis() 
\ No newline at end of file
+        self.refresh_tab(tab_name) 
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""Bulk tub yields grouped by strain, substrate, month or spawn source.
+
+load_yield_table() reads every harvested tub once into NumPy columns, with
+each grouping column dictionary-encoded to integer codes. group_yields()
+then aggregates any of them without a Python loop over tubs: the tubs are
+sorted by group code and np.add.reduceat sums each contiguous run, and
+percentiles are interpolated at per-group offsets into the same sorted
+order. yield_intervals() adds percentile bootstrap confidence intervals
+for the mean of each compared group, resampling every group at once.
+Database.chart_data caches all three per data generation.
+"""
+from collections import namedtuple
+import numpy as np
+
+# Tables the yield table reads: the tubs, plus the jars and the LCs/plates
+# they were spawned from, which give each tub its strain
+YIELD_TABLES = ("bulk_tubs", "grain_jars", "liquid_cultures", "agar_plates")
+
+# Dashboard label -> YieldTable grouping column
+GROUPINGS = {
+    "Strain": "strains",
+    "Substrate": "substrates",
+    "Month": "months",
+    "Spawn Source": "spawn_sources",
+}
+
+# Percentiles of per-tub yield reported for each group
+PERCENTILES = (25, 50, 75)
+
+# Columns of a table of YieldGroups rows, see group_rows()
+GROUP_TABLE_COLUMNS = ("Group", "Tubs", "Total (g)", "Mean (g)", "25th %ile", "Median", "75th %ile",
+                       "Flush 1 %", "Flush 2 %", "Flush 3 %")
+
+# Groups drawn on a yield chart
+MAX_CHART_GROUPS = 15
+
+# Bootstrap resamples per group, and the confidence of the intervals
+BOOTSTRAP_RESAMPLES = 10_000
+CONFIDENCE = 0.95
+
+# Tubs drawn from one group per resample; larger groups are resampled m out
+# of n (see bootstrap_means)
+BOOTSTRAP_MAX_DRAWS = 1000
+
+# Tubs drawn per bootstrap chunk: bounds the memory of the resampling
+BOOTSTRAP_CHUNK_SIZE = 250_000
+
+# Fixed, so a group's interval doesn't move between refreshes of the same data
+BOOTSTRAP_SEED = 0
+
+# Columns of a table of YieldIntervals rows, see interval_rows()
+INTERVAL_TABLE_COLUMNS = ("Group", "Tubs", "Mean (g)", f"{CONFIDENCE:.0%} CI Low", f"{CONFIDENCE:.0%} CI High")
+
+# Label of tubs whose strain, substrate, month or source is not recorded
+UNKNOWN = "(unknown)"
+
+# Grouping columns are (codes, labels) pairs: labels[codes[i]] is tub i's
+# group, and labels are sorted, so months are in date order.
+# weights: (tubs, 3) grams per flush, missing as 0
+YieldTable = namedtuple("YieldTable", "tub_ids strains substrates months spawn_sources weights")
+
+# One entry per group, in label order. totals and means are per-tub yields;
+# flush_totals and flush_ratios are (groups, 3), the ratios being each
+# flush's share of the group's total; percentiles is (groups, len(PERCENTILES))
+YieldGroups = namedtuple("YieldGroups", "labels counts totals means percentiles flush_totals flush_ratios")
+
+# Mean yield per tub of each compared group, with the bounds of its
+# bootstrap confidence interval, in chart order
+YieldIntervals = namedtuple("YieldIntervals", "labels counts means lower upper")
+
+def encode_labels(values):
+    """Return (codes, labels) for a list of strings, labels sorted"""
+    lookup = {}
+    codes = np.array([lookup.setdefault(value, len(lookup)) for value in values], dtype=np.intp)
+    # Renumber the codes in label order
+    labels = sorted(lookup)
+    renumber = np.empty(len(labels), dtype=np.intp)
+    renumber[[lookup[label] for label in labels]] = np.arange(len(labels))
+    return renumber[codes], labels
+
+def load_yield_table(db):
+    """Return a YieldTable of every bulk tub with at least one recorded flush"""
+    db.cursor.execute(f"""
+        SELECT t.tub_id,
+               COALESCE(NULLIF(lc.strain_name, ''), NULLIF(ap.strain_name, ''), '{UNKNOWN}'),
+               COALESCE(NULLIF(t.substrate_type, ''), '{UNKNOWN}'),
+               COALESCE(substr(t.date_to_bulk, 1, 7), '{UNKNOWN}'),
+               COALESCE(NULLIF(t.spawn_source, ''), '{UNKNOWN}'),
+               t.harvest_weight_flush1, t.harvest_weight_flush2, t.harvest_weight_flush3
+        FROM bulk_tubs t
+        LEFT JOIN grain_jars j ON j.jar_id = t.spawn_source
+        LEFT JOIN liquid_cultures lc ON lc.lc_id = j.source_id
+        LEFT JOIN agar_plates ap ON ap.plate_id = j.source_id
+        WHERE COALESCE(t.harvest_weight_flush1, t.harvest_weight_flush2, t.harvest_weight_flush3) IS NOT NULL
+    """)
+    columns = list(zip(*db.cursor.fetchall())) or [()] * 8
+    weights = np.array(columns[5:], dtype=float).T.reshape(-1, 3)
+    return YieldTable(
+        np.array(columns[0], dtype=object),
+        *(encode_labels(column) for column in columns[1:5]),
+        np.nan_to_num(weights),
+    )
+
+def group_yields(grouping, weights, percentiles=PERCENTILES):
+    """Aggregate per-flush `weights` by a (codes, labels) grouping column.
+
+    Groups without tubs are left out.
+    """
+    codes, labels = grouping
+    percentiles = np.asarray(percentiles, dtype=float)
+    if not len(codes):
+        empty = np.zeros(0)
+        return YieldGroups([], np.zeros(0, dtype=np.intp), empty, empty,
+                           np.zeros((0, len(percentiles))), np.zeros((0, 3)), np.zeros((0, 3)))
+
+    tub_totals = weights.sum(axis=1)
+    # Sorting by code, then by yield, makes each group a contiguous ascending run
+    order = np.lexsort((tub_totals, codes))
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    counts = np.diff(np.r_[starts, len(codes)])
+
+    flush_totals = np.add.reduceat(weights[order], starts, axis=0)
+    totals = flush_totals.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        flush_ratios = np.nan_to_num(flush_totals / totals[:, None])
+
+    # Linear interpolation between the closest ranks, as np.percentile does
+    sorted_totals = tub_totals[order]
+    positions = starts[:, None] + (counts[:, None] - 1) * (percentiles / 100)
+    below = np.floor(positions).astype(np.intp)
+    above = np.minimum(below + 1, (starts + counts - 1)[:, None])
+    fraction = positions - below
+    group_percentiles = sorted_totals[below] * (1 - fraction) + sorted_totals[above] * fraction
+
+    return YieldGroups([labels[code] for code in sorted_codes[starts]], counts, totals,
+                       totals / counts, group_percentiles, flush_totals, flush_ratios)
+
+def largest_groups(groups, limit):
+    """Indices of the `limit` groups with the largest total yield, largest first"""
+    return np.argsort(groups.totals, kind="stable")[::-1][:limit]
+
+def chart_groups(groups, grouping, limit=MAX_CHART_GROUPS):
+    """Indices of the groups worth charting: the latest months, newest first,
+    or else the groups with the largest total yield, best mean first"""
+    if grouping == "months":
+        return np.arange(len(groups.labels))[::-1][:limit]
+    shown = largest_groups(groups, limit)
+    return shown[np.argsort(-groups.means[shown], kind="stable")]
+
+def group_rows(groups, indices):
+    """Rows of GROUP_TABLE_COLUMNS for the given groups, rounded for display"""
+    return [(groups.labels[index], int(groups.counts[index]), round(float(groups.totals[index]), 1),
+             round(float(groups.means[index]), 1),
+             *(round(float(value), 1) for value in groups.percentiles[index]),
+             *(round(100 * float(value), 1) for value in groups.flush_ratios[index]))
+            for index in indices]
+
+def bootstrap_means(codes, values, groups, resamples=BOOTSTRAP_RESAMPLES, confidence=CONFIDENCE,
+                    seed=BOOTSTRAP_SEED):
+    """Return (means, lower, upper) of `values` per group 0..groups-1, every
+    group having at least one value, with percentile bootstrap intervals.
+
+    Each resample draws every group's values with replacement at once: one
+    uniform array over all draws, scaled to per-draw group sizes and offset
+    to the group's run in sorted order, then summed per run with
+    np.add.reduceat. Resamples are drawn in chunks of about
+    BOOTSTRAP_CHUNK_SIZE draws.
+
+    A group of more than BOOTSTRAP_MAX_DRAWS values is resampled m out of n:
+    each resample draws BOOTSTRAP_MAX_DRAWS of them and the interval's
+    distance from the mean is scaled by sqrt(m / n), so the cost doesn't
+    grow with the number of tubs.
+    """
+    order = np.argsort(codes, kind="stable")
+    sorted_values = values[order].astype(np.float32)
+    counts = np.bincount(codes, minlength=groups)
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    drawn = np.minimum(counts, BOOTSTRAP_MAX_DRAWS)
+    draw_starts = np.r_[0, np.cumsum(drawn)[:-1]]
+    offsets = np.repeat(starts, drawn)
+    sizes = np.repeat(counts, drawn)
+    scales = sizes.astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    chunk = max(1, BOOTSTRAP_CHUNK_SIZE // max(len(offsets), 1))
+    sums = np.empty((resamples, groups))
+    for first in range(0, resamples, chunk):
+        draws = rng.random((min(chunk, resamples - first), len(offsets)), dtype=np.float32)
+        draws *= scales
+        picks = draws.astype(np.intp)
+        # float32 rounding can land a draw on the group size itself
+        np.minimum(picks, sizes - 1, out=picks)
+        picks += offsets
+        sums[first:first + len(picks)] = np.add.reduceat(sorted_values[picks], draw_starts, axis=1,
+                                                         dtype=np.float64)
+
+    means = np.bincount(codes, weights=values, minlength=groups) / counts
+    tail = 50 * (1 - confidence)
+    lower, upper = np.percentile(sums / drawn, [tail, 100 - tail], axis=0)
+    scale = np.sqrt(drawn / counts)
+    return means, means + (lower - means) * scale, means + (upper - means) * scale
+
+def yield_intervals(table, grouping, limit=MAX_CHART_GROUPS):
+    """Return YieldIntervals of a YieldTable grouping: the latest months,
+    newest first, or else the groups with the most tubs, best mean first"""
+    codes, labels = getattr(table, grouping)
+    counts = np.bincount(codes, minlength=len(labels))
+    present = np.flatnonzero(counts)
+    if grouping == "months":
+        compared = present[::-1][:limit]
+    else:
+        compared = present[np.argsort(-counts[present], kind="stable")][:limit]
+
+    # Number the compared groups 0..n-1 and resample only their tubs
+    renumber = np.full(len(labels), -1, dtype=np.intp)
+    renumber[compared] = np.arange(len(compared))
+    selected = renumber[codes]
+    keep = selected >= 0
+    if not keep.any():
+        return YieldIntervals([], np.zeros(0, dtype=np.intp), np.zeros(0), np.zeros(0), np.zeros(0))
+    means, lower, upper = bootstrap_means(selected[keep], table.weights[keep].sum(axis=1), len(compared))
+
+    order = np.arange(len(compared)) if grouping == "months" else np.argsort(-means, kind="stable")
+    return YieldIntervals([labels[compared[index]] for index in order], counts[compared][order],
+                          means[order], lower[order], upper[order])
+
+def interval_rows(intervals):
+    """Rows of INTERVAL_TABLE_COLUMNS, rounded for display"""
+    return [(label, int(count), round(float(mean), 1), round(float(low), 1), round(float(high), 1))
+            for label, count, mean, low, high in zip(*intervals)]